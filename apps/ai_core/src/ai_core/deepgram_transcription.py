@@ -52,25 +52,16 @@ def transform(json_data):
 
 def transcribe(audio_filename: str):
 
-        # Read the audio file as binary data
+        # Stream the audio file instead of reading it into memory
         if not os.path.exists(audio_filename):
             raise FileNotFoundError(f"The file {audio_filename} does not exist.")
 
         with open(audio_filename, "rb") as audio_file:
-            buffer_data = audio_file.read()
-
-        return transcribe_buffer(buffer_data)
-
-def transcribe_buffer(buffer_data):
-        # Create a Deepgram client using the API key
-        deepgram = DeepgramClient(settings.deepgram_api_key)
-
-        payload: FileSource = {
-            "buffer": buffer_data,
-        }
+            return transcribe_stream(audio_file)
 
+def _options() -> PrerecordedOptions:
         # Configure Deepgram options for audio analysis
-        options = PrerecordedOptions(
+        return PrerecordedOptions(
             model="nova-2",
             # smart_format=True,
             # utterances=True,  # Output utterances
@@ -85,8 +76,32 @@ def transcribe_buffer(buffer_data):
             paragraphs=True  # Output formatted paragraphs
         )
 
-        # Call the transcribe_file method with the text payload and options
-        response = deepgram.listen.rest.v("1").transcribe_file(payload, options, timeout=httpx.Timeout(300.0, connect=10.0))
+def _transcribe_file(payload: FileSource):
+        # Create a Deepgram client using the API key
+        deepgram = DeepgramClient(settings.deepgram_api_key)
+
+        # Call the transcribe_file method with the payload and options
+        response = deepgram.listen.rest.v("1").transcribe_file(payload, _options(), timeout=httpx.Timeout(300.0, connect=10.0))
+        return response.to_json()
+
+def transcribe_buffer(buffer_data):
+        payload: FileSource = {
+            "buffer": buffer_data,
+        }
+        return _transcribe_file(payload)
+
+def transcribe_stream(stream):
+        # The request body is read from the stream as it is sent, so the audio is never fully in memory
+        payload: FileSource = {
+            "stream": stream,
+        }
+        return _transcribe_file(payload)
+
+def transcribe_url(url: str):
+        # Deepgram downloads the audio itself, so it does not pass through this process at all
+        deepgram = DeepgramClient(settings.deepgram_api_key)
+
+        response = deepgram.listen.rest.v("1").transcribe_url({"url": url}, _options(), timeout=httpx.Timeout(300.0, connect=10.0))
         return response.to_json()
 
 
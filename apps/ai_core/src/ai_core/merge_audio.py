@@ -1,5 +1,4 @@
 import json
-import boto3
 import os
 import time
 import tempfile
@@ -11,6 +10,8 @@ from slack_sdk import WebClient
 
 from pydub import AudioSegment
 
+from aws_clients import get_client
+
 # Create logger object
 logger = logging.getLogger()
 
@@ -20,9 +21,9 @@ secret_store = os.environ.get("SECRET_STORE_NAME")
 testing_flag = os.environ.get("TESTING_FLAG")
 
 # Create a s3 client
-s3_client = boto3.client('s3')
-secret_client = boto3.client('secretsmanager')
-transcribe_client = boto3.client('transcribe')
+s3_client = get_client('s3')
+secret_client = get_client('secretsmanager')
+transcribe_client = get_client('transcribe')
 
 bucket_name = "dev-acutedge-recordings"
 s3_base_uri = "https://dev-acutedge-recordings.s3.amazonaws.com/"
@@ -9,8 +9,19 @@ class Config(BaseModel):
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field("INFO", description="Log Level", example="INFO")
     ssl_enabled: Optional[bool] = Field(False, description="Enable SSL", example=True)
     auth_enabled: Optional[bool] = Field(False, description="Enable authentication", example=True)
-    database_type: Literal["s3", "none", "tinydb", "dynamodb", "filesystem"] = Field("s3", description="Database type", example="dynamodb")
+    database_type: Literal["s3", "none", "tinydb", "dynamodb", "filesystem", "logdb", "sqlite"] = Field("s3", description="Database type", example="dynamodb")
     bucket_name: Optional[str] = Field("scribble2-data", description="S3 bucket name", example="scribble2-data")
+    indexes: Optional[dict[str, list[str]]] = Field(None, description="Secondary indexes per table", example={"transcription_request": ["user_id"]})
+    cache_tables: Optional[list[str]] = Field(None, description="Tables served through the read-through cache", example=["user"])
+    cache_ttl: Optional[float] = Field(30, description="Seconds a cached item stays valid", example=30)
+    ttl_tables: Optional[dict[str, float]] = Field(None, description="Seconds items live per table before they expire", example={"transcription_request": 2592000})
+    change_feed: Optional[bool] = Field(False, description="Record writes so components can watch tables instead of polling", example=True)
+    codec: Optional[Literal["json", "orjson", "msgpack"]] = Field("json", description="Serialization of stored documents", example="msgpack")
+    compression: Optional[Literal["none", "zstd"]] = Field("none", description="Compression of stored documents", example="zstd")
+    compression_threshold: Optional[int] = Field(16384, description="Size in bytes from which stored documents are compressed", example=16384)
+    disk_cache_dir: Optional[str] = Field(None, description="Local disk cache of S3 objects, shared by the workers of a host", example="/tmp/s3-cache")
+    disk_cache_max_bytes: Optional[int] = Field(1073741824, description="Size bound of the S3 disk cache in bytes", example=1073741824)
+    metrics_enabled: Optional[bool] = Field(True, description="Record database call metrics, served on /metrics", example=True)
     debug: Optional[bool] = Field(True, description="Enable debug mode", example=True)
     queue_only: Optional[bool] = Field(True, description="Run only queue listener - else run FastAPI and queue listener", example=True)
     queue_type: Literal["local", "sqs"] = Field("sqs", description="Queue type", example="local")
@@ -21,6 +32,8 @@ class Config(BaseModel):
     openai_model: Optional[str] = Field("gpt-4o-mini", description="OpenAI model", example="gpt-4o-mini")
     aws_access_key_id: Optional[str] = Field(None, description="AWS Access Key ID", example="your-access-key")
     aws_secret_access_key: Optional[str] = Field(None, description="AWS Secret Access Key", example="your-secret-key")
+    aws_max_pool_connections: Optional[int] = Field(50, description="Connection pool size of the shared AWS clients", example=50)
+    aws_retry_mode: Literal["legacy", "standard", "adaptive"] = Field("standard", description="Retry mode of the shared AWS clients", example="adaptive")
     slack_enabled: Optional[bool] = Field(True, description="Enable Slack notifications", example=True)
     slack_channel: Optional[str] = Field("acutedge-alerts", description="Slack channel", example="acutedge-alerts")
     slack_bot_token: Optional[str] = Field(None, description="Slack bot token", example="xxxxxxxx")
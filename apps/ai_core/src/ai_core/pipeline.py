@@ -14,15 +14,16 @@ from ai_core.config import settings, config_provider
 from ai_core.models.transcription_request import TranscriptionRequest
 from ai_core.models.transcription_result import TranscriptionResult
 from ai_core.services.transcription_request_service import create_transcription_request
-from database.factory import get_database
-from database.interface import NoSqlDb
+from database.async_database import SyncNoSqlDb
+from database.async_interface import AsyncNoSqlDb
+from database.factory import get_async_database
 from ai_core.slack import send_slack_message
 import traceback
 
 logger = logging.getLogger(__name__)
 
-def get_db_provider() -> NoSqlDb:
-    return get_database(config_provider)
+def get_async_db_provider() -> AsyncNoSqlDb:
+    return get_async_database(config_provider)
 
 # Has flexibility of abstraction - should not be here
 # The important part to update and keep is the abstraction between queue types and
@@ -60,12 +61,15 @@ async def start_queue_listener():
     # Get the queue client instance
     queue_input_client = get_queue(settings.queue_input_name)
     queue_output_client = get_queue(settings.queue_output_name)
+    # The transcription service is synchronous: it reaches the shared async database through a
+    # SyncNoSqlDb, whose calls run natively on that adapter's own loop
+    db = SyncNoSqlDb(get_async_db_provider())
 
     logger.info(f"Listening on queue '{settings.queue_input_name}' of type '{settings.queue_type}'...")
     while True:
         try:
             # Receive and process messages
-            message = queue_input_client.receive_message()
+            message = await asyncio.to_thread(queue_input_client.receive_message)
             if message:
                 logger.info(f"received message: {message}")
                 
@@ -79,15 +83,16 @@ async def start_queue_listener():
                 logger.info(f"transcription request: {request}")
                 
                 logger.info(f"starting transcription {request.id}")                
-                result = create_transcription_request(request, get_db_provider(), None, None)
+                # Blocking work (transcription, queues) runs off the event loop so the API stays responsive
+                result = await asyncio.to_thread(create_transcription_request, request, db, None, None)
                 logger.info(f"procesed transcription {request.id}")
 
-                queue_input_client.delete_message(recipient_handle)
+                await asyncio.to_thread(queue_input_client.delete_message, recipient_handle)
                 result.completed = int(time.time())
                 result.status = "completed"
                 message_body = result.model_dump_json()  # Converts Pydantic model to a JSON string
                 logger.info(f"sending message to output queue: {message_body}")
-                queue_output_client.send_message(message_body)
+                await asyncio.to_thread(queue_output_client.send_message, message_body)
                 logger.info(f"deleted message with handle {recipient_handle}")
 
             await asyncio.sleep(1)
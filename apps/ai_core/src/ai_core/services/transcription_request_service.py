@@ -15,7 +15,7 @@ from ai_core.main import app
 from queues.factory import get_queue_client
 from ai_core.answer_questions import answer_questions
 from datetime import datetime
-from ai_core.deepgram_transcription import transcribe, transform, transcribe_buffer
+from ai_core.deepgram_transcription import transcribe, transform, transcribe_stream, transcribe_url
 
 
 logger = logging.getLogger(__name__)
@@ -57,19 +57,30 @@ def create_transcription_request(item: TranscriptionRequest, db: NoSqlDb, q: Que
     logger.info(f"audio_filename: {audio_filename}")
     prefix = f"{item.user_id}/{item.patient_id}/{item.assessment_id}"
 
-    # db.get_item("input", f"{item.user_id}/{item.patient_id}/{item.assessment_id}/transcription.json")
-    audio_buffer = db.get_binary_item("input", f"{prefix}/{audio_filename}")
-    if not audio_buffer:
-        raise ValueError(f"Audio file not found in: input/{prefix}/{audio_filename}")
+    # Hand Deepgram a URL to the audio where the storage offers one, otherwise stream it:
+    # recordings can be long, so the audio is never loaded into memory
+    audio_key = f"{prefix}/{audio_filename}"
+    if not db.exists("input", audio_key):
+        raise ValueError(f"Audio file not found in: input/{audio_key}")
 
     logger.info("starting deepgram transcription")
-    deepgram_json = transcribe_buffer(audio_buffer)
+    audio_url = db.get_blob_url("input", audio_key)
+    if audio_url:
+        deepgram_json = transcribe_url(audio_url)
+    else:
+        audio_reader = db.open_blob_reader("input", audio_key)
+        if audio_reader is None:
+            raise ValueError(f"Audio file not found in: input/{audio_key}")
+        with audio_reader:
+            deepgram_json = transcribe_stream(audio_reader)
     if not deepgram_json:
         raise ValueError("Deepgram transcription failed for file: input/{prefix}/{audio_filename}")
     
     deepgram_dict = json.loads(deepgram_json)
-    
-    logger.info(f"saving deepgram transformation {prefix}/transcription.json")    
+
+    # Each output is saved as soon as its step finishes, so a failure in a later (long) step
+    # keeps the earlier files for debugging
+    logger.info(f"saving deepgram transformation {prefix}/transcription.json")
     db.insert_item("output", f"{prefix}/transcription.json", deepgram_dict)
     result.answer_files.append(f"{prefix}/transcription.json")
     # publish timings metrics errors slack ?
@@ -84,13 +95,13 @@ def create_transcription_request(item: TranscriptionRequest, db: NoSqlDb, q: Que
 
     logger.info("answer questions")
     answers_json = answer_questions(conversation_json, item.patient_id, item.assessment_id, item.assessment_id)
-    
+
     if not answers_json:
         raise ValueError("Answers generation failed.")
 
     db.insert_item("output", f"{prefix}/answers.json", answers_json)
     result.answer_files.append(f"{prefix}/answers.json")
-    
+
     logger.info(f"=== ai core processing finished {item.id} output/{prefix}/answers.json ===")
     return result
 
@@ -99,6 +110,16 @@ def get_all_transcription_request(db: NoSqlDb, user: dict):
     logger.info("===============get_all_transcription_request called==============")
     return db.get_all_items("transcription_request")
 
+# read - stream all items
+def iter_transcription_request(db: NoSqlDb, user: dict):
+    logger.info("===============iter_transcription_request called==============")
+    return db.iter_items("transcription_request")
+
+# read - query items (filter, projection, paging)
+def query_transcription_request(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_transcription_request called==============")
+    return db.query("transcription_request", filters, fields, limit, cursor)
+
 # read - get an item
 def get_transcription_request(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_transcription_request called==============")
@@ -110,8 +131,7 @@ def get_transcription_request(id: str, db: NoSqlDb, user: dict):
 def update_transcription_request(id: str, new_item: TranscriptionRequest, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_transcription_request called==============")
     logger.info(new_item)
-    db.update_item("transcription_request", id, new_item.model_dump())
-    return db.get_item("transcription_request", id)
+    return db.update_item("transcription_request", id, new_item.model_dump())
 
 # write - delete an item
 def delete_transcription_request(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -122,4 +142,33 @@ def delete_transcription_request(id: str, db: NoSqlDb, q: QueueClient, user: dic
         logger.warning(f"TranscriptionRequest with id {id} not found")
         return None
     db.delete_item("transcription_request", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_transcription_requests(items: List[TranscriptionRequest], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_transcription_requests called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("transcription_request", new_items)
+    logger.info(f"{len(created)} TranscriptionRequest items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_transcription_requests(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_transcription_requests called==============")
+    return db.get_items("transcription_request", ids)
+
+# write - delete many items
+def delete_transcription_requests(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_transcription_requests called==============")
+    items = db.get_items("transcription_request", ids)
+    db.delete_items("transcription_request", [item["id"] for item in items])
+    return items
@@ -32,6 +32,16 @@ def get_all_transcription_result(db: NoSqlDb, user: dict):
     logger.info("===============get_all_transcription_result called==============")
     return db.get_all_items("transcription_result")
 
+# read - stream all items
+def iter_transcription_result(db: NoSqlDb, user: dict):
+    logger.info("===============iter_transcription_result called==============")
+    return db.iter_items("transcription_result")
+
+# read - query items (filter, projection, paging)
+def query_transcription_result(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_transcription_result called==============")
+    return db.query("transcription_result", filters, fields, limit, cursor)
+
 # read - get an item
 def get_transcription_result(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_transcription_result called==============")
@@ -43,8 +53,7 @@ def get_transcription_result(id: str, db: NoSqlDb, user: dict):
 def update_transcription_result(id: str, new_item: TranscriptionResult, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_transcription_result called==============")
     logger.info(new_item)
-    db.update_item("transcription_result", id, new_item.model_dump())
-    return db.get_item("transcription_result", id)
+    return db.update_item("transcription_result", id, new_item.model_dump())
 
 # write - delete an item
 def delete_transcription_result(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -55,4 +64,33 @@ def delete_transcription_result(id: str, db: NoSqlDb, q: QueueClient, user: dict
         logger.warning(f"TranscriptionResult with id {id} not found")
         return None
     db.delete_item("transcription_result", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_transcription_results(items: List[TranscriptionResult], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_transcription_results called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("transcription_result", new_items)
+    logger.info(f"{len(created)} TranscriptionResult items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_transcription_results(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_transcription_results called==============")
+    return db.get_items("transcription_result", ids)
+
+# write - delete many items
+def delete_transcription_results(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_transcription_results called==============")
+    items = db.get_items("transcription_result", ids)
+    db.delete_items("transcription_result", [item["id"] for item in items])
+    return items
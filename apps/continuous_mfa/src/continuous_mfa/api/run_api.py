@@ -1,11 +1,15 @@
 import logging
-from fastapi import APIRouter, HTTPException, Depends, Security
+from fastapi import APIRouter, HTTPException, Depends, Security, Body, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List
+from typing import List, Literal, Optional
 import uuid
 from continuous_mfa.config import settings 
 from database.interface import NoSqlDb
-from database.factory import get_database, get_db
+from database.async_interface import AsyncNoSqlDb
+from database.factory import get_async_database, get_database, get_db
+from database.query import parse_filters
 from queues.factory import get_queue_client
 from queues.interface import QueueClient
 from continuous_mfa.models.run import Run
@@ -13,7 +17,8 @@ from typing import Dict
 from auth.factory import get_auth_provider
 from continuous_mfa.auth_util import require_role, no_role_required
 from continuous_mfa.config import config_provider
-from continuous_mfa.invoker import safe_invoke
+from continuous_mfa.invoker import safe_invoke, safe_invoke_async
+from continuous_mfa.stream_util import stream_items
 
 
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +32,11 @@ security = HTTPBearer()
 def get_db_provider() -> NoSqlDb:
     return get_database(config_provider)
 
+# The read routes run on the event loop: the service read functions pass on the database's result,
+# which safe_invoke_async awaits
+def get_async_db_provider() -> AsyncNoSqlDb:
+    return get_async_database(config_provider)
+
 # Inject database dependency dynamically
 def get_queue() -> QueueClient:
     queue_type = settings.queue_type  # Read from app config
@@ -58,20 +68,41 @@ def create_run(item: Run,
     return ret
 
 # read - Retrieve all items
+# ?stream=ndjson or ?stream=json sends items as they are read instead of building the whole list
+# ?filter=field:op:value (op: eq, in, gt, gte, lt, lte, prefix - repeatable), ?fields=a,b, ?limit=n and ?cursor=
+# query the database instead; the cursor of the next page is returned in the X-Next-Cursor header
 @router.get("/runs", response_model=List[Run])
-def get_all_runs(db: NoSqlDb = Depends(get_db_provider),
+async def get_all_runs(stream: Optional[Literal["ndjson", "json"]] = None,
+                        filter_: Optional[List[str]] = Query(None, alias="filter"),
+                        fields: Optional[str] = None,
+                        limit: Optional[int] = Query(None, ge=1),
+                        cursor: Optional[str] = None,
+                        db: AsyncNoSqlDb = Depends(get_async_db_provider),
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
     logger.debug("Received request to retrieve all run")
-    ret = safe_invoke("continuous_mfa.services.run_service", "get_all_run", [db, user])
+    if filter_ or fields or limit or cursor:
+        try:
+            filters = parse_filters(filter_)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        field_list = [field for field in fields.split(",") if field] if fields else None
+        page = await safe_invoke_async("continuous_mfa.services.run_service", "query_run", [filters, field_list, limit, cursor, db, user])
+        items = page["items"] if field_list else [Run.model_validate(item) for item in page["items"]]
+        headers = {"X-Next-Cursor": page["cursor"]} if page["cursor"] else None
+        return JSONResponse(content=jsonable_encoder(items), headers=headers)
+    if stream:
+        items = await safe_invoke_async("continuous_mfa.services.run_service", "iter_run", [db, user])
+        return stream_items(items or [], Run, stream)
+    ret = await safe_invoke_async("continuous_mfa.services.run_service", "get_all_run", [db, user])
     return ret
 
 # read - Retrieve a single item
 @router.get("/run/{id}", response_model=Run)
-def get_run(id: str, 
-                     db: NoSqlDb = Depends(get_db_provider), 
+async def get_run(id: str, 
+                     db: AsyncNoSqlDb = Depends(get_async_db_provider), 
                      user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
     logger.debug(f"Received request to retrieve run with id: {id}")
-    ret =safe_invoke("continuous_mfa.services.run_service", "get_run", [id, db, user])
+    ret = await safe_invoke_async("continuous_mfa.services.run_service", "get_run", [id, db, user])
     if not ret:
         raise HTTPException(status_code=404, detail="Item not found")
     logger.info(f"Retrieved run: {ret}")
@@ -84,10 +115,9 @@ def update_run(id: str,
                         db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("run", id)
     logger.debug(f"Received request to update run with id {id}: {updated_item}")
     ret = safe_invoke("continuous_mfa.services.run_service", "update_run", [id, updated_item, db, q, user])
-    if not item:
+    if not ret:
         logger.warning(f"Run with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
     return ret
@@ -104,3 +134,32 @@ def delete_run(id: str,
         logger.warning(f"Run with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
     return ret
+
+# write - Create many items in one call
+@router.post("/runs/bulk", response_model=List[Run])
+def create_runs(items: List[Run], 
+                        db: NoSqlDb = Depends(get_db_provider), 
+                        q: QueueClient = Depends(get_queue), 
+                        user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
+    logger.debug(f"Received request to create {len(items)} runs")
+    ret = safe_invoke("continuous_mfa.services.run_service", "create_runs", [items, db, q, user])
+    return ret
+
+# read - Retrieve many items by id in one call
+@router.post("/runs/bulk-get", response_model=List[Run])
+async def get_runs(ids: List[str] = Body(...), 
+                        db: AsyncNoSqlDb = Depends(get_async_db_provider), 
+                        user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
+    logger.debug(f"Received request to retrieve {len(ids)} runs")
+    ret = await safe_invoke_async("continuous_mfa.services.run_service", "get_runs", [ids, db, user])
+    return ret
+
+# write - Delete many items by id in one call
+@router.post("/runs/bulk-delete", response_model=List[Run])
+def delete_runs(ids: List[str] = Body(...), 
+                        db: NoSqlDb = Depends(get_db_provider), 
+                        q: QueueClient = Depends(get_queue), 
+                        user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
+    logger.debug(f"Received request to delete {len(ids)} runs")
+    ret = safe_invoke("continuous_mfa.services.run_service", "delete_runs", [ids, db, q, user])
+    return ret
@@ -1,5 +1,6 @@
 import importlib
 import importlib.util
+import inspect
 
 def invoker(module_name, function_name, parameters=None):
     """
@@ -64,6 +65,24 @@ def safe_invoke(module_name, function_name, parameters=None):
     # If the module and function exist, invoke the function
     return invoker(module_name, function_name, parameters)
 
+async def safe_invoke_async(module_name, function_name, parameters=None):
+    """
+    Like safe_invoke, for callers running on an event loop: awaits the result when it is awaitable,
+    e.g. from an async function or a function passing on an AsyncNoSqlDb call.
+
+    Args:
+        module_name (str): The name of the module.
+        function_name (str): The name of the function.
+        parameters (list, optional): A list of parameters to pass to the function.
+
+    Returns:
+        The (awaited) result of the function call, or None if the module or function does not exist.
+    """
+    result = safe_invoke(module_name, function_name, parameters)
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
 # Example Usage:
 if __name__ == "__main__":
     # Example 1: Calling math.sqrt with a parameter of 16.
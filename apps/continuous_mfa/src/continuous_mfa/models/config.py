@@ -6,7 +6,14 @@ class Config(BaseModel):
     id: Optional[str] = Field(None, example="123e4567-e89b-12d3-a456-426614174000")
     ssl_enabled: Optional[bool] = Field(False, description="Enable SSL", example=True)
     auth_enabled: Optional[bool] = Field(False, description="Enable authentication", example=True)
-    database_type: Literal["tinydb", "dynamodb"] = Field("tinydb", description="Database type", example="dynamodb")
+    database_type: Literal["tinydb", "dynamodb", "logdb", "sqlite"] = Field("tinydb", description="Database type", example="dynamodb")
+    tinydb_cache: Optional[bool] = Field(False, description="Keep TinyDB tables in memory and write behind", example=True)
+    indexes: Optional[dict[str, list[str]]] = Field(None, description="Secondary indexes per table", example={"run": ["user_id"]})
+    cache_tables: Optional[list[str]] = Field(None, description="Tables served through the read-through cache", example=["user"])
+    cache_ttl: Optional[float] = Field(30, description="Seconds a cached item stays valid", example=30)
+    ttl_tables: Optional[dict[str, float]] = Field(None, description="Seconds items live per table before they expire", example={"run": 2592000, "report": 2592000})
+    change_feed: Optional[bool] = Field(False, description="Record writes so components can watch tables instead of polling", example=True)
+    metrics_enabled: Optional[bool] = Field(True, description="Record database call metrics, served on /metrics", example=True)
     debug: Optional[bool] = Field(True, description="Enable debug mode", example=True)
     queue_type: Literal["local", "noop", "sqs", "azure"] = Field("local", description="Database type", example="local")
     port: Optional[int] = Field(8000, example=8000)
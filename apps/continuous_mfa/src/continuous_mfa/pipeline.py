@@ -127,12 +127,12 @@ async def start_queue_listener():
     logger.info(f"Listening on queue \"input\" of type '{settings.queue_type}'...")
     while True:
         # Receive and process messages
-        message = queue_client.receive_message()
+        message = await asyncio.to_thread(queue_client.receive_message)
         if message:
             logger.info(f"Received message: {message}")
             # Process the message (e.g., call specific handlers)
             # FIXME - aws uses an ID in the meta data
-            queue_client.delete_message(message["id"])
+            await asyncio.to_thread(queue_client.delete_message, message["id"])
 
             # load process-meta-data.json
 
@@ -3,6 +3,7 @@ from typing import List
 import uuid
 from queues.interface import QueueClient
 from database.interface import NoSqlDb
+from database.query import normalize_filters, query_items
 from continuous_mfa.models.config import Config
 from continuous_mfa.config import settings
 
@@ -34,6 +35,16 @@ def get_all_config(db: NoSqlDb, user: dict):
     logger.info("===============get_all_config called==============")
     return [settings]
 
+# read - stream all items
+def iter_config(db: NoSqlDb, user: dict):
+    logger.info("===============iter_config called==============")
+    return iter([settings])
+
+# read - query items (filter, projection, paging)
+def query_config(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_config called==============")
+    return query_items([("default", settings.model_dump())], normalize_filters(filters), fields, limit)
+
 # read - get an item
 def get_config(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_config called==============")
@@ -45,8 +56,7 @@ def get_config(id: str, db: NoSqlDb, user: dict):
 def update_config(id: str, new_item: Config, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_config called==============")
     logger.info(new_item)
-    db.update_item("config", id, new_item.model_dump())
-    return db.get_item("config", id)
+    return db.update_item("config", id, new_item.model_dump())
 
 # write - delete an item
 def delete_config(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -57,4 +67,33 @@ def delete_config(id: str, db: NoSqlDb, q: QueueClient, user: dict):
         logger.warning(f"Config with id {id} not found")
         return None
     db.delete_item("config", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_configs(items: List[Config], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_configs called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("config", new_items)
+    logger.info(f"{len(created)} Config items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_configs(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_configs called==============")
+    return db.get_items("config", ids)
+
+# write - delete many items
+def delete_configs(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_configs called==============")
+    items = db.get_items("config", ids)
+    db.delete_items("config", [item["id"] for item in items])
+    return items
@@ -32,6 +32,16 @@ def get_all_input(db: NoSqlDb, user: dict):
     logger.info("===============get_all_input called==============")
     return db.get_all_items("input")
 
+# read - stream all items
+def iter_input(db: NoSqlDb, user: dict):
+    logger.info("===============iter_input called==============")
+    return db.iter_items("input")
+
+# read - query items (filter, projection, paging)
+def query_input(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_input called==============")
+    return db.query("input", filters, fields, limit, cursor)
+
 # read - get an item
 def get_input(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_input called==============")
@@ -43,8 +53,7 @@ def get_input(id: str, db: NoSqlDb, user: dict):
 def update_input(id: str, new_item: Input, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_input called==============")
     logger.info(new_item)
-    db.update_item("input", id, new_item.model_dump())
-    return db.get_item("input", id)
+    return db.update_item("input", id, new_item.model_dump())
 
 # write - delete an item
 def delete_input(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -55,4 +64,33 @@ def delete_input(id: str, db: NoSqlDb, q: QueueClient, user: dict):
         logger.warning(f"Input with id {id} not found")
         return None
     db.delete_item("input", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_inputs(items: List[Input], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_inputs called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("input", new_items)
+    logger.info(f"{len(created)} Input items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_inputs(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_inputs called==============")
+    return db.get_items("input", ids)
+
+# write - delete many items
+def delete_inputs(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_inputs called==============")
+    items = db.get_items("input", ids)
+    db.delete_items("input", [item["id"] for item in items])
+    return items
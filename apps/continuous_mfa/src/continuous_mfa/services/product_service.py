@@ -32,6 +32,16 @@ def get_all_product(db: NoSqlDb, user: dict):
     logger.info("===============get_all_product called==============")
     return db.get_all_items("product")
 
+# read - stream all items
+def iter_product(db: NoSqlDb, user: dict):
+    logger.info("===============iter_product called==============")
+    return db.iter_items("product")
+
+# read - query items (filter, projection, paging)
+def query_product(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_product called==============")
+    return db.query("product", filters, fields, limit, cursor)
+
 # read - get an item
 def get_product(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_product called==============")
@@ -43,8 +53,7 @@ def get_product(id: str, db: NoSqlDb, user: dict):
 def update_product(id: str, new_item: Product, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_product called==============")
     logger.info(new_item)
-    db.update_item("product", id, new_item.model_dump())
-    return db.get_item("product", id)
+    return db.update_item("product", id, new_item.model_dump())
 
 # write - delete an item
 def delete_product(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -55,4 +64,33 @@ def delete_product(id: str, db: NoSqlDb, q: QueueClient, user: dict):
         logger.warning(f"Product with id {id} not found")
         return None
     db.delete_item("product", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_products(items: List[Product], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_products called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("product", new_items)
+    logger.info(f"{len(created)} Product items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_products(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_products called==============")
+    return db.get_items("product", ids)
+
+# write - delete many items
+def delete_products(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_products called==============")
+    items = db.get_items("product", ids)
+    db.delete_items("product", [item["id"] for item in items])
+    return items
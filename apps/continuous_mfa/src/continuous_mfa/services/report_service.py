@@ -32,6 +32,16 @@ def get_all_report(db: NoSqlDb, user: dict):
     logger.info("===============get_all_report called==============")
     return db.get_all_items("report")
 
+# read - stream all items
+def iter_report(db: NoSqlDb, user: dict):
+    logger.info("===============iter_report called==============")
+    return db.iter_items("report")
+
+# read - query items (filter, projection, paging)
+def query_report(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_report called==============")
+    return db.query("report", filters, fields, limit, cursor)
+
 # read - get an item
 def get_report(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_report called==============")
@@ -43,8 +53,7 @@ def get_report(id: str, db: NoSqlDb, user: dict):
 def update_report(id: str, new_item: Report, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_report called==============")
     logger.info(new_item)
-    db.update_item("report", id, new_item.model_dump())
-    return db.get_item("report", id)
+    return db.update_item("report", id, new_item.model_dump())
 
 # write - delete an item
 def delete_report(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -55,4 +64,33 @@ def delete_report(id: str, db: NoSqlDb, q: QueueClient, user: dict):
         logger.warning(f"Report with id {id} not found")
         return None
     db.delete_item("report", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_reports(items: List[Report], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_reports called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("report", new_items)
+    logger.info(f"{len(created)} Report items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_reports(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_reports called==============")
+    return db.get_items("report", ids)
+
+# write - delete many items
+def delete_reports(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_reports called==============")
+    items = db.get_items("report", ids)
+    db.delete_items("report", [item["id"] for item in items])
+    return items
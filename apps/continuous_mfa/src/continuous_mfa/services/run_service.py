@@ -32,6 +32,16 @@ def get_all_run(db: NoSqlDb, user: dict):
     logger.info("===============get_all_run called==============")
     return db.get_all_items("run")
 
+# read - stream all items
+def iter_run(db: NoSqlDb, user: dict):
+    logger.info("===============iter_run called==============")
+    return db.iter_items("run")
+
+# read - query items (filter, projection, paging)
+def query_run(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_run called==============")
+    return db.query("run", filters, fields, limit, cursor)
+
 # read - get an item
 def get_run(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_run called==============")
@@ -43,8 +53,7 @@ def get_run(id: str, db: NoSqlDb, user: dict):
 def update_run(id: str, new_item: Run, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_run called==============")
     logger.info(new_item)
-    db.update_item("run", id, new_item.model_dump())
-    return db.get_item("run", id)
+    return db.update_item("run", id, new_item.model_dump())
 
 # write - delete an item
 def delete_run(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -55,4 +64,33 @@ def delete_run(id: str, db: NoSqlDb, q: QueueClient, user: dict):
         logger.warning(f"Run with id {id} not found")
         return None
     db.delete_item("run", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_runs(items: List[Run], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_runs called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("run", new_items)
+    logger.info(f"{len(created)} Run items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_runs(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_runs called==============")
+    return db.get_items("run", ids)
+
+# write - delete many items
+def delete_runs(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_runs called==============")
+    items = db.get_items("run", ids)
+    db.delete_items("run", [item["id"] for item in items])
+    return items
@@ -52,6 +52,16 @@ def get_all_upload_file_content(db: NoSqlDb, user: dict):
     logger.info("===============get_all_upload_file_content called==============")
     return db.get_all_items("upload_file_content")
 
+# read - stream all items
+def iter_upload_file_content(db: NoSqlDb, user: dict):
+    logger.info("===============iter_upload_file_content called==============")
+    return db.iter_items("upload_file_content")
+
+# read - query items (filter, projection, paging)
+def query_upload_file_content(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_upload_file_content called==============")
+    return db.query("upload_file_content", filters, fields, limit, cursor)
+
 # read - get an item
 def get_upload_file_content(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_upload_file_content called==============")
@@ -63,8 +73,7 @@ def get_upload_file_content(id: str, db: NoSqlDb, user: dict):
 def update_upload_file_content(id: str, new_item: UploadFileContent, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_upload_file_content called==============")
     logger.info(new_item)
-    db.update_item("upload_file_content", id, new_item.model_dump())
-    return db.get_item("upload_file_content", id)
+    return db.update_item("upload_file_content", id, new_item.model_dump())
 
 # write - delete an item
 def delete_upload_file_content(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -75,4 +84,33 @@ def delete_upload_file_content(id: str, db: NoSqlDb, q: QueueClient, user: dict)
         logger.warning(f"UploadFileContent with id {id} not found")
         return None
     db.delete_item("upload_file_content", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_upload_file_contents(items: List[UploadFileContent], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_upload_file_contents called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("upload_file_content", new_items)
+    logger.info(f"{len(created)} UploadFileContent items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_upload_file_contents(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_upload_file_contents called==============")
+    return db.get_items("upload_file_content", ids)
+
+# write - delete many items
+def delete_upload_file_contents(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_upload_file_contents called==============")
+    items = db.get_items("upload_file_content", ids)
+    db.delete_items("upload_file_content", [item["id"] for item in items])
+    return items
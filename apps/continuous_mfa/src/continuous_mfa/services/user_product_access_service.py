@@ -32,6 +32,16 @@ def get_all_user_product_access(db: NoSqlDb, user: dict):
     logger.info("===============get_all_user_product_access called==============")
     return db.get_all_items("user_product_access")
 
+# read - stream all items
+def iter_user_product_access(db: NoSqlDb, user: dict):
+    logger.info("===============iter_user_product_access called==============")
+    return db.iter_items("user_product_access")
+
+# read - query items (filter, projection, paging)
+def query_user_product_access(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_user_product_access called==============")
+    return db.query("user_product_access", filters, fields, limit, cursor)
+
 # read - get an item
 def get_user_product_access(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_user_product_access called==============")
@@ -43,8 +53,7 @@ def get_user_product_access(id: str, db: NoSqlDb, user: dict):
 def update_user_product_access(id: str, new_item: UserProductAccess, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_user_product_access called==============")
     logger.info(new_item)
-    db.update_item("user_product_access", id, new_item.model_dump())
-    return db.get_item("user_product_access", id)
+    return db.update_item("user_product_access", id, new_item.model_dump())
 
 # write - delete an item
 def delete_user_product_access(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -55,4 +64,33 @@ def delete_user_product_access(id: str, db: NoSqlDb, q: QueueClient, user: dict)
         logger.warning(f"UserProductAccess with id {id} not found")
         return None
     db.delete_item("user_product_access", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_user_product_accesss(items: List[UserProductAccess], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_user_product_accesss called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("user_product_access", new_items)
+    logger.info(f"{len(created)} UserProductAccess items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_user_product_accesss(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_user_product_accesss called==============")
+    return db.get_items("user_product_access", ids)
+
+# write - delete many items
+def delete_user_product_accesss(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_user_product_accesss called==============")
+    items = db.get_items("user_product_access", ids)
+    db.delete_items("user_product_access", [item["id"] for item in items])
+    return items
@@ -32,6 +32,16 @@ def get_all_user(db: NoSqlDb, user: dict):
     logger.info("===============get_all_user called==============")
     return db.get_all_items("user")
 
+# read - stream all items
+def iter_user(db: NoSqlDb, user: dict):
+    logger.info("===============iter_user called==============")
+    return db.iter_items("user")
+
+# read - query items (filter, projection, paging)
+def query_user(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_user called==============")
+    return db.query("user", filters, fields, limit, cursor)
+
 # read - get an item
 def get_user(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_user called==============")
@@ -43,8 +53,7 @@ def get_user(id: str, db: NoSqlDb, user: dict):
 def update_user(id: str, new_item: User, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_user called==============")
     logger.info(new_item)
-    db.update_item("user", id, new_item.model_dump())
-    return db.get_item("user", id)
+    return db.update_item("user", id, new_item.model_dump())
 
 # write - delete an item
 def delete_user(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -55,4 +64,33 @@ def delete_user(id: str, db: NoSqlDb, q: QueueClient, user: dict):
         logger.warning(f"User with id {id} not found")
         return None
     db.delete_item("user", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_users(items: List[User], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_users called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("user", new_items)
+    logger.info(f"{len(created)} User items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_users(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_users called==============")
+    return db.get_items("user", ids)
+
+# write - delete many items
+def delete_users(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_users called==============")
+    items = db.get_items("user", ids)
+    db.delete_items("user", [item["id"] for item in items])
+    return items
@@ -0,0 +1,60 @@
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Type, Union
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _ndjson_lines(items: Iterable[Any], model: Type[BaseModel]) -> Iterator[str]:
+    """Serialize each item as one JSON document per line."""
+    for item in items:
+        yield model.model_validate(item).model_dump_json() + "\n"
+
+def _json_array_chunks(items: Iterable[Any], model: Type[BaseModel]) -> Iterator[str]:
+    """Serialize items as a JSON array, one element per chunk."""
+    yield "["
+    first = True
+    for item in items:
+        if not first:
+            yield ","
+        first = False
+        yield model.model_validate(item).model_dump_json()
+    yield "]"
+
+async def _ndjson_lines_async(items: AsyncIterable[Any], model: Type[BaseModel]) -> AsyncIterator[str]:
+    """Like _ndjson_lines, over an async iterable."""
+    async for item in items:
+        yield model.model_validate(item).model_dump_json() + "\n"
+
+async def _json_array_chunks_async(items: AsyncIterable[Any], model: Type[BaseModel]) -> AsyncIterator[str]:
+    """Like _json_array_chunks, over an async iterable."""
+    yield "["
+    first = True
+    async for item in items:
+        if not first:
+            yield ","
+        first = False
+        yield model.model_validate(item).model_dump_json()
+    yield "]"
+
+def stream_items(items: Union[Iterable[Any], AsyncIterable[Any]], model: Type[BaseModel], stream_format: str = "ndjson") -> StreamingResponse:
+    """
+    Send items to the client as they are read instead of building the whole list in memory.
+
+    :param items: An iterable of items, typically from NoSqlDb.iter_items(), or an async iterable,
+        typically from AsyncNoSqlDb.iter_items(), read on the event loop.
+    :param model: The pydantic model used to validate and serialize each item.
+    :param stream_format: "ndjson" for one JSON document per line or "json" for a chunked JSON array.
+    :return: A StreamingResponse.
+    """
+    logger.debug(f"Streaming {model.__name__} items as {stream_format}")
+    if hasattr(items, "__aiter__"):
+        json_chunks, ndjson_lines = _json_array_chunks_async, _ndjson_lines_async
+    else:
+        json_chunks, ndjson_lines = _json_array_chunks, _ndjson_lines
+    if stream_format == "json":
+        return StreamingResponse(json_chunks(items, model), media_type="application/json")
+    return StreamingResponse(ndjson_lines(items, model), media_type=NDJSON_MEDIA_TYPE)
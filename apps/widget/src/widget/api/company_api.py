@@ -91,14 +91,12 @@ def update_company(id: str,
                         updated_item: Company, db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("company", id)
     logger.info(f"Received request to update company with id {id}: {updated_item}")
-    if not item:
+    updated = db.update_item("company", id, updated_item.model_dump())
+    if not updated:
         logger.warning(f"Company with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    db.update_item("company", id, updated_item.model_dump())
-    return db.get_item("company", id)
+    return updated
 
 # write - Delete an item
 @router.delete("/company/{id}")
@@ -106,8 +104,7 @@ def delete_company(id: str,
                         db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("company", id)
-    if not item:
+    if not db.exists("company", id):
         logger.warning(f"Company with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
     db.delete_item("company", id)
@@ -91,14 +91,12 @@ def update_config(id: str,
                         updated_item: Config, db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("config", id)
     logger.info(f"Received request to update config with id {id}: {updated_item}")
-    if not item:
+    updated = db.update_item("config", id, updated_item.model_dump())
+    if not updated:
         logger.warning(f"Config with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    db.update_item("config", id, updated_item.model_dump())
-    return db.get_item("config", id)
+    return updated
 
 # write - Delete an item
 @router.delete("/config/{id}")
@@ -106,8 +104,7 @@ def delete_config(id: str,
                         db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("config", id)
-    if not item:
+    if not db.exists("config", id):
         logger.warning(f"Config with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
     db.delete_item("config", id)
@@ -91,14 +91,12 @@ def update_role(id: str,
                         updated_item: Role, db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("role", id)
     logger.info(f"Received request to update role with id {id}: {updated_item}")
-    if not item:
+    updated = db.update_item("role", id, updated_item.model_dump())
+    if not updated:
         logger.warning(f"Role with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    db.update_item("role", id, updated_item.model_dump())
-    return db.get_item("role", id)
+    return updated
 
 # write - Delete an item
 @router.delete("/role/{id}")
@@ -106,8 +104,7 @@ def delete_role(id: str,
                         db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("role", id)
-    if not item:
+    if not db.exists("role", id):
         logger.warning(f"Role with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
     db.delete_item("role", id)
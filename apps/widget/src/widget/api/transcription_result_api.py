@@ -91,14 +91,12 @@ def update_transcription_result(id: str,
                         updated_item: Transcription_result, db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("transcription_result", id)
     logger.info(f"Received request to update transcription_result with id {id}: {updated_item}")
-    if not item:
+    updated = db.update_item("transcription_result", id, updated_item.model_dump())
+    if not updated:
         logger.warning(f"Transcription_result with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    db.update_item("transcription_result", id, updated_item.model_dump())
-    return db.get_item("transcription_result", id)
+    return updated
 
 # write - Delete an item
 @router.delete("/transcription-result/{id}")
@@ -106,8 +104,7 @@ def delete_transcription_result(id: str,
                         db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("transcription_result", id)
-    if not item:
+    if not db.exists("transcription_result", id):
         logger.warning(f"Transcription_result with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
     db.delete_item("transcription_result", id)
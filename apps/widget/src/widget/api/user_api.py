@@ -91,14 +91,12 @@ def update_user(id: str,
                         updated_item: User, db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("user", id)
     logger.info(f"Received request to update user with id {id}: {updated_item}")
-    if not item:
+    updated = db.update_item("user", id, updated_item.model_dump())
+    if not updated:
         logger.warning(f"User with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    db.update_item("user", id, updated_item.model_dump())
-    return db.get_item("user", id)
+    return updated
 
 # write - Delete an item
 @router.delete("/user/{id}")
@@ -106,8 +104,7 @@ def delete_user(id: str,
                         db: NoSqlDb = Depends(get_db_provider), 
                         q: QueueClient = Depends(get_queue), 
                         user: dict = Depends(require_role([]) if settings.auth_enabled else no_role_required)):
-    item = db.get_item("user", id)
-    if not item:
+    if not db.exists("user", id):
         logger.warning(f"User with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
     db.delete_item("user", id)
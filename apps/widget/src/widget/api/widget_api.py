@@ -45,20 +45,17 @@ def get_widget(id: str):
 # Update an item (without modifying ID)
 @router.put("/widget/{id}", response_model=WidgetResponse)
 def update_widget(id: str, updated_item: Widget):
-    item = db.get_item("widget", id)
     logger.info(f"Received request to update widget with id {id}: {updated_item}")
-    if not item:
+    updated = db.update_item("widget", id, updated_item.dict())
+    if not updated:
         logger.warning(f"Widget with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    db.update_item("widget", id, updated_item.dict())
-    return db.get_item("widget", id)
+    return updated
 
 # Delete an item
 @router.delete("/widget/{id}")
 def delete_widget(id: str):
-    item = db.get_item("widget", id)
-    if not item:
+    if not db.exists("widget", id):
         logger.warning(f"Widget with id {id} not found")
         raise HTTPException(status_code=404, detail="Item not found")
     db.delete_item("widget", id)
@@ -1,5 +1,5 @@
 import logging
-from fastapi import FastAPI, Request, Depends, HTTPException, Security
+from fastapi import FastAPI, Request, Depends, HTTPException, Security, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from .error_util import log_exception, create_error_response
@@ -7,6 +7,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2Pas
 from typing import List, Optional
 from widget.config import settings
 from auth.factory import get_auth_provider
+from database.factory import reset_async_databases, reset_databases
+from database.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
 from .config import config_provider
 import jwt
 import time
@@ -40,6 +42,19 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     return create_error_response(detail="Invalid request data.", status_code=422)
 
 
+@app.on_event("shutdown")
+async def shutdown_databases():
+    """Close the shared database instances when the app stops, the async ones first: they may run on the sync ones."""
+    await reset_async_databases()
+    reset_databases()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Database call metrics in the Prometheus text format."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 # Allow all CORS for development
 app.add_middleware(
     CORSMiddleware,
@@ -6,6 +6,7 @@ class Config(BaseModel):
     id: Optional[str] = Field(None, example="123e4567-e89b-12d3-a456-426614174000")
     auth_enabled: Optional[bool] = Field(False, description="Enable authentication", example=True)
     database_type: Literal["tinydb", "dynamodb"] = Field("tinydb", description="Database type", example="dynamodb")
+    metrics_enabled: Optional[bool] = Field(True, description="Record database call metrics, served on /metrics", example=True)
     debug: Optional[bool] = Field(True, description="Enable debug mode", example=True)
     queue_type: Literal["local", "sqs"] = Field("local", description="Database type", example="local")
     port: Optional[int] = Field(None, example=8000)
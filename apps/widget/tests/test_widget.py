@@ -42,3 +42,9 @@ def test_delete_item():
 
     get_response = client.get(f"/v1/widget/{item_id}")
     assert get_response.status_code == 404
+
+def test_metrics():
+    client.get("/v1/widgets")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
@@ -1,5 +1,5 @@
 from typing import Dict
-import boto3
+from aws_clients import get_client
 from botocore.exceptions import BotoCoreError, ClientError
 from .interface import AuthProvider
 from typing import Optional
@@ -9,7 +9,7 @@ class CognitoAuthProvider(AuthProvider):
 
 
     def __init__(self, config: Dict[str, str]):
-        self.client = boto3.client("cognito-idp")
+        self.client = get_client("cognito-idp", config)
         self.config = config
         self.user_pool_id = config.get("user_pool_id")
         self.client_id = config.get("client_id")
@@ -55,7 +55,7 @@ class LocalAuthProvider(AuthProvider):
             logger.warning("no users cannot do authentication")
             return
         """Ensure the users table exists and create a default admin user if empty."""
-        if not self.database.get_all_items(USERS_TABLE):
+        if self.database.count(USERS_TABLE) == 0:
             logger.info("Initializing default admin user.")
             admin_password_hash = self._hash_password("borkborkbork123")
             self.database.insert_item(
@@ -121,16 +121,18 @@ class LocalAuthProvider(AuthProvider):
         logger.info(f"Authenticating user: {username}")
         user = self.database.get_item(USERS_TABLE, username)
         if user:
-            user["login_count"] = user.get("login_count", 0) + 1
-            self.database.update_item(USERS_TABLE, username, user)
-            if user["password_hash"] == self._hash_password(password):
-                token = self._generate_jwt(username)
-                user["token"] = token
-                user["last_login"] = int(datetime.utcnow().timestamp() * 1000)
-                self.database.update_item(USERS_TABLE, username, user)
-                return token
-            else:
-                self.database.update_item(USERS_TABLE, username, {"last_unsuccessful_login": int(datetime.utcnow().timestamp() * 1000)})
+            # The login counter and the login outcome are written as one update
+            with self.database.batch() as batch:
+                user["login_count"] = user.get("login_count", 0) + 1
+                batch.update_item(USERS_TABLE, username, user)
+                if user["password_hash"] == self._hash_password(password):
+                    token = self._generate_jwt(username)
+                    user["token"] = token
+                    user["last_login"] = int(datetime.utcnow().timestamp() * 1000)
+                    batch.update_item(USERS_TABLE, username, user)
+                    return token
+                else:
+                    batch.update_item(USERS_TABLE, username, {"last_unsuccessful_login": int(datetime.utcnow().timestamp() * 1000)})
         return None
 
     def get_user(self, token: str) -> Optional[dict]:
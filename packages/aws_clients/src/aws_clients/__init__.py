@@ -0,0 +1,2 @@
+"""aws_clients package."""
+from .clients import config_kwargs, get_client, get_resource, reset_clients
@@ -0,0 +1,127 @@
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_RETRY_MODE = "standard"
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 60
+
+# Process-wide caches of sessions and clients/resources, keyed by credentials and settings
+_sessions: Dict[Tuple, boto3.Session] = {}
+_clients: Dict[Tuple, Any] = {}
+# boto3 sessions are not thread safe, so sessions, clients and resources are created under this lock
+_lock = threading.Lock()
+
+
+def _setting(config: Dict[str, Any], key: str, default: Any) -> Any:
+    value = config.get(key)
+    return default if value is None else value
+
+
+def config_kwargs(config: Optional[Dict[str, Any]] = None, **overrides) -> Dict[str, Any]:
+    """
+    Build the botocore Config arguments (pool size, retries, timeouts, keep-alive) from the
+    aws_* keys of a config. Also usable with aiobotocore's AioConfig.
+
+    :param config: A config holding the optional aws_max_pool_connections, aws_retry_mode,
+        aws_max_attempts, aws_connect_timeout, aws_read_timeout and aws_tcp_keepalive keys.
+    :param overrides: Config arguments taking precedence over the config.
+    """
+    config = config or {}
+    kwargs = {
+        "max_pool_connections": int(_setting(config, "aws_max_pool_connections", DEFAULT_MAX_POOL_CONNECTIONS)),
+        "retries": {
+            "mode": _setting(config, "aws_retry_mode", DEFAULT_RETRY_MODE),
+            "max_attempts": int(_setting(config, "aws_max_attempts", DEFAULT_MAX_ATTEMPTS)),
+        },
+        "connect_timeout": float(_setting(config, "aws_connect_timeout", DEFAULT_CONNECT_TIMEOUT)),
+        "read_timeout": float(_setting(config, "aws_read_timeout", DEFAULT_READ_TIMEOUT)),
+        "tcp_keepalive": bool(_setting(config, "aws_tcp_keepalive", True)),
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+def _credentials(config: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    return config.get("region_name"), config.get("aws_access_key_id"), config.get("aws_secret_access_key")
+
+
+def _session(region_name: Optional[str], access_key: Optional[str], secret_key: Optional[str]) -> boto3.Session:
+    """Return the cached session of a region and credentials. Call with _lock held."""
+    key = (region_name, access_key, secret_key)
+    session = _sessions.get(key)
+    if session is None:
+        session = boto3.Session(
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region_name,
+        )
+        _sessions[key] = session
+    return session
+
+
+def _get(kind: str, service: str, config: Optional[Dict[str, Any]], overrides: Dict[str, Any]) -> Any:
+    config = config or {}
+    region_name, access_key, secret_key = _credentials(config)
+    if not (access_key and secret_key):
+        access_key = secret_key = None  # Partial credentials fall back to the default chain
+    kwargs = config_kwargs(config, **overrides)
+    key = (kind, service, region_name, access_key, secret_key, repr(sorted(kwargs.items())))
+    cached = _clients.get(key)
+    if cached is not None:
+        return cached
+    with _lock:
+        cached = _clients.get(key)
+        if cached is None:
+            session = _session(region_name, access_key, secret_key)
+            create = session.client if kind == "client" else session.resource
+            cached = create(service, config=Config(**kwargs))
+            _clients[key] = cached
+            logger.info(f"Created shared {service} {kind} (region {region_name}, pool {kwargs['max_pool_connections']})")
+    return cached
+
+
+def get_client(service: str, config: Optional[Dict[str, Any]] = None, **overrides) -> Any:
+    """
+    Return the shared boto3 client of a service. Clients are thread safe and cached per service,
+    region, credentials and settings, so callers with the same settings share one connection pool.
+
+    :param service: The AWS service name, e.g. "s3".
+    :param config: A config holding the optional region_name, aws_access_key_id,
+        aws_secret_access_key and aws_* tuning keys (see config_kwargs).
+    :param overrides: botocore Config arguments taking precedence over the config.
+    :return: A boto3 client.
+    """
+    return _get("client", service, config, overrides)
+
+
+def get_resource(service: str, config: Optional[Dict[str, Any]] = None, **overrides) -> Any:
+    """
+    Return the shared boto3 resource of a service, cached like get_client. Resources are not
+    thread safe: use `resource.meta.client` from worker threads.
+    """
+    return _get("resource", service, config, overrides)
+
+
+def reset_clients() -> None:
+    """
+    Drop every cached session, client and resource (e.g. after credentials rotate, or in tests)
+    and close their connection pools. Callers of get_client/get_resource never close the shared
+    clients themselves; this is the one place they are closed.
+    """
+    with _lock:
+        for (kind, *_), cached in _clients.items():
+            client = cached if kind == "client" else cached.meta.client
+            try:
+                client.close()
+            except Exception:
+                logger.exception("Failed to close shared AWS client")
+        _clients.clear()
+        _sessions.clear()
@@ -0,0 +1,45 @@
+import threading
+from aws_clients import config_kwargs, get_client, get_resource, reset_clients
+
+CONFIG = {"region_name": "us-east-1", "aws_access_key_id": "x", "aws_secret_access_key": "x"}
+
+
+def setup_function():
+    reset_clients()
+
+
+def test_clients_are_shared_per_settings():
+    client = get_client("s3", CONFIG)
+    assert get_client("s3", dict(CONFIG)) is client
+    assert get_client("s3", dict(CONFIG, region_name="eu-west-1")) is not client
+    assert get_client("sqs", CONFIG) is not client
+    assert get_resource("s3", CONFIG).meta.client is not client
+
+
+def test_tuning_is_applied():
+    client = get_client("dynamodb", dict(CONFIG, aws_max_pool_connections=64, aws_retry_mode="adaptive", aws_read_timeout=10))
+    assert client.meta.config.max_pool_connections == 64
+    assert client.meta.config.retries["mode"] == "adaptive"
+    assert client.meta.config.read_timeout == 10
+    assert get_client("dynamodb", CONFIG, max_pool_connections=64) is not client
+    assert config_kwargs({}, max_pool_connections=8)["max_pool_connections"] == 8
+
+
+def test_concurrent_callers_get_one_client():
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(get_client("s3", CONFIG))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(client is clients[0] for client in clients)
+
+
+def test_reset_closes_the_dropped_clients():
+    client, resource = get_client("s3", CONFIG), get_resource("dynamodb", CONFIG)
+    closed = []
+    client.close = lambda: closed.append("s3")
+    resource.meta.client.close = lambda: closed.append("dynamodb")
+    reset_clients()
+    assert sorted(closed) == ["dynamodb", "s3"]
+    assert get_client("s3", CONFIG) is not client
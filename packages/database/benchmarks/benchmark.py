@@ -0,0 +1,271 @@
+"""
+Benchmarks of the NoSqlDb backends.
+
+Runs insert / insert_items / get / update / search_by_key_part / get_all workloads against each
+backend and table size, each case in a fresh process so its peak RSS can be measured, and writes
+the results as JSON. S3 and DynamoDB run against moto's in-process mocks.
+
+    python benchmarks/benchmark.py --backends tinydb,filesystem --sizes 1000,100000 \\
+        --output results.json --baseline benchmarks/baseline.json
+
+Per case, `--ops` single-item calls are timed (the remaining items of the table are loaded with
+timed insert_items batches), so large tables stay practical on slow backends.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+BACKENDS = ("tinydb", "filesystem", "logdb", "sqlite", "s3", "dynamodb")
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_OPS = 1000
+# Items per insert_items call while loading a table
+BATCH_SIZE = 1000
+# A search prefix matches this many consecutive keys
+SEARCH_SPAN = 100
+TABLE = "bench"
+REGION = "us-east-1"
+
+
+def _key(i: int) -> str:
+    return f"item-{i:07d}"
+
+
+def _item(i: int) -> Dict[str, Any]:
+    return {"id": _key(i), "user_id": f"user-{i % 100}", "n": i, "text": "x" * 200}
+
+
+def _summarize(latencies: List[float], items: Optional[int] = None) -> Dict[str, Any]:
+    """Summarize per-call latencies (seconds) as ops/sec, items/sec and p50/p99 in milliseconds."""
+    if not latencies:
+        return {"ops": 0}
+    latencies = sorted(latencies)
+    total = sum(latencies) or 1e-9
+
+    def percentile(q: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 4)
+
+    summary = {"ops": len(latencies), "ops_per_sec": round(len(latencies) / total, 2), "p50_ms": percentile(0.5), "p99_ms": percentile(0.99)}
+    if items is not None:
+        summary["items_per_sec"] = round(items / total, 2)
+    return summary
+
+
+def _timed(fn: Callable, calls: List[tuple]) -> List[float]:
+    latencies = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@contextmanager
+def _open_backend(backend: str, directory: str, overrides: Dict[str, Any]) -> Iterator[Any]:
+    """Create a backend on an empty store: a temp directory, or moto mocks for S3 and DynamoDB."""
+    from database.factory import get_database, reset_databases
+
+    config = {"database_type": backend, "base_dir": directory, "sqlite_path": os.path.join(directory, "bench.db")}
+    if backend in ("s3", "dynamodb"):
+        import boto3
+        from moto import mock_aws
+
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+        config.update(region_name=REGION, bucket_name="benchmark")
+        mock = mock_aws()
+        mock.start()
+        if backend == "s3":
+            boto3.client("s3", region_name=REGION).create_bucket(Bucket="benchmark")
+        else:
+            boto3.client("dynamodb", region_name=REGION).create_table(
+                TableName=TABLE,
+                KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+    else:
+        mock = None
+    config.update(overrides)
+    try:
+        yield get_database(lambda: config)
+    finally:
+        reset_databases()
+        if mock is not None:
+            mock.stop()
+
+
+def run_case(backend: str, size: int, ops: int, seed: int, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Run every workload on one backend and table size. Meant to run in a fresh process."""
+    import logging
+
+    logging.disable(logging.WARNING)  # The backends log (and some print) every call
+    sys.stdout = open(os.devnull, "w")
+    rng = random.Random(seed)
+    single = min(size, ops)
+    workloads = {}
+    with tempfile.TemporaryDirectory(prefix="nosqldb-bench-") as directory, _open_backend(backend, directory, overrides) as db:
+        workloads["insert"] = _summarize(_timed(db.insert_item, [(TABLE, _key(i), _item(i)) for i in range(single)]))
+        batches = [
+            (TABLE, {_key(i): _item(i) for i in range(start, min(start + BATCH_SIZE, size))})
+            for start in range(single, size, BATCH_SIZE)
+        ]
+        workloads["insert_items"] = _summarize(_timed(db.insert_items, batches), items=size - single)
+
+        keys = [_key(rng.randrange(size)) for _ in range(ops)]
+        workloads["get"] = _summarize(_timed(db.get_item, [(TABLE, key) for key in keys]))
+        workloads["update"] = _summarize(_timed(db.update_item, [(TABLE, key, {"n": -1}) for key in keys]))
+
+        searches = max(1, ops // SEARCH_SPAN)
+        prefix_length = len(_key(0)) - len(str(SEARCH_SPAN - 1))
+        prefixes = [_key(rng.randrange(size))[:prefix_length] for _ in range(searches)]
+        matched = 0
+
+        def search(prefix: str) -> None:
+            nonlocal matched
+            matched += len(db.search_by_key_part(TABLE, prefix))
+
+        latencies = _timed(search, [(prefix,) for prefix in prefixes])
+        workloads["search_by_key_part"] = _summarize(latencies, items=matched)
+        repeats = 3 if size <= 100000 else 1
+        workloads["get_all"] = _summarize(_timed(db.get_all_items, [(TABLE,)] * repeats), items=size * repeats)
+    return {"backend": backend, "size": size, "config": overrides, "workloads": workloads, "peak_rss_mb": _peak_rss_mb()}
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Compare ops/sec with a baseline run. Returns one row per (backend, size, workload) found in
+    both, flagged as a regression when throughput dropped by more than `tolerance`.
+    """
+    previous = {
+        (case["backend"], case["size"], name): summary
+        for case in baseline.get("results", [])
+        for name, summary in case.get("workloads", {}).items()
+    }
+    rows = []
+    for case in results:
+        for name, summary in case.get("workloads", {}).items():
+            before = previous.get((case["backend"], case["size"], name))
+            if not before or not before.get("ops_per_sec") or not summary.get("ops_per_sec"):
+                continue
+            ratio = summary["ops_per_sec"] / before["ops_per_sec"]
+            rows.append({
+                "backend": case["backend"],
+                "size": case["size"],
+                "workload": name,
+                "baseline_ops_per_sec": before["ops_per_sec"],
+                "ops_per_sec": summary["ops_per_sec"],
+                "ratio": round(ratio, 3),
+                "regression": ratio < 1 - tolerance,
+            })
+    return rows
+
+
+def _parse_overrides(values: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Parse --set BACKEND.KEY=VALUE options; values are JSON when they parse as JSON."""
+    overrides: Dict[str, Dict[str, Any]] = {}
+    for value in values:
+        name, _, raw = value.partition("=")
+        backend, _, key = name.partition(".")
+        if not key or not raw:
+            raise argparse.ArgumentTypeError(f"Expected BACKEND.KEY=VALUE, got {value!r}")
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            parsed = raw
+        overrides.setdefault(backend, {})[key] = parsed
+    return overrides
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the NoSqlDb backends.")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma separated backends to run.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma separated table sizes, e.g. 1000,1000000.")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="Timed single-item calls per workload.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--set", action="append", default=[], metavar="BACKEND.KEY=VALUE", help="Extra backend config, e.g. tinydb.tinydb_cache=true.")
+    parser.add_argument("--output", help="Write the results JSON here instead of stdout.")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed ops/sec drop against the baseline. Defaults to 0.2.")
+    parser.add_argument("--save-baseline", help="Also write the results to this baseline file.")
+    args = parser.parse_args(argv)
+
+    backends = [backend for backend in args.backends.split(",") if backend]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    overrides = _parse_overrides(args.set)
+
+    results = []
+    for backend in backends:
+        for size in sizes:
+            print(f"Running {backend} with {size} items...", file=sys.stderr)
+            # One process per case, so peak RSS and caches are not shared between cases
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                try:
+                    case = executor.submit(run_case, backend, size, args.ops, args.seed, overrides.get(backend, {})).result()
+                except ImportError as e:  # e.g. moto is not installed
+                    case = {"backend": backend, "size": size, "skipped": str(e)}
+            results.append(case)
+            for name, summary in case.get("workloads", {}).items():
+                print(
+                    f"  {name:<20} {summary.get('ops_per_sec', 0):>12,.1f} ops/s"
+                    f"  p50 {summary.get('p50_ms', 0):>9.3f} ms  p99 {summary.get('p99_ms', 0):>9.3f} ms",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ops": args.ops,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["comparison"] = compare(results, json.load(f), args.tolerance)
+        regressions = [row for row in report["comparison"] if row["regression"]]
+        for row in regressions:
+            print(
+                f"REGRESSION {row['backend']} {row['size']} {row['workload']}: "
+                f"{row['ops_per_sec']:,.1f} ops/s vs {row['baseline_ops_per_sec']:,.1f} baseline",
+                file=sys.stderr,
+            )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
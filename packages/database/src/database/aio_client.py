@@ -0,0 +1,87 @@
+import asyncio
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+from aws_clients import config_kwargs
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session
+except ImportError:  # Optional dependency, installed with the "async" extra
+    AioConfig = None
+    get_session = None
+
+
+def aiobotocore_available() -> bool:
+    """Whether the native async S3 and DynamoDB backends can be used."""
+    return get_session is not None
+
+
+class _LoopClient:
+    """The client of one event loop."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.context = None
+        self.client = None
+
+
+class AioClient:
+    """
+    Lazily created aiobotocore clients, one per event loop.
+
+    aiobotocore clients are bound to the event loop that created them, so each loop using the
+    database (the app's loop, a SyncNoSqlDb's loop, successive asyncio.run calls) gets its own
+    client, created on first use.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        config: Dict[str, Any],
+        max_pool_connections: int = 10,
+        setup: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        :param service: The AWS service name, e.g. "s3".
+        :param config: Database config holding the optional region_name, aws_access_key_id,
+            aws_secret_access_key and aws_* tuning keys (see aws_clients.config_kwargs).
+        :param max_pool_connections: Minimum size of the client's connection pool.
+        :param setup: Called with each new client, e.g. to register event handlers.
+        """
+        if get_session is None:
+            raise ImportError(f"Native async {service} access requires aiobotocore: pip install 'database[async]'")
+        self.service = service
+        access_key, secret_key = config.get("aws_access_key_id"), config.get("aws_secret_access_key")
+        if not (access_key and secret_key):
+            access_key = secret_key = None  # Partial credentials fall back to the default chain, like aws_clients
+        pool_size = max(max_pool_connections, config_kwargs(config)["max_pool_connections"])
+        self.kwargs = {
+            "region_name": config.get("region_name"),
+            "aws_access_key_id": access_key,
+            "aws_secret_access_key": secret_key,
+            "config": AioConfig(**config_kwargs(config, max_pool_connections=pool_size)),
+        }
+        self.setup = setup
+        self._session = get_session()
+        # Keyed weakly: the client of a loop that was closed without closing it goes with the loop
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClient]" = weakref.WeakKeyDictionary()
+
+    async def get(self) -> Any:
+        """Return the client of the running event loop, creating it on first use."""
+        # Only the running loop's thread adds its entry, so no lock is needed around the lookup
+        state = self._clients.setdefault(asyncio.get_running_loop(), _LoopClient())
+        async with state.lock:
+            if state.client is None:
+                state.context = self._session.create_client(self.service, **self.kwargs)
+                client = await state.context.__aenter__()
+                if self.setup is not None:
+                    self.setup(client)
+                state.client = client
+        return state.client
+
+    async def close(self) -> None:
+        """Close the running event loop's client; the clients of other loops cannot be closed from it."""
+        state = self._clients.pop(asyncio.get_running_loop(), None)
+        if state is not None and state.client is not None:
+            await state.context.__aexit__(None, None, None)
@@ -0,0 +1,332 @@
+import asyncio
+import functools
+import io
+import itertools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterator, List, Optional
+
+from .async_interface import AsyncNoSqlDb
+from .batch import Writes
+from .blob import AsyncBlobReader
+from .changes import ChangeEvent
+from .interface import NoSqlDb
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of an async iterator driven from synchronous code
+_DONE = object()
+
+
+def _take(items: Iterator, count: int) -> list:
+    return list(itertools.islice(items, count))
+
+
+class _ThreadedBlobReader(AsyncBlobReader):
+    """AsyncBlobReader over the file object of a synchronous backend, read on the adapter's threads."""
+
+    def __init__(self, reader: BinaryIO, run: Callable):
+        self._reader = reader
+        self._run = run
+
+    async def read(self, size: int = -1) -> bytes:
+        return await self._run(self._reader.read, size)
+
+    async def close(self) -> None:
+        await self._run(self._reader.close)
+
+
+class _SyncBlobReader(io.RawIOBase):
+    """Readable file object over an AsyncBlobReader, for SyncNoSqlDb.open_blob_reader."""
+
+    def __init__(self, reader: AsyncBlobReader, run: Callable):
+        super().__init__()
+        self._reader = reader
+        self._run = run
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._run(self._reader.read(len(buffer)))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._run(self._reader.close())
+        super().close()
+
+
+class ThreadedAsyncNoSqlDb(AsyncNoSqlDb):
+    """
+    AsyncNoSqlDb over a synchronous NoSqlDb.
+
+    Every call runs on this adapter's own bounded thread pool, so blocking backends (local files,
+    TinyDB, SQLite) never block the event loop and do not compete with Starlette's threadpool for
+    workers. Streams are pulled from the backend one page per hop.
+    """
+
+    def __init__(self, db: NoSqlDb, max_workers: Optional[int] = None):
+        """
+        :param db: The wrapped database. It is shared, so closing the adapter does not close it.
+        :param max_workers: Threads running backend calls. Defaults to ThreadPoolExecutor's default.
+        """
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nosqldb-async")
+
+    @property
+    def indexes(self) -> Dict[str, List[str]]:
+        return self.db.indexes
+
+    async def _run(self, fn, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def insert_item(self, table: str, key: str, item: dict) -> dict:
+        return await self._run(self.db.insert_item, table, key, item)
+
+    async def get_item(self, table: str, key: str) -> dict:
+        return await self._run(self.db.get_item, table, key)
+
+    async def get_binary_item(self, table: str, key: str) -> bytes:
+        return await self._run(self.db.get_binary_item, table, key)
+
+    async def open_blob_reader(
+        self, table: str, key: str, start: int = 0, end: Optional[int] = None
+    ) -> Optional[AsyncBlobReader]:
+        reader = await self._run(self.db.open_blob_reader, table, key, start, end)
+        return None if reader is None else _ThreadedBlobReader(reader, self._run)
+
+    async def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        await self._run(self.db.put_blob_stream, table, key, stream, content_type)
+
+    async def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        return await self._run(self.db.get_blob_url, table, key, expires_in)
+
+    async def get_all_items(self, table: str) -> list:
+        return await self._run(self.db.get_all_items, table)
+
+    async def iter_items(self, table: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        items = await self._run(self.db.iter_items, table, page_size)
+        while True:
+            page = await self._run(_take, items, page_size)
+            for item in page:
+                yield item
+            if len(page) < page_size:
+                return
+
+    async def update_item(self, table: str, key: str, updates: dict) -> dict:
+        return await self._run(self.db.update_item, table, key, updates)
+
+    async def delete_item(self, table: str, key: str) -> None:
+        await self._run(self.db.delete_item, table, key)
+
+    async def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        return await self._run(self.db.search_by_key_part, table, key_part, regex)
+
+    async def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        return await self._run(self.db.insert_items, table, items)
+
+    async def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        return await self._run(self.db.get_items, table, keys)
+
+    async def delete_items(self, table: str, keys: List[str]) -> None:
+        await self._run(self.db.delete_items, table, keys)
+
+    async def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return await self._run(self.db.list_keys, table, prefix, delimiter, limit, cursor)
+
+    async def exists(self, table: str, key: str) -> bool:
+        return await self._run(self.db.exists, table, key)
+
+    async def count(self, table: str, prefix: Optional[str] = None) -> int:
+        return await self._run(self.db.count, table, prefix)
+
+    async def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._run(self.db.scan_range, table, start_key, end_key, limit)
+
+    async def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        return await self._run(self.db.query_by_index, table, field, value)
+
+    async def query(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return await self._run(self.db.query, table, filters, fields, limit, cursor)
+
+    async def write_batch(self, writes: Writes) -> None:
+        await self._run(self.db.write_batch, writes)
+
+    def watch(self, table: str, since: Optional[int] = None, timeout: Optional[float] = None) -> AsyncIterator[ChangeEvent]:
+        # The sync watch() only fixes its starting point, so it is called right away: writes made
+        # before the first iteration are not missed
+        return self._follow(self.db.watch(table, since, timeout))
+
+    async def _follow(self, events: Iterator[ChangeEvent]) -> AsyncIterator[ChangeEvent]:
+        # Each wait for the next event holds one of the adapter's threads
+        while True:
+            event = await self._run(next, events, _DONE)
+            if event is _DONE:
+                return
+            yield event
+
+    async def compact(self, table: str, force: bool = True) -> bool:
+        return await self._run(self.db.compact, table, force)
+
+    async def close(self) -> None:
+        """Stop the adapter's threads. The wrapped database stays open."""
+        self._executor.shutdown(wait=False)
+
+
+class SyncNoSqlDb(NoSqlDb):
+    """
+    NoSqlDb over an AsyncNoSqlDb, so synchronous code (services, scripts, tests) can use a native
+    async backend unchanged. Coroutines run on a private event loop in a background thread; do
+    not call this from coroutines running on that loop.
+    """
+
+    def __init__(self, db: AsyncNoSqlDb):
+        self.db = db
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="nosqldb-sync", daemon=True)
+        self._thread.start()
+
+    @property
+    def indexes(self) -> Dict[str, List[str]]:
+        return self.db.indexes
+
+    def _run(self, coroutine) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def insert_item(self, table: str, key: str, item: dict) -> dict:
+        return self._run(self.db.insert_item(table, key, item))
+
+    def get_item(self, table: str, key: str) -> dict:
+        return self._run(self.db.get_item(table, key))
+
+    def get_binary_item(self, table: str, key: str) -> bytes:
+        return self._run(self.db.get_binary_item(table, key))
+
+    def open_blob_reader(self, table: str, key: str, start: int = 0, end: Optional[int] = None) -> Optional[BinaryIO]:
+        reader = self._run(self.db.open_blob_reader(table, key, start, end))
+        return None if reader is None else _SyncBlobReader(reader, self._run)
+
+    def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        self._run(self.db.put_blob_stream(table, key, stream, content_type))
+
+    def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        return self._run(self.db.get_blob_url(table, key, expires_in))
+
+    def get_all_items(self, table: str) -> list:
+        return self._run(self.db.get_all_items(table))
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        return self._iterate(self.db.iter_items(table, page_size))
+
+    def _iterate(self, items: AsyncIterator) -> Iterator:
+        """Drive an async iterator from synchronous code, one item per hop to the loop."""
+        try:
+            while True:
+                item = self._run(anext(items, _DONE))
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            # Not waited for: the generator may be finalized late, e.g. at interpreter shutdown
+            if not self._loop.is_closed():
+                asyncio.run_coroutine_threadsafe(items.aclose(), self._loop)
+
+    def update_item(self, table: str, key: str, updates: dict) -> dict:
+        return self._run(self.db.update_item(table, key, updates))
+
+    def delete_item(self, table: str, key: str) -> None:
+        self._run(self.db.delete_item(table, key))
+
+    def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        return self._run(self.db.search_by_key_part(table, key_part, regex))
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        return self._run(self.db.insert_items(table, items))
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        return self._run(self.db.get_items(table, keys))
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        self._run(self.db.delete_items(table, keys))
+
+    def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self._run(self.db.list_keys(table, prefix, delimiter, limit, cursor))
+
+    def exists(self, table: str, key: str) -> bool:
+        return self._run(self.db.exists(table, key))
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        return self._run(self.db.count(table, prefix))
+
+    def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return self._run(self.db.scan_range(table, start_key, end_key, limit))
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        return self._run(self.db.query_by_index(table, field, value))
+
+    def query(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self._run(self.db.query(table, filters, fields, limit, cursor))
+
+    def write_batch(self, writes: Writes) -> None:
+        self._run(self.db.write_batch(writes))
+
+    def watch(self, table: str, since: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[ChangeEvent]:
+        # Called right away, so an adapter that fixes its starting point on the call does so now
+        return self._iterate(self.db.watch(table, since, timeout))
+
+    def compact(self, table: str, force: bool = True) -> bool:
+        return self._run(self.db.compact(table, force))
+
+    def close(self) -> None:
+        """Close the async database and stop the background loop."""
+        if self._loop.is_closed():
+            return
+        try:
+            self._run(self.db.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
@@ -0,0 +1,354 @@
+import asyncio
+import heapq
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from boto3.dynamodb.transform import TransformationInjector, copy_dynamodb_params
+from botocore.exceptions import BotoCoreError, ClientError
+
+from .aio_client import AioClient
+from .async_interface import AsyncNoSqlDb
+from .batch import Writes
+from .dynamodb_database import (
+    BATCH_GET_SIZE,
+    BATCH_MAX_ATTEMPTS,
+    GSI_NAME_FORMAT,
+    TRANSACT_MAX_ITEMS,
+    _QueryPlan,
+    _is_missing_index,
+    _is_missing_update,
+    _key_scan_kwargs,
+    _transact_actions,
+    _update_action,
+)
+from .key_index import list_sorted_keys
+from .secondary_index import parse_indexes
+
+logger = logging.getLogger(__name__)
+
+# BatchWriteItem accepts at most this many requests
+BATCH_WRITE_SIZE = 25
+
+
+def _register_transformations(client: Any) -> None:
+    """
+    Register the handlers of boto3's DynamoDB resource on an aiobotocore client, so it takes and
+    returns plain Python values (Decimal numbers) like `resource.meta.client` in DynamoDBDatabase.
+    """
+    injector = TransformationInjector()
+    events = client.meta.events
+    events.register("provide-client-params.dynamodb", copy_dynamodb_params, unique_id="dynamodb-create-params-copy")
+    events.register(
+        "before-parameter-build.dynamodb", injector.inject_condition_expressions, unique_id="dynamodb-condition-expression"
+    )
+    events.register(
+        "before-parameter-build.dynamodb", injector.inject_attribute_value_input, unique_id="dynamodb-attr-value-input"
+    )
+    events.register("after-call.dynamodb", injector.inject_attribute_value_output, unique_id="dynamodb-attr-value-output")
+
+
+class AsyncDynamoDBDatabase(AsyncNoSqlDb):
+    """
+    Native async implementation of DynamoDBDatabase on an aiobotocore client. Items are read and
+    written in the same format, with numbers coming back as Decimal like the boto3 resource.
+    """
+
+    def __init__(self, config: Dict[str, str]):
+        """
+        Initialize the AsyncDynamoDBDatabase implementation.
+
+        Expected configuration keys: the DynamoDBDatabase ones (region_name, aws_access_key_id,
+        aws_secret_access_key, aws_* tuning keys, table_prefix, indexes). Scans are not segmented.
+        """
+        if not config:
+            raise ValueError("Missing configuration for DynamoDB database.")
+        self.config = config
+        self.table_prefix = config.get("table_prefix", "")
+        self.indexes = parse_indexes(config)
+        self._client = AioClient("dynamodb", config, setup=_register_transformations)
+
+    def _table_name(self, table: str) -> str:
+        return f"{self.table_prefix}{table}"
+
+    async def _pages(self, operation: str, kwargs: dict) -> AsyncIterator[List[dict]]:
+        """Yield the pages of a Scan or Query, following LastEvaluatedKey."""
+        client = await self._client.get()
+        call = getattr(client, operation)
+        kwargs = dict(kwargs)
+        while True:
+            response = await call(**kwargs)
+            yield response.get("Items", [])
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
+
+    async def _scan(self, table: str, **scan_kwargs) -> List[dict]:
+        try:
+            return [item async for page in self._pages("scan", dict(scan_kwargs, TableName=self._table_name(table))) for item in page]
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB scan failed: {e}")
+
+    async def insert_item(self, table: str, key: str, item: dict) -> dict:
+        item["id"] = str(key)  # Ensure 'id' is explicitly a string
+        try:
+            client = await self._client.get()
+            await client.put_item(TableName=self._table_name(table), Item=item)
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB insert failed: {e}")
+        return item
+
+    async def get_item(self, table: str, key: str) -> dict:
+        try:
+            client = await self._client.get()
+            response = await client.get_item(TableName=self._table_name(table), Key={"id": key})
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB get failed: {e}")
+        return response.get("Item", {})
+
+    async def iter_items(self, table: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            async for page in self._pages("scan", {"TableName": self._table_name(table), "Limit": page_size}):
+                for item in page:
+                    yield item
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB scan failed: {e}")
+
+    async def get_all_items(self, table: str) -> list:
+        return await self._scan(table)
+
+    async def update_item(self, table: str, key: str, updates: dict) -> dict:
+        """Update an existing item and return the new document, or {} if it does not exist."""
+        if not any(k != "id" for k in updates):
+            raise ValueError("No valid fields to update. 'id' cannot be modified.")
+        try:
+            client = await self._client.get()
+            response = await client.update_item(
+                **_update_action(self._table_name(table), key, updates), ReturnValues="ALL_NEW"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return {}
+            raise RuntimeError(f"DynamoDB update failed: {e}")
+        except BotoCoreError as e:
+            raise RuntimeError(f"DynamoDB update failed: {e}")
+        return response.get("Attributes", {})
+
+    async def delete_item(self, table: str, key: str) -> None:
+        try:
+            client = await self._client.get()
+            await client.delete_item(TableName=self._table_name(table), Key={"id": key})
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB delete failed: {e}")
+
+    async def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        """Prefix searches use a begins_with filter; regex searches scan and filter locally."""
+        if regex:
+            pattern = re.compile(key_part)
+            return [item for item in await self._scan(table) if "id" in item and pattern.search(item["id"])]
+        return await self._scan(
+            table,
+            FilterExpression="begins_with(#id, :prefix)",
+            ExpressionAttributeNames={"#id": "id"},
+            ExpressionAttributeValues={":prefix": key_part},
+        )
+
+    async def _batch_write(self, table: str, requests: List[dict]) -> None:
+        """Run BatchWriteItem in chunks of 25, resending unprocessed requests with backoff."""
+        table_name = self._table_name(table)
+        client = await self._client.get()
+        for start in range(0, len(requests), BATCH_WRITE_SIZE):
+            pending = {table_name: requests[start:start + BATCH_WRITE_SIZE]}
+            for attempt in range(BATCH_MAX_ATTEMPTS):
+                response = await client.batch_write_item(RequestItems=pending)
+                pending = response.get("UnprocessedItems")
+                if not pending:
+                    break
+                await asyncio.sleep(min(0.05 * (2 ** attempt), 2))
+            else:
+                raise RuntimeError(f"DynamoDB batch write left unprocessed items in {table_name}")
+
+    async def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        for key, item in items.items():
+            item["id"] = str(key)
+        try:
+            await self._batch_write(table, [{"PutRequest": {"Item": item}} for item in items.values()])
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB batch insert failed: {e}")
+        return list(items.values())
+
+    async def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        """Retrieve items with BatchGetItem in chunks of 100, retrying unprocessed keys with backoff."""
+        table_name = self._table_name(table)
+        unique_keys = list(dict.fromkeys(keys))  # BatchGetItem rejects duplicate keys
+        found = {}
+        try:
+            client = await self._client.get()
+            for start in range(0, len(unique_keys), BATCH_GET_SIZE):
+                request = {table_name: {"Keys": [{"id": key} for key in unique_keys[start:start + BATCH_GET_SIZE]]}}
+                for attempt in range(BATCH_MAX_ATTEMPTS):
+                    response = await client.batch_get_item(RequestItems=request)
+                    for item in response.get("Responses", {}).get(table_name, []):
+                        found[item["id"]] = item
+                    request = response.get("UnprocessedKeys")
+                    if not request:
+                        break
+                    await asyncio.sleep(min(0.05 * (2 ** attempt), 2))
+                else:
+                    raise RuntimeError(f"DynamoDB batch get left unprocessed keys in {table_name}")
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB batch get failed: {e}")
+        return [found[key] for key in keys if key in found]
+
+    async def delete_items(self, table: str, keys: List[str]) -> None:
+        try:
+            await self._batch_write(table, [{"DeleteRequest": {"Key": {"id": key}}} for key in dict.fromkeys(keys)])
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB batch delete failed: {e}")
+
+    async def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """List keys with a key-only scan filtered server side on the prefix and cursor. See DynamoDBDatabase.list_keys."""
+        conditions, values = [], {}
+        if prefix:
+            conditions.append("begins_with(#id, :prefix)")
+            values[":prefix"] = prefix
+        if cursor:
+            conditions.append("#id > :cursor")
+            values[":cursor"] = cursor
+        keys = [item["id"] for item in await self._scan(table, **_key_scan_kwargs(conditions, values))]
+        # Without a delimiter a page holds at most `limit` keys, plus one to tell whether more follow
+        sorted_keys = heapq.nsmallest(limit + 1, keys) if limit is not None and not delimiter else sorted(keys)
+        return list_sorted_keys(sorted_keys, prefix, delimiter, limit, cursor)
+
+    async def exists(self, table: str, key: str) -> bool:
+        """Check whether an item exists with a get_item projected on the key only."""
+        try:
+            client = await self._client.get()
+            response = await client.get_item(
+                TableName=self._table_name(table),
+                Key={"id": key},
+                ProjectionExpression="#id",
+                ExpressionAttributeNames={"#id": "id"},
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB get failed: {e}")
+        return "Item" in response
+
+    async def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """Count the items of a table with a Select=COUNT scan, so no item is returned."""
+        kwargs = {"TableName": self._table_name(table), "Select": "COUNT"}
+        if prefix:
+            kwargs["FilterExpression"] = "begins_with(#id, :prefix)"
+            kwargs["ExpressionAttributeNames"] = {"#id": "id"}
+            kwargs["ExpressionAttributeValues"] = {":prefix": prefix}
+        client = await self._client.get()
+        total = 0
+        while True:
+            try:
+                response = await client.scan(**kwargs)
+            except (BotoCoreError, ClientError) as e:
+                raise RuntimeError(f"DynamoDB scan failed: {e}")
+            total += response.get("Count", 0)
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return total
+            kwargs["ExclusiveStartKey"] = last_key
+
+    async def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """One key-only scan filtered on the range, then a BatchGetItem of its keys. See DynamoDBDatabase.scan_range."""
+        conditions, values = [], {}
+        if start_key is not None:
+            conditions.append("#id >= :start")
+            values[":start"] = start_key
+        if end_key is not None:
+            conditions.append("#id < :end")
+            values[":end"] = end_key
+        keys = [item["id"] for item in await self._scan(table, **_key_scan_kwargs(conditions, values))]
+        return await self.get_items(table, heapq.nsmallest(limit, keys) if limit is not None else sorted(keys))
+
+    async def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Serve declared indexes with a Query on the "<field>-index" global secondary index; other
+        fields, or a declared index missing on the table, fall back to a filtered scan.
+        """
+        condition = {"ExpressionAttributeNames": {"#field": field}, "ExpressionAttributeValues": {":value": value}}
+        if field in self.indexes.get(table, ()):
+            index_name = GSI_NAME_FORMAT.format(field=field)
+            kwargs = dict(condition, TableName=self._table_name(table), IndexName=index_name, KeyConditionExpression="#field = :value")
+            try:
+                return [item async for page in self._pages("query", kwargs) for item in page]
+            except ClientError as e:
+                if not _is_missing_index(e):
+                    raise RuntimeError(f"DynamoDB query failed: {e}")
+                logger.warning(f"Index {index_name} not usable on table {table}, scanning instead: {e}")
+            except BotoCoreError as e:
+                raise RuntimeError(f"DynamoDB query failed: {e}")
+        return await self._scan(table, FilterExpression="#field = :value", **condition)
+
+    async def query(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieve the items matching `filters`, evaluated by DynamoDB. See DynamoDBDatabase.query."""
+        plan = _QueryPlan(self._table_name(table), self.indexes.get(table, ()), filters, fields, limit)
+        if plan.empty:
+            return {"items": [], "cursor": None}
+
+        async def run(use_index: bool) -> Dict[str, Any]:
+            items = []
+            async for page in self._pages("query" if use_index else "scan", plan.request_kwargs(use_index, cursor)):
+                next_cursor = plan.add_page(items, page, use_index)
+                if next_cursor:
+                    return {"items": items, "cursor": next_cursor}
+            return {"items": items, "cursor": None}
+
+        try:
+            if plan.index_at is not None:
+                try:
+                    return await run(use_index=True)
+                except ClientError as e:
+                    if not _is_missing_index(e):
+                        raise
+                    logger.warning(f"Index {plan.index_name} not usable on table {table}, scanning instead: {e}")
+            return await run(use_index=False)
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB query failed: {e}")
+
+    async def write_batch(self, writes: Writes) -> None:
+        """One TransactWriteItems call for batches of at most 100 writes. See DynamoDBDatabase.write_batch."""
+        if sum(len(table_writes) for table_writes in writes.values()) > TRANSACT_MAX_ITEMS:
+            return await super().write_batch(writes)
+        actions = _transact_actions(self.table_prefix, writes)
+        if not actions:
+            return
+        try:
+            client = await self._client.get()
+            await client.transact_write_items(TransactItems=actions)
+        except ClientError as e:
+            if _is_missing_update(e):
+                logger.warning("Batch updates a missing item, writing it without a transaction")
+                return await super().write_batch(writes)
+            raise RuntimeError(f"DynamoDB batch write failed: {e}")
+        except BotoCoreError as e:
+            raise RuntimeError(f"DynamoDB batch write failed: {e}")
+
+    async def close(self) -> None:
+        await self._client.close()
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from .async_database import ThreadedAsyncNoSqlDb
+from .blob import AsyncBlobReader, byte_range
+from .filesystem_database import FilesystemDatabase
+
+try:
+    import aiofiles
+    import aiofiles.os
+except ImportError:  # Optional dependency, installed with the "async" extra
+    aiofiles = None
+
+logger = logging.getLogger(__name__)
+
+
+def aiofiles_available() -> bool:
+    """Whether AsyncFilesystemDatabase can be used."""
+    return aiofiles is not None
+
+
+class _FileBlobReader(AsyncBlobReader):
+    """AsyncBlobReader over a byte range of an aiofiles file."""
+
+    def __init__(self, f, remaining: int):
+        self._f = f
+        self._remaining = remaining
+
+    async def read(self, size: int = -1) -> bytes:
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = await self._f.read(size) if size else b""
+        self._remaining -= len(data)
+        return data
+
+    async def close(self) -> None:
+        await self._f.close()
+
+
+class AsyncFilesystemDatabase(ThreadedAsyncNoSqlDb):
+    """
+    AsyncNoSqlDb over a FilesystemDatabase that reads item files with aiofiles, so reads do not
+    wait for a worker of the adapter's pool. Files are replaced atomically, so reads need no
+    lock. Writes take the backend's striped locks and run on the adapter's threads.
+    """
+
+    def __init__(self, db: FilesystemDatabase, max_workers: Optional[int] = None):
+        """
+        :param db: The wrapped database. It is shared, so closing the adapter does not close it.
+        :param max_workers: Threads running the writes and scans. Defaults to ThreadPoolExecutor's default.
+        """
+        if aiofiles is None:
+            raise ImportError("Non-blocking file reads require aiofiles: pip install 'database[async]'")
+        super().__init__(db, max_workers)
+
+    def _file_path(self, table: str, key: str) -> str:
+        # Unlike FilesystemDatabase._get_file_path, does not create the table directory
+        return os.path.join(self.db.base_dir, table, f"{key}.json")
+
+    async def _read_file(self, table: str, key: str) -> Optional[bytes]:
+        try:
+            async with aiofiles.open(self._file_path(table, key), "rb") as f:
+                return await f.read()
+        except FileNotFoundError:
+            return None
+
+    async def get_item(self, table: str, key: str) -> dict:
+        data = await self._read_file(table, key)
+        if data is None:
+            logger.warning(f"Item with key '{key}' not found in table '{table}'.")
+            return {}
+        return self.db.codec.decode(data)
+
+    async def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        items = await asyncio.gather(*(self._read_file(table, key) for key in keys))
+        return [self.db.codec.decode(data) for data in items if data is not None]
+
+    async def get_binary_item(self, table: str, key: str) -> bytes:
+        data = await self._read_file(table, key)
+        return {} if data is None else data
+
+    async def open_blob_reader(
+        self, table: str, key: str, start: int = 0, end: Optional[int] = None
+    ) -> Optional[AsyncBlobReader]:
+        try:
+            f = await aiofiles.open(self._file_path(table, key), "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            start, end = byte_range(await f.seek(0, os.SEEK_END), start, end)
+            await f.seek(start)
+        except BaseException:
+            await f.close()
+            raise
+        return _FileBlobReader(f, end - start)
+
+    async def exists(self, table: str, key: str) -> bool:
+        return await aiofiles.os.path.isfile(self._file_path(table, key))
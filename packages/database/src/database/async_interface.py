@@ -0,0 +1,216 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+from .batch import Writes, split_writes
+from .blob import AsyncBlobReader, AsyncBytesReader, byte_range
+from .key_index import SortedKeyIndex, list_sorted_keys
+from .query import normalize_filters, query_items_async
+
+if TYPE_CHECKING:
+    from .changes import ChangeEvent
+
+
+class AsyncNoSqlDb(ABC):
+    """
+    Coroutine based counterpart of NoSqlDb, for callers running on an event loop.
+
+    Methods mirror NoSqlDb one to one and return the same values. Backends that have no native
+    async client are wrapped by ThreadedAsyncNoSqlDb; SyncNoSqlDb turns any implementation back
+    into a NoSqlDb for synchronous code.
+    """
+
+    # Secondary indexes declared in the "indexes" config: {table: [field, ...]}
+    indexes: Dict[str, List[str]] = {}
+
+    @abstractmethod
+    async def insert_item(self, table: str, key: str, item: dict) -> dict:
+        """Insert an item into the specified table."""
+
+    @abstractmethod
+    async def get_item(self, table: str, key: str) -> dict:
+        """Retrieve an item by its key from the specified table ({} if it does not exist)."""
+
+    async def get_binary_item(self, table: str, key: str) -> bytes:
+        """Retrieve a binary item by its key from the specified table."""
+
+    async def open_blob_reader(
+        self, table: str, key: str, start: int = 0, end: Optional[int] = None
+    ) -> Optional[AsyncBlobReader]:
+        """
+        Open a binary item for streaming reads, optionally limited to a byte range. The caller
+        closes the returned reader. See NoSqlDb.open_blob_reader.
+
+        :return: An AsyncBlobReader, or None if the item does not exist.
+        """
+        data = await self.get_binary_item(table, key)
+        if not isinstance(data, (bytes, bytearray)):  # Backends return {} or None for a missing item
+            return None
+        start, end = byte_range(len(data), start, end)
+        return AsyncBytesReader(data[start:end])
+
+    async def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        """
+        Store a binary item read from a (synchronous) stream, chunk by chunk. The stream is read
+        off the event loop. See NoSqlDb.put_blob_stream.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not store binary items")
+
+    async def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        """Return a URL the binary item can be downloaded from, or None. See NoSqlDb.get_blob_url."""
+        return None
+
+    @abstractmethod
+    async def get_all_items(self, table: str) -> list:
+        """Retrieve all items from the specified table."""
+
+    async def iter_items(self, table: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all items from the specified table.
+
+        :param table: The table to read.
+        :param page_size: How many items the backend fetches per round trip, where it pages.
+        :return: An async iterator over the items.
+        """
+        for item in await self.get_all_items(table):
+            yield item
+
+    @abstractmethod
+    async def update_item(self, table: str, key: str, updates: dict) -> dict:
+        """Update an item in the specified table and return the updated item ({} if it does not exist)."""
+
+    @abstractmethod
+    async def delete_item(self, table: str, key: str) -> None:
+        """Delete an item from the specified table by its key."""
+
+    @abstractmethod
+    async def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        """
+        Search for items whose keys contain or match a part of the given key.
+
+        :param table: The table to search in.
+        :param key_part: The key part to search for.
+        :param regex: Whether to treat key_part as a regular expression. Defaults to False (prefix search).
+        :return: A list of matching items.
+        """
+
+    async def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        """Insert several items concurrently. See NoSqlDb.insert_items."""
+        return list(await asyncio.gather(*(self.insert_item(table, key, item) for key, item in items.items())))
+
+    async def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        """Retrieve several items concurrently, in the order of `keys`, skipping missing keys."""
+        items = await asyncio.gather(*(self.get_item(table, key) for key in keys))
+        return [item for item in items if item]
+
+    async def delete_items(self, table: str, keys: List[str]) -> None:
+        """Delete several items concurrently. Missing keys are ignored."""
+        await asyncio.gather(*(self.delete_item(table, key) for key in keys))
+
+    async def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """List the keys of a table. See NoSqlDb.list_keys."""
+        sorted_keys = sorted([item["id"] async for item in self.iter_items(table) if "id" in item])
+        return list_sorted_keys(sorted_keys, prefix, delimiter, limit, cursor)
+
+    async def exists(self, table: str, key: str) -> bool:
+        """Check whether an item exists. See NoSqlDb.exists."""
+        return bool(await self.get_item(table, key))
+
+    async def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """Count the items of a table from its key listing. See NoSqlDb.count."""
+        total, cursor = 0, None
+        while True:
+            page = await self.list_keys(table, prefix or "", limit=1000, cursor=cursor)
+            total += len(page["keys"])
+            cursor = page["cursor"]
+            if cursor is None:
+                return total
+
+    async def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the items whose keys fall in [start_key, end_key), in key order. See NoSqlDb.scan_range."""
+        # One listing of the keys under the longest prefix the range shares, then only the items
+        # in the range are read
+        prefix = os.path.commonprefix([start_key, end_key]) if start_key is not None and end_key is not None else ""
+        keys = (await self.list_keys(table, prefix))["keys"]
+        return await self.get_items(table, SortedKeyIndex(keys).key_range(start_key, end_key, limit))
+
+    async def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """Retrieve the items whose `field` equals `value`. See NoSqlDb.query_by_index."""
+        return [item async for item in self.iter_items(table) if item.get(field) == value]
+
+    async def _keyed_query_by_index(self, table: str, field: str, value: Any) -> List[Tuple[str, Dict[str, Any]]]:
+        """query_by_index as (key, item) pairs. See NoSqlDb._keyed_query_by_index."""
+        return [(item["id"], item) for item in await self.query_by_index(table, field, value) if "id" in item]
+
+    async def _iter_sorted_items(
+        self, table: str, start_after: Optional[str] = None, prefix: str = ""
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (key, item) pairs in key order. See NoSqlDb._iter_sorted_items."""
+        items = sorted([item async for item in self.iter_items(table) if "id" in item], key=lambda item: item["id"])
+        for item in items:
+            if item["id"].startswith(prefix) and (start_after is None or item["id"] > start_after):
+                yield item["id"], item
+
+    async def query(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Retrieve the items matching `filters`, in key order, one page at a time. See NoSqlDb.query."""
+        predicates = normalize_filters(filters)
+        indexed = next((p for p in predicates if p[1] == "eq" and p[0] in self.indexes.get(table, ())), None)
+        if indexed:
+            field, _, value = indexed
+            pairs = sorted(await self._keyed_query_by_index(table, field, value), key=lambda pair: pair[0])
+
+            async def keyed_items():
+                for key, item in pairs:
+                    if cursor is None or key > cursor:
+                        yield key, item
+
+            return await query_items_async(keyed_items(), predicates, fields, limit)
+        prefix = next((p[2] for p in predicates if p[0] == "id" and p[1] == "prefix"), "")
+        items = self._iter_sorted_items(table, cursor, prefix)
+        try:
+            return await query_items_async(items, predicates, fields, limit)
+        finally:
+            await items.aclose()
+
+    async def write_batch(self, writes: Writes) -> None:
+        """Apply the merged writes of a batch ({table: {key: Write}}). See NoSqlDb.write_batch."""
+        for table, table_writes in writes.items():
+            puts, updates, deletes = split_writes(table_writes)
+            if puts:
+                await self.insert_items(table, puts)
+            for key, fields in updates.items():
+                await self.update_item(table, key, fields)
+            if deletes:
+                await self.delete_items(table, deletes)
+
+    async def watch(self, table: str, since: Optional[int] = None, timeout: Optional[float] = None) -> AsyncIterator["ChangeEvent"]:
+        """Stream the writes of a table as ChangeEvents. See NoSqlDb.watch."""
+        raise NotImplementedError(f"{type(self).__name__} has no change feed")
+        yield  # An async generator, like the implementations
+
+    async def compact(self, table: str, force: bool = True) -> bool:
+        """Reclaim the space left by deleted and overwritten items. See NoSqlDb.compact."""
+        return False
+
+    async def close(self) -> None:
+        """Release any clients, connections or file handles held by this instance."""
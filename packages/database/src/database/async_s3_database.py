@@ -0,0 +1,436 @@
+import asyncio
+import logging
+import re
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from .aio_client import AioClient
+from .async_interface import AsyncNoSqlDb
+from .batch import Writes, split_writes
+from .blob import AsyncBlobReader, AsyncBytesReader
+from .codec import get_codec
+from .s3_database import DELETE_BATCH_SIZE, INDEX_PREFIX, MULTIPART_SIZE
+from .secondary_index import index_token, indexed_values, parse_indexes, still_indexed
+
+logger = logging.getLogger(__name__)
+
+
+class _S3BlobReader(AsyncBlobReader):
+    """AsyncBlobReader over the streaming body of a GetObject response."""
+
+    def __init__(self, body):
+        self._body = body
+
+    async def read(self, size: int = -1) -> bytes:
+        return await self._body.read(None if size is None or size < 0 else size)
+
+    async def close(self) -> None:
+        self._body.close()
+
+
+class AsyncS3Database(AsyncNoSqlDb):
+    """
+    Native async implementation of S3Database on aiobotocore, with the same object layout
+    (<table>/<key> objects and _indexes/ marker objects), so both can share a bucket.
+    Concurrent requests are bounded by `max_workers` per call.
+    """
+
+    def __init__(self, config: Dict[str, str]):
+        """
+        Initialize the AsyncS3Database implementation.
+
+        Expected configuration keys: the S3Database ones (bucket_name, region_name,
+        aws_access_key_id, aws_secret_access_key, aws_* tuning keys, update_retries, max_workers,
+        indexes, multipart_threshold, multipart_chunksize, codec, compression,
+        compression_threshold). The disk cache is not supported.
+        """
+        self.config = config
+        self.bucket_name = config.get("bucket_name")
+        if not self.bucket_name:
+            raise ValueError("AsyncS3Database requires a 'bucket_name' in the config.")
+        self.update_retries = int(config.get("update_retries") or 5)
+        self.max_workers = int(config.get("max_workers") or 10)
+        self.indexes = parse_indexes(config)
+        self.codec = get_codec(config)
+        self.multipart_threshold = int(config.get("multipart_threshold") or MULTIPART_SIZE)
+        self.multipart_chunksize = int(config.get("multipart_chunksize") or MULTIPART_SIZE)
+        self._client = AioClient("s3", config, max_pool_connections=self.max_workers)
+        logger.info(f"AsyncS3Database initialized with bucket: {self.bucket_name}")
+
+    def _get_s3_key(self, table: str, key: str) -> str:
+        return f"{table}/{key}"
+
+    def _index_prefix(self, table: str, field: str) -> str:
+        return f"{INDEX_PREFIX}/{table}/{field}/"
+
+    async def _gather(self, coroutines: Iterable) -> list:
+        """Await coroutines with at most `max_workers` in flight, returning results in order."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        return await asyncio.gather(*(bounded(coroutine) for coroutine in coroutines))
+
+    async def _get_bytes(self, s3_key: str) -> Optional[bytes]:
+        """Download an object, or return None if it does not exist."""
+        client = await self._client.get()
+        try:
+            response = await client.get_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+                return None
+            raise
+        async with response["Body"] as body:
+            return await body.read()
+
+    async def _fetch_json(self, s3_key: str) -> Optional[dict]:
+        data = await self._get_bytes(s3_key)
+        return None if data is None else self.codec.decode(data)
+
+    async def _fetch_keyed(self, table: str, keys: List[str]) -> List[Tuple[str, dict]]:
+        """Fetch the items of `keys` concurrently as (key, item) pairs, in order, skipping missing ones."""
+        items = await self._gather(self._fetch_json(self._get_s3_key(table, key)) for key in keys)
+        return [(key, item) for key, item in zip(keys, items) if item is not None]
+
+    async def _list_object_keys(
+        self, prefix: str, page_size: int = 1000, start_after: Optional[str] = None
+    ) -> AsyncIterator[List[str]]:
+        """Yield the object keys under a prefix (after `start_after`), one ListObjectsV2 page at a time."""
+        client = await self._client.get()
+        paginator = client.get_paginator("list_objects_v2")
+        kwargs = {"Bucket": self.bucket_name, "Prefix": prefix, "PaginationConfig": {"PageSize": page_size}}
+        if start_after:
+            kwargs["StartAfter"] = start_after
+        async for page in paginator.paginate(**kwargs):
+            yield [obj["Key"] for obj in page.get("Contents", [])]
+
+    async def _delete_keys(self, s3_keys: List[str]) -> None:
+        client = await self._client.get()
+        for start in range(0, len(s3_keys), DELETE_BATCH_SIZE):
+            response = await client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": s3_key} for s3_key in s3_keys[start:start + DELETE_BATCH_SIZE]], "Quiet": True},
+            )
+            errors = response.get("Errors", [])
+            if errors:
+                raise RuntimeError(f"S3 batch delete failed for {len(errors)} keys: {errors[:3]}")
+
+    async def _index_item(self, table: str, key: str, item: dict, fields: Optional[Iterable[str]] = None) -> None:
+        """Put the index marker objects of an item. See S3Database._index_item."""
+        fields = self.indexes.get(table, ()) if fields is None else fields
+        client = await self._client.get()
+        await asyncio.gather(*(
+            client.put_object(
+                Bucket=self.bucket_name,
+                Key=f"{self._index_prefix(table, field)}values/{index_token(value)}/{key}",
+                Body=b"",
+            )
+            for field, value in indexed_values(item, fields).items()
+        ))
+
+    async def insert_item(self, table: str, key: str, item: dict) -> dict:
+        logger.info(f"Inserting item into table '{table}' with key '{key}'")
+        client = await self._client.get()
+        await client.put_object(Bucket=self.bucket_name, Key=self._get_s3_key(table, key), Body=self.codec.encode(item))
+        await self._index_item(table, key, item)
+        return item
+
+    async def get_item(self, table: str, key: str) -> dict:
+        logger.info(f"Retrieving item from table '{table}' with key: {key}")
+        item = await self._fetch_json(self._get_s3_key(table, key))
+        if item is None:
+            logger.warning(f"Item with key '{key}' not found in table '{table}'.")
+        return item or {}
+
+    async def get_binary_item(self, table: str, key: str) -> bytes:
+        data = await self._get_bytes(self._get_s3_key(table, key))
+        return {} if data is None else data
+
+    async def open_blob_reader(
+        self, table: str, key: str, start: int = 0, end: Optional[int] = None
+    ) -> Optional[AsyncBlobReader]:
+        """Open a binary item as a streaming body, fetching only [start, end) with a ranged GET."""
+        if end is not None and end <= start:
+            return AsyncBytesReader(b"")
+        params = {"Bucket": self.bucket_name, "Key": self._get_s3_key(table, key)}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        client = await self._client.get()
+        try:
+            response = await client.get_object(**params)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in ("NoSuchKey", "404"):
+                return None
+            if code == "InvalidRange":  # start is past the end of the object
+                return AsyncBytesReader(b"")
+            raise
+        return _S3BlobReader(response["Body"])
+
+    async def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        """
+        Upload a stream, read off the event loop. Streams above `multipart_threshold` go up as a
+        multipart upload with up to `max_workers` parts in flight, so only those parts are held
+        in memory.
+        """
+        s3_key = self._get_s3_key(table, key)
+        extra_args = {"ContentType": content_type} if content_type else {}
+        loop = asyncio.get_running_loop()
+        client = await self._client.get()
+        first = await loop.run_in_executor(None, stream.read, self.multipart_threshold)
+        if len(first) < self.multipart_threshold:
+            await client.put_object(Bucket=self.bucket_name, Key=s3_key, Body=first, **extra_args)
+            return
+
+        upload_id = (await client.create_multipart_upload(Bucket=self.bucket_name, Key=s3_key, **extra_args))["UploadId"]
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def upload_part(number: int, data: bytes) -> dict:
+            try:
+                response = await client.upload_part(
+                    Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id, PartNumber=number, Body=data
+                )
+            finally:
+                semaphore.release()
+            return {"PartNumber": number, "ETag": response["ETag"]}
+
+        uploads = []
+        try:
+            buffer, number = first, 1
+            while True:
+                while len(buffer) < self.multipart_chunksize:
+                    chunk = await loop.run_in_executor(None, stream.read, self.multipart_chunksize - len(buffer))
+                    if not chunk:
+                        break
+                    buffer += chunk
+                if not buffer:
+                    break
+                data, buffer = buffer[:self.multipart_chunksize], buffer[self.multipart_chunksize:]
+                await semaphore.acquire()  # Released when the part is uploaded
+                uploads.append(asyncio.ensure_future(upload_part(number, data)))
+                number += 1
+            parts = await asyncio.gather(*uploads)
+            await client.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            for upload in uploads:
+                upload.cancel()
+            await client.abort_multipart_upload(Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id)
+            raise
+        logger.info(f"Blob uploaded to bucket with key: {s3_key} ({number - 1} parts)")
+
+    async def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        """Return a presigned GET URL for a binary item."""
+        client = await self._client.get()
+        return await client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket_name, "Key": self._get_s3_key(table, key)},
+            ExpiresIn=expires_in,
+        )
+
+    async def iter_items(self, table: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the items in key order, fetching each listed page concurrently."""
+        async for s3_keys in self._list_object_keys(f"{table}/", page_size):
+            for item in await self._gather(self._fetch_json(s3_key) for s3_key in s3_keys):
+                if item is not None:
+                    yield item
+
+    async def _iter_sorted_items(
+        self, table: str, start_after: Optional[str] = None, prefix: str = ""
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (key, item) pairs in key order, with the prefix and cursor pushed down to ListObjectsV2."""
+        table_prefix = f"{table}/"
+        pages = self._list_object_keys(
+            f"{table_prefix}{prefix}", start_after=f"{table_prefix}{start_after}" if start_after else None
+        )
+        async for s3_keys in pages:
+            for pair in await self._fetch_keyed(table, [s3_key[len(table_prefix):] for s3_key in s3_keys]):
+                yield pair
+
+    async def get_all_items(self, table: str) -> list:
+        logger.info(f"Retrieving all items from table '{table}'")
+        return [item async for item in self.iter_items(table, 1000)]
+
+    async def update_item(self, table: str, key: str, updates: dict) -> dict:
+        """Merge updates with a conditional put on the ETag that was read. See S3Database.update_item."""
+        logger.info(f"Updating item in table '{table}' with key '{key}'")
+        s3_key = self._get_s3_key(table, key)
+        client = await self._client.get()
+        for attempt in range(self.update_retries):
+            try:
+                response = await client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+                    logger.warning(f"Item with key '{key}' not found in table '{table}', update skipped.")
+                    return {}
+                raise
+            async with response["Body"] as body:
+                existing_item = self.codec.decode(await body.read())
+            existing_item.update(updates)
+            try:
+                await client.put_object(
+                    Bucket=self.bucket_name, Key=s3_key, Body=self.codec.encode(existing_item), IfMatch=response["ETag"]
+                )
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("PreconditionFailed", "ConditionalRequestConflict", "NoSuchKey"):
+                    logger.warning(f"Concurrent modification of '{s3_key}' (attempt {attempt + 1}), retrying update")
+                    continue
+                raise
+            await self._index_item(table, key, existing_item)
+            return existing_item
+        raise RuntimeError(f"S3 update of '{s3_key}' failed after {self.update_retries} conflicting attempts")
+
+    async def delete_item(self, table: str, key: str) -> None:
+        logger.info(f"Deleting item from table '{table}' with key: {key}")
+        client = await self._client.get()
+        await client.delete_object(Bucket=self.bucket_name, Key=self._get_s3_key(table, key))
+
+    async def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        """Match object keys (prefix pushed down to ListObjectsV2, regex filtered locally), then fetch the matches."""
+        logger.info(f"Searching in table '{table}' for keys matching: {key_part} (regex={regex})")
+        table_prefix = f"{table}/"
+        pattern = re.compile(key_part) if regex else None
+        matching_items = []
+        async for s3_keys in self._list_object_keys(table_prefix if regex else f"{table_prefix}{key_part}"):
+            if regex:
+                s3_keys = [s3_key for s3_key in s3_keys if pattern.search(s3_key[len(table_prefix):])]
+            items = await self._gather(self._fetch_json(s3_key) for s3_key in s3_keys)
+            matching_items.extend(item for item in items if item is not None)
+        return matching_items
+
+    async def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        logger.info(f"Inserting {len(items)} items into table '{table}'")
+        return await self._gather(self.insert_item(table, key, item) for key, item in items.items())
+
+    async def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        logger.info(f"Retrieving {len(keys)} items from table '{table}'")
+        return [item for _, item in await self._fetch_keyed(table, keys)]
+
+    async def delete_items(self, table: str, keys: List[str]) -> None:
+        logger.info(f"Deleting {len(keys)} items from table '{table}'")
+        await self._delete_keys([self._get_s3_key(table, key) for key in keys])
+
+    async def write_batch(self, writes: Writes) -> None:
+        """Apply a batch: puts and updates of every table concurrently, then DeleteObjects per table."""
+        logger.info(f"Writing a batch of {sum(len(w) for w in writes.values())} writes")
+        deletes, coroutines = {}, []
+        for table, table_writes in writes.items():
+            puts, updates, deletes[table] = split_writes(table_writes)
+            coroutines += [self.insert_item(table, key, item) for key, item in puts.items()]
+            coroutines += [self.update_item(table, key, fields) for key, fields in updates.items()]
+        await self._gather(coroutines)
+        for table, keys in deletes.items():
+            if keys:
+                await self.delete_items(table, keys)
+
+    async def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """List keys with ListObjectsV2; the cursor is the S3 continuation token. See S3Database.list_keys."""
+        table_prefix = f"{table}/"
+        kwargs = {"Bucket": self.bucket_name, "Prefix": f"{table_prefix}{prefix}"}
+        if delimiter:
+            kwargs["Delimiter"] = delimiter
+        if cursor:
+            kwargs["ContinuationToken"] = cursor
+        client = await self._client.get()
+        keys, prefixes = [], []
+        while True:
+            if limit is not None:
+                kwargs["MaxKeys"] = min(1000, limit - len(keys) - len(prefixes))
+            response = await client.list_objects_v2(**kwargs)
+            keys.extend(obj["Key"][len(table_prefix):] for obj in response.get("Contents", []))
+            prefixes.extend(p["Prefix"][len(table_prefix):] for p in response.get("CommonPrefixes", []))
+            token = response.get("NextContinuationToken")
+            if not token:
+                return {"keys": keys, "prefixes": prefixes, "cursor": None}
+            if limit is not None and len(keys) + len(prefixes) >= limit:
+                return {"keys": keys, "prefixes": prefixes, "cursor": token}
+            kwargs["ContinuationToken"] = token
+
+    async def exists(self, table: str, key: str) -> bool:
+        """Check whether an item exists with a HEAD request, without downloading it."""
+        client = await self._client.get()
+        try:
+            await client.head_object(Bucket=self.bucket_name, Key=self._get_s3_key(table, key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    async def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """Count the items of a table by listing its object keys, without downloading any object."""
+        return sum([len(s3_keys) async for s3_keys in self._list_object_keys(f"{table}/{prefix or ''}")])
+
+    async def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the items in [start_key, end_key), listing from just before `start_key`. See S3Database.scan_range."""
+        table_prefix = f"{table}/"
+        start_after = f"{table_prefix}{start_key[:-1]}" if start_key else None
+        keys = []
+        async for s3_keys in self._list_object_keys(table_prefix, start_after=start_after):
+            in_range = [s3_key[len(table_prefix):] for s3_key in s3_keys]
+            keys += [key for key in in_range if (start_key is None or key >= start_key) and (end_key is None or key < end_key)]
+            if (end_key is not None and in_range and in_range[-1] >= end_key) or (limit is not None and len(keys) >= limit):
+                break
+        return [item for _, item in await self._fetch_keyed(table, keys[:limit])]
+
+    async def _build_index(self, table: str, field: str) -> None:
+        """Backfill the index of a field the first time it is queried. See S3Database._build_index."""
+        built_key = f"{self._index_prefix(table, field)}built"
+        client = await self._client.get()
+        response = await client.list_objects_v2(Bucket=self.bucket_name, Prefix=built_key, MaxKeys=1)
+        if response.get("Contents"):
+            return
+        logger.info(f"Building index on '{field}' for table '{table}'")
+        table_prefix = f"{table}/"
+
+        async def index_object(s3_key: str):
+            item = await self._fetch_json(s3_key)
+            if item is not None:
+                await self._index_item(table, s3_key[len(table_prefix):], item, [field])
+
+        async for s3_keys in self._list_object_keys(table_prefix):
+            await self._gather(index_object(s3_key) for s3_key in s3_keys)
+        await client.put_object(Bucket=self.bucket_name, Key=built_key, Body=b"")
+
+    async def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """Retrieve the items whose `field` equals `value`. See _keyed_query_by_index."""
+        return [item for _, item in await self._keyed_query_by_index(table, field, value)]
+
+    async def _keyed_query_by_index(self, table: str, field: str, value: Any) -> List[Tuple[str, Dict[str, Any]]]:
+        """Serve declared indexes from the marker objects, dropping stale ones. See S3Database._keyed_query_by_index."""
+        if field not in self.indexes.get(table, ()):
+            return [(key, item) async for key, item in self._iter_sorted_items(table) if item.get(field) == value]
+        logger.info(f"Querying table '{table}' by index on '{field}'")
+        token = index_token(value)
+        values_prefix = f"{self._index_prefix(table, field)}values/{token}/"
+        await self._build_index(table, field)
+        keys = [marker[len(values_prefix):] async for page in self._list_object_keys(values_prefix) for marker in page]
+        fetched = await self._gather(self._fetch_json(self._get_s3_key(table, key)) for key in keys)
+        matching_items, stale = [], []
+        for key, item in zip(keys, fetched):
+            if not still_indexed(item, field, token):
+                stale.append(f"{values_prefix}{key}")
+            elif item.get(field) == value:
+                matching_items.append((key, item))
+        await self._delete_keys(stale)
+        return matching_items
+
+    async def close(self) -> None:
+        await self._client.close()
@@ -0,0 +1,88 @@
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .interface import NoSqlDb
+
+
+class Write(NamedTuple):
+    op: str  # "put" (whole item), "update" (fields to merge) or "delete"
+    value: Optional[Dict[str, Any]]
+
+
+# {table: {key: Write}}, at most one write per key
+Writes = Dict[str, Dict[str, Write]]
+
+
+def split_writes(writes: Dict[str, Write]) -> Tuple[Dict[str, dict], Dict[str, dict], List[str]]:
+    """Split the writes of one table into (puts, updates, deleted keys)."""
+    puts = {key: write.value for key, write in writes.items() if write.op == "put"}
+    updates = {key: write.value for key, write in writes.items() if write.op == "update"}
+    deletes = [key for key, write in writes.items() if write.op == "delete"]
+    return puts, updates, deletes
+
+
+class WriteBatch:
+    """
+    Unit of work returned by NoSqlDb.batch(): collects writes and commits them in one go.
+
+    Writes to the same key are merged as they are added (an update after an insert becomes a
+    larger insert, a delete wins over anything before it), so each key is written once. Used as
+    a context manager, the batch commits when the block exits normally and is discarded if it
+    raises; call commit() directly to write even after an error.
+    """
+
+    def __init__(self, db: "NoSqlDb"):
+        """
+        :param db: The database the batch commits to.
+        """
+        self.db = db
+        self.writes: Writes = {}
+
+    def __len__(self) -> int:
+        return sum(len(writes) for writes in self.writes.values())
+
+    def __enter__(self) -> "WriteBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def _add(self, table: str, key: str, write: Write) -> None:
+        writes = self.writes.setdefault(table, {})
+        previous = writes.get(key)
+        if write.op == "update" and previous is not None:
+            if previous.op == "delete":
+                return  # Updating a deleted item is a no-op, as with a direct update_item
+            if isinstance(previous.value, dict):
+                write = Write(previous.op, {**previous.value, **write.value})
+        writes[key] = write
+
+    def insert_item(self, table: str, key: str, item: dict) -> None:
+        self._add(table, key, Write("put", item))
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> None:
+        for key, item in items.items():
+            self.insert_item(table, key, item)
+
+    def update_item(self, table: str, key: str, updates: dict) -> None:
+        self._add(table, key, Write("update", dict(updates)))
+
+    def delete_item(self, table: str, key: str) -> None:
+        self._add(table, key, Write("delete", None))
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        for key in keys:
+            self.delete_item(table, key)
+
+    def commit(self) -> None:
+        """Write the collected writes and empty the batch."""
+        writes, self.writes = self.writes, {}
+        if writes:
+            self.db.write_batch(writes)
+
+    def discard(self) -> None:
+        """Drop the collected writes."""
+        self.writes = {}
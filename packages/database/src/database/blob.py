@@ -0,0 +1,142 @@
+import io
+import mmap
+import os
+from typing import AsyncIterator, BinaryIO, Optional, Tuple, Union
+
+# Chunk size used when copying blob streams
+CHUNK_SIZE = 1024 * 1024
+
+
+def byte_range(size: int, start: int = 0, end: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Clamp a [start, end) byte range to an object of `size` bytes. `end` None means up to the end.
+
+    :raises ValueError: On a negative start or an end before start.
+    """
+    if start < 0 or (end is not None and end < start):
+        raise ValueError(f"Invalid byte range [{start}, {end})")
+    end = size if end is None else min(end, size)
+    return min(start, end), end
+
+
+def copy_stream(source: BinaryIO, target: BinaryIO, chunk_size: int = CHUNK_SIZE) -> int:
+    """Copy a stream chunk by chunk and return the number of bytes copied."""
+    copied = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return copied
+        target.write(chunk)
+        copied += len(chunk)
+
+
+class MmapBlobReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over a byte range of a memory-mapped file.
+
+    Pages are loaded by the OS on access, so reading a large blob does not hold it in process
+    memory; `view()` gives zero-copy access to the whole range.
+    """
+
+    def __init__(self, path: Union[str, BinaryIO], start: int = 0, end: Optional[int] = None):
+        """
+        :param path: The file to map, as a path or an open binary file (which the caller may close).
+        :param start: First byte of the range.
+        :param end: End of the range (exclusive). Defaults to the end of the file.
+        """
+        super().__init__()
+        if isinstance(path, str):
+            self.name = path
+            with open(path, "rb") as f:
+                size = self._map(f)
+        else:
+            self.name = getattr(path, "name", None)
+            size = self._map(path)
+        self._start, self._end = byte_range(size, start, end)
+        self._pos = self._start
+
+    def _map(self, f: BinaryIO) -> int:
+        size = os.fstat(f.fileno()).st_size
+        # mmap rejects empty files; an empty range reads from an empty buffer instead
+        self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        return size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        self._checkClosed()
+        count = max(0, min(len(buffer), self._end - self._pos))
+        if count:
+            buffer[:count] = self._mmap[self._pos:self._pos + count]
+            self._pos += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        base = {io.SEEK_SET: self._start, io.SEEK_CUR: self._pos, io.SEEK_END: self._end}[whence]
+        self._pos = min(max(base + offset, self._start), self._end)
+        return self._pos - self._start
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._pos - self._start
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the whole range; release it before closing the reader."""
+        self._checkClosed()
+        if self._mmap is None:
+            return memoryview(b"")
+        return memoryview(self._mmap)[self._start:self._end]
+
+    def close(self) -> None:
+        if not self.closed and self._mmap is not None:
+            self._mmap.close()
+        super().close()
+
+
+class AsyncBlobReader:
+    """
+    Async counterpart of the file objects returned by NoSqlDb.open_blob_reader, returned by
+    AsyncNoSqlDb.open_blob_reader: `await read(size)`, then `await close()`. Iterating it with
+    `async for` yields the remaining bytes in chunks, e.g. for a StreamingResponse.
+    """
+
+    async def read(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes (all remaining bytes when negative); b"" at the end."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release the underlying file, stream or connection."""
+
+    async def __aenter__(self) -> "AsyncBlobReader":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        await self.close()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+class AsyncBytesReader(AsyncBlobReader):
+    """AsyncBlobReader over bytes already in memory."""
+
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+    async def close(self) -> None:
+        self._stream.close()
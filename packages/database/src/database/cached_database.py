@@ -0,0 +1,191 @@
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .batch import Writes
+from .interface import NoSqlDb
+from .wrapper import NoSqlDbWrapper
+
+logger = logging.getLogger(__name__)
+
+# Cached value for a key known not to exist
+_MISSING = object()
+
+
+class CachedNoSqlDb(NoSqlDbWrapper):
+    """
+    Read-through cache around any NoSqlDb backend.
+
+    Point reads (get_item, get_items) of the cached tables are served from an in-process LRU
+    cache bounded by size and TTL. Misses are cached too (negative caching). Writes made through
+    this instance invalidate the affected keys; writes made by other processes are only
+    picked up once the entry expires, so `ttl` bounds how stale a read can be.
+
+    Table-wide reads (scans, queries, listings) and binary reads always go to the backend. Any
+    other attribute (e.g. `flush`) is forwarded to the backend.
+    """
+
+    def __init__(
+        self,
+        backend: NoSqlDb,
+        tables: Optional[Iterable[str]] = None,
+        ttl: float = 30.0,
+        max_items: int = 1024,
+        negative_ttl: Optional[float] = None,
+    ):
+        """
+        :param backend: The wrapped database.
+        :param tables: The tables to cache; None caches every table.
+        :param ttl: Seconds a cached item stays valid.
+        :param max_items: Maximum number of cached entries; the least recently used is evicted first.
+        :param negative_ttl: Seconds a cached miss stays valid. Defaults to `ttl`.
+        """
+        super().__init__(backend)
+        self.tables = None if tables is None else set(tables)
+        self.ttl = ttl
+        self.max_items = max_items
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a read only fills the cache if no write happened meanwhile
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        logger.info(f"CachedNoSqlDb wrapping {type(backend).__name__} (tables={self.tables}, ttl={ttl}, max_items={max_items})")
+
+    def _cached(self, table: str) -> bool:
+        return self.tables is None or table in self.tables
+
+    def _lookup(self, table: str, key: str) -> Tuple[Any, int]:
+        """
+        Return (cached value or _MISSING, generation), with None as value when not cached or expired.
+        """
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[(table, key)]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None, self._generation
+            self._entries.move_to_end((table, key))
+            self.hits += 1
+            return entry[1], self._generation
+
+    def _store(self, table: str, key: str, value: Any, generation: int) -> None:
+        """Cache a value read at `generation`, unless a write invalidated entries since."""
+        ttl = self.negative_ttl if value is _MISSING else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[(table, key)] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end((table, key))
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table: str, keys: Optional[Iterable[str]] = None) -> None:
+        """
+        Drop cached entries: the given keys, or the whole table when keys is None.
+
+        """
+        with self._lock:
+            self._generation += 1
+            if keys is None:
+                for cached in [cached for cached in self._entries if cached[0] == table]:
+                    del self._entries[cached]
+            else:
+                for key in keys:
+                    self._entries.pop((table, key), None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit/miss/eviction counters and the current number of entries."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
+
+    # Writes invalidate after the backend write, so a read that overlapped the write (and may have
+    # seen the old value) finds the generation changed and does not cache it
+
+    def insert_item(self, table: str, key: str, item: dict) -> dict:
+        inserted = self.backend.insert_item(table, key, item)
+        self.invalidate(table, [key])
+        return inserted
+
+    def get_item(self, table: str, key: str) -> dict:
+        if not self._cached(table):
+            return self.backend.get_item(table, key)
+        value, generation = self._lookup(table, key)
+        if value is None:
+            value = self.backend.get_item(table, key)
+            self._store(table, key, copy.deepcopy(value) if value else _MISSING, generation)
+            return value
+        # Callers may modify what they get back, so never hand out the cached object itself
+        return {} if value is _MISSING else copy.deepcopy(value)
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        if not self._cached(table):
+            return self.backend.get_items(table, keys)
+        found: Dict[str, Any] = {}
+        missing = []
+        generation = None
+        for key in keys:
+            value, key_generation = self._lookup(table, key)
+            generation = key_generation if generation is None else generation
+            if value is None:
+                missing.append(key)
+            elif value is not _MISSING:
+                found[key] = copy.deepcopy(value)
+        if missing:
+            fetched = self.backend.get_items(table, missing)
+            if all("id" in item for item in fetched):
+                fetched_by_key = {item["id"]: item for item in fetched}
+                for key in missing:
+                    item = fetched_by_key.get(key)
+                    self._store(table, key, copy.deepcopy(item) if item else _MISSING, generation)
+                    if item:
+                        found[key] = item
+            else:  # Items without an id cannot be matched back to their keys, so they are not cached
+                return self.backend.get_items(table, keys)
+        return [found[key] for key in keys if key in found]
+
+    def update_item(self, table: str, key: str, updates: dict) -> dict:
+        updated = self.backend.update_item(table, key, updates)
+        self.invalidate(table, [key])
+        return updated
+
+    def delete_item(self, table: str, key: str) -> None:
+        self.backend.delete_item(table, key)
+        self.invalidate(table, [key])
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        inserted = self.backend.insert_items(table, items)
+        self.invalidate(table, items.keys())
+        return inserted
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        self.backend.delete_items(table, keys)
+        self.invalidate(table, keys)
+
+    def exists(self, table: str, key: str) -> bool:
+        if not self._cached(table):
+            return self.backend.exists(table, key)
+        value, _ = self._lookup(table, key)
+        if value is None:
+            return self.backend.exists(table, key)
+        return value is not _MISSING
+
+    def write_batch(self, writes: Writes) -> None:
+        self.backend.write_batch(writes)
+        for table, table_writes in writes.items():
+            self.invalidate(table, table_writes.keys())
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.backend.close()
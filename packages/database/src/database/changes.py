@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional
+
+from .batch import Writes
+from .interface import NoSqlDb
+from .wrapper import NoSqlDbWrapper
+
+logger = logging.getLogger(__name__)
+
+# Default number of events a change log retains per table
+DEFAULT_MAX_EVENTS = 10000
+
+
+class ChangeEvent(NamedTuple):
+    seq: int  # Increasing across the log; pass the last seen seq as `since` to resume after it
+    table: str
+    key: str
+    op: str  # "insert", "update" or "delete"
+    item: Optional[Dict[str, Any]]  # The written item (only the updated fields for batched updates); None for deletes
+    timestamp: float
+
+
+class ChangeLog:
+    """
+    In-process log of the writes made to a database, retaining the last `max_events` per table.
+    Readers block on a condition until events newer than their cursor arrive.
+    """
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS):
+        """
+        :param max_events: Events retained per table; older ones are dropped.
+        """
+        self.max_events = max_events
+        self._tables: Dict[str, Deque[ChangeEvent]] = {}
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        """The seq of the latest event, 0 when the log is empty."""
+        return self._seq
+
+    def append(self, table: str, op: str, key: str, item: Optional[Dict[str, Any]] = None) -> ChangeEvent:
+        """Record one write and wake up the readers."""
+        with self._condition:
+            self._seq += 1
+            event = ChangeEvent(self._seq, table, key, op, item, time.time())
+            events = self._tables.get(table)
+            if events is None:
+                events = self._tables[table] = deque(maxlen=self.max_events)
+            events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def read(self, table: str, since: int, timeout: Optional[float] = None) -> List[ChangeEvent]:
+        """
+        Return the events of a table with a seq above `since`, in order, waiting up to `timeout`
+        seconds (forever when None) for one to arrive. Returns [] on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events = self._tables.get(table)
+                if events and events[-1].seq > since:
+                    if events[0].seq > since + 1 and since > 0:
+                        logger.warning(f"Change feed of table '{table}' dropped events after seq {since}; resuming at {events[0].seq}")
+                    newer = []
+                    for event in reversed(events):
+                        if event.seq <= since:
+                            break
+                        newer.append(event)
+                    return newer[::-1]
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+
+
+class ChangeFeedNoSqlDb(NoSqlDbWrapper):
+    """
+    Change feed around any NoSqlDb backend.
+
+    Every insert, update and delete made through this instance is recorded in a ChangeLog, and
+    `watch` streams them, so components can react to writes instead of polling tables. Only
+    writes made in this process are seen; blobs are not tracked. Any other attribute is
+    forwarded to the backend.
+    """
+
+    def __init__(self, backend: NoSqlDb, log: Optional[ChangeLog] = None):
+        """
+        :param backend: The wrapped database.
+        :param log: Where writes are recorded. Defaults to a new ChangeLog.
+        """
+        super().__init__(backend)
+        self.log = ChangeLog() if log is None else log
+        logger.info(f"ChangeFeedNoSqlDb wrapping {type(backend).__name__} (max_events={self.log.max_events})")
+
+    def watch(self, table: str, since: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[ChangeEvent]:
+        # "From now on" is fixed when watch() is called, not when the iteration starts, so writes
+        # made in between are not missed
+        return self._follow(table, self.log.last_seq if since is None else since, timeout)
+
+    def _follow(self, table: str, since: int, timeout: Optional[float]) -> Iterator[ChangeEvent]:
+        while True:
+            events = self.log.read(table, since, timeout)
+            if not events:
+                return
+            for event in events:
+                yield event
+            since = events[-1].seq
+
+    def insert_item(self, table: str, key: str, item: dict) -> dict:
+        inserted = self.backend.insert_item(table, key, item)
+        self.log.append(table, "insert", key, inserted if isinstance(inserted, dict) else item)
+        return inserted
+
+    def update_item(self, table: str, key: str, updates: dict) -> dict:
+        updated = self.backend.update_item(table, key, updates)
+        if updated:  # Updates of missing items are skipped by the backends
+            self.log.append(table, "update", key, updated)
+        return updated
+
+    def delete_item(self, table: str, key: str) -> None:
+        self.backend.delete_item(table, key)
+        self.log.append(table, "delete", key)
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        inserted = self.backend.insert_items(table, items)
+        for key, item in items.items():
+            self.log.append(table, "insert", key, {**item, "id": key})
+        return inserted
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        self.backend.delete_items(table, keys)
+        for key in keys:
+            self.log.append(table, "delete", key)
+
+    def write_batch(self, writes: Writes) -> None:
+        self.backend.write_batch(writes)
+        for table, table_writes in writes.items():
+            for key, write in table_writes.items():
+                op = {"put": "insert", "update": "update", "delete": "delete"}[write.op]
+                self.log.append(table, op, key, write.value)
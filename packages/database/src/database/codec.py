@@ -0,0 +1,158 @@
+import json
+import math
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, installed with the "codecs" extra
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # Optional dependency, installed with the "codecs" extra
+    msgpack = None
+try:
+    import zstandard
+except ImportError:  # Optional dependency, installed with the "codecs" extra
+    zstandard = None
+
+# Encoded documents other than plain JSON start with this header, followed by one format byte and
+# one compression byte. A JSON document never starts with a NUL byte, so existing data stays readable.
+MAGIC = b"\x00NDB"
+HEADER_SIZE = len(MAGIC) + 2
+FORMATS = {"json": 1, "msgpack": 2}
+COMPRESSIONS = {"none": 0, "zstd": 1}
+# Documents smaller than this are stored uncompressed
+COMPRESSION_THRESHOLD = 16 * 1024
+COMPRESSION_LEVEL = 3
+
+
+def _has_non_finite(value: Any) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(v) for v in value)
+    return False
+
+
+def json_dumps(item: Any) -> bytes:
+    """Serialize a document to JSON bytes, with orjson when installed. NaN and Infinity are kept."""
+    if orjson is not None:
+        try:
+            data = orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            data = None  # e.g. integers wider than 64 bits
+        # orjson writes NaN and Infinity as null; the stdlib keeps them. Only documents holding
+        # a null can be affected, so only those are checked.
+        if data is not None and (b"null" not in data or not _has_non_finite(item)):
+            return data
+    return json.dumps(item).encode("utf-8")
+
+
+def json_loads(data: bytes) -> Any:
+    """Parse JSON bytes written by json_dumps."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # NaN / Infinity written by the stdlib encoder
+    return json.loads(data)
+
+
+def _require(module: Any, name: str, package: str) -> None:
+    if module is None:
+        raise ImportError(f"The {name} codec requires {package}: pip install 'database[codecs]'")
+
+
+class Codec:
+    """
+    Serializes documents to bytes and back.
+
+    The format and compression are recorded in every stored object, so a table can hold documents
+    written with different settings (and plain JSON from before codecs existed); changing the
+    config only affects new writes.
+    """
+
+    def __init__(
+        self,
+        name: str = "json",
+        compression: str = "none",
+        compression_threshold: int = COMPRESSION_THRESHOLD,
+        compression_level: int = COMPRESSION_LEVEL,
+    ):
+        """
+        :param name: "json" (orjson when installed, else the standard library) or "msgpack".
+        :param compression: "none" or "zstd".
+        :param compression_threshold: Size in bytes from which encoded documents are compressed.
+        :param compression_level: zstd compression level.
+        """
+        if name == "orjson":
+            _require(orjson, name, "orjson")
+            name = "json"
+        if name not in FORMATS:
+            raise ValueError(f"Unsupported codec: {name}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if name == "msgpack":
+            _require(msgpack, name, "msgpack")
+        if compression == "zstd":
+            _require(zstandard, compression, "zstandard")
+        self.name = name
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+
+    def encode(self, item: Any) -> bytes:
+        """Serialize a document, compressing it when it reaches the threshold."""
+        if self.name == "msgpack":
+            data = msgpack.packb(item, use_bin_type=True)
+        else:
+            data = json_dumps(item)
+        compression = "none"
+        if self.compression == "zstd" and len(data) >= self.compression_threshold:
+            data = zstandard.ZstdCompressor(level=self.compression_level).compress(data)
+            compression = "zstd"
+        if self.name == "json" and compression == "none":
+            return data  # Plain JSON, readable by anything
+        return MAGIC + bytes((FORMATS[self.name], COMPRESSIONS[compression])) + data
+
+    def decode(self, data: bytes) -> Any:
+        """Deserialize a document written by any codec, or plain JSON."""
+        return decode(data)
+
+
+def decode(data: bytes) -> Any:
+    """Deserialize a document, reading its format and compression from the header."""
+    if not data.startswith(MAGIC):
+        return json_loads(data)
+    format_id, compression_id = data[len(MAGIC)], data[len(MAGIC) + 1]
+    payload = data[HEADER_SIZE:]
+    if compression_id == COMPRESSIONS["zstd"]:
+        _require(zstandard, "zstd", "zstandard")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif compression_id != COMPRESSIONS["none"]:
+        raise ValueError(f"Unknown compression id {compression_id} in stored document")
+    if format_id == FORMATS["msgpack"]:
+        _require(msgpack, "msgpack", "msgpack")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if format_id != FORMATS["json"]:
+        raise ValueError(f"Unknown format id {format_id} in stored document")
+    return json_loads(payload)
+
+
+def get_codec(config: Dict[str, Any]) -> Codec:
+    """
+    Build the codec configured for a backend.
+
+    Configuration keys: codec ("json", "orjson" or "msgpack", defaults to "json"), compression
+    ("none" or "zstd", defaults to "none"), compression_threshold (bytes, defaults to 16 KiB) and
+    compression_level (defaults to 3).
+    """
+    threshold = config.get("compression_threshold")
+    return Codec(
+        name=config.get("codec") or "json",
+        compression=config.get("compression") or "none",
+        compression_threshold=COMPRESSION_THRESHOLD if threshold is None else int(threshold),
+        compression_level=int(config.get("compression_level") or COMPRESSION_LEVEL),
+    )
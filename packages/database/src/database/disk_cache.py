@@ -0,0 +1,173 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from typing import BinaryIO, NamedTuple, Optional, Tuple, Union
+
+from .blob import copy_stream
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: evictions are then not serialized across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Default size bound of the cache directory
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# Evictions shrink the cache to this fraction of max_bytes, so they do not run on every write
+LOW_WATERMARK = 0.9
+# Temp files older than this were left by a crashed writer
+STALE_TEMP_SECONDS = 3600
+TEMP_PREFIX = ".tmp-"
+
+
+class CacheEntry(NamedTuple):
+    etag: str
+    offset: int  # Where the object bytes start in the entry file
+    size: int
+
+
+class DiskCache:
+    """
+    Size-bounded local disk cache of S3 objects, shared by every process using the same directory.
+
+    Each object is one file named after the hash of bucket/key, holding an "<etag> <size>" header
+    line followed by the object bytes. Callers revalidate entries with a conditional GET on the
+    ETag. Files are replaced atomically, so concurrent readers (even in other processes) see
+    either the old or the new version; a hit refreshes the file's mtime, and evictions drop the
+    least recently used files first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        :param directory: The cache directory, created if needed.
+        :param max_bytes: Approximate bound of the cache size. Larger objects are not cached.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._written = 0
+        self.evict()
+
+    def _path(self, bucket: str, key: str) -> str:
+        digest = hashlib.sha256(f"{bucket}/{key}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def open(self, bucket: str, key: str) -> Optional[Tuple[BinaryIO, CacheEntry]]:
+        """
+        Open the cached copy of an object, positioned at its first byte. Returns None on a miss.
+        The open file stays readable even if the entry is replaced or evicted meanwhile.
+        """
+        path = self._path(bucket, key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            header = f.readline()
+            etag, _, size = header.decode("utf-8").rstrip("\n").rpartition(" ")
+            if not etag or os.fstat(f.fileno()).st_size != len(header) + int(size):
+                raise ValueError(f"Truncated cache entry {path}")
+        except (ValueError, UnicodeDecodeError):
+            f.close()
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            pass  # Evicted meanwhile; the open file stays readable
+        return f, CacheEntry(etag, len(header), int(size))
+
+    def read(self, bucket: str, key: str) -> Optional[Tuple[str, bytes]]:
+        """Return the (etag, bytes) of a cached object, or None on a miss."""
+        opened = self.open(bucket, key)
+        if opened is None:
+            return None
+        f, entry = opened
+        with f:
+            return entry.etag, f.read()
+
+    def store(self, bucket: str, key: str, etag: str, data: Union[bytes, BinaryIO], size: int) -> bool:
+        """
+        Cache an object, given as bytes or as a stream that is copied in chunks.
+
+        :return: False if the object is larger than the cache and was not stored.
+        """
+        path = self._path(bucket, key)
+        if size > self.max_bytes:
+            self.discard(bucket, key)
+            return False
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        header = f"{etag} {size}\n".encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                if isinstance(data, bytes):
+                    f.write(data)
+                    written = len(data)
+                else:
+                    written = copy_stream(data, f)
+            if written != size:
+                raise IOError(f"Expected {size} bytes of {bucket}/{key}, got {written}")
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self._written += size
+        if self._written >= self.max_bytes * (1 - LOW_WATERMARK):
+            self.evict()
+        return True
+
+    def discard(self, bucket: str, key: str) -> None:
+        """Drop the cached copy of an object."""
+        self._remove(self._path(bucket, key))
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> None:
+        """
+        Delete least recently used entries until the cache fits in LOW_WATERMARK * max_bytes.
+        Skipped while another process is evicting from the same directory.
+        """
+        self._written = 0
+        with open(os.path.join(self.directory, ".lock"), "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+            entries, total = [], 0
+            now = time.time()
+            for shard in os.scandir(self.directory):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.startswith(TEMP_PREFIX):
+                        if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                            self._remove(entry.path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            target = self.max_bytes * LOW_WATERMARK
+            evicted = 0
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                self._remove(path)
+                total -= size
+                evicted += 1
+            logger.info(f"Evicted {evicted} entries from disk cache {self.directory}")
@@ -1,11 +1,213 @@
 from typing import Dict
-import boto3
+import base64
+import heapq
+import json
+import logging
+from aws_clients import get_resource
 from botocore.exceptions import BotoCoreError, ClientError
-from boto3.dynamodb.types import TypeSerializer
+from boto3.dynamodb.table import BatchWriter
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from database.batch import Writes, split_writes
 from database.interface import NoSqlDb
+from database.key_index import list_sorted_keys
+from database.query import normalize_filters, project
+from database.secondary_index import parse_indexes
+from decimal import Decimal
+import queue
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+# BatchGetItem accepts at most this many keys per request
+BATCH_GET_SIZE = 100
+# Attempts for a batch before giving up on still unprocessed keys
+BATCH_MAX_ATTEMPTS = 8
+
+# TransactWriteItems accepts at most this many actions
+TRANSACT_MAX_ITEMS = 100
+
+# Name of the global secondary index serving query_by_index for a field
+GSI_NAME_FORMAT = "{field}-index"
+
+# DynamoDB comparison operators for the query predicates
+QUERY_OPERATORS = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# Marks the end of one parallel scan segment on the page queue
+_SEGMENT_DONE = object()
+
+
+def _put_until_stopped(pages: queue.Queue, value, stop: threading.Event) -> bool:
+    """Put a value on a bounded queue, giving up if the consumer has stopped reading."""
+    while not stop.is_set():
+        try:
+            pages.put(value, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _to_dynamodb_value(value: Any) -> Any:
+    """DynamoDB numbers are Decimals; floats are converted through their string form."""
+    return Decimal(str(value)) if isinstance(value, float) else value
+
+
+def _predicate_clause(i: int, field: str, op: str, operand: Any, names: dict, values: dict) -> str:
+    """Render one query predicate as a condition expression, registering its names and values."""
+    name = f"#q{i}"
+    names[name] = field
+    if op == "in":
+        placeholders = []
+        for j, value in enumerate(operand):
+            values[f":q{i}_{j}"] = _to_dynamodb_value(value)
+            placeholders.append(f":q{i}_{j}")
+        return f"{name} IN ({', '.join(placeholders)})"
+    values[f":q{i}"] = _to_dynamodb_value(operand)
+    if op == "prefix":
+        return f"begins_with({name}, :q{i})"
+    return f"{name} {QUERY_OPERATORS[op]} :q{i}"
+
+
+def _key_scan_kwargs(conditions: List[str], values: dict) -> dict:
+    """Scan parameters reading only the id of the items, filtered server side on `conditions`."""
+    scan_kwargs = {"ProjectionExpression": "#id", "ExpressionAttributeNames": {"#id": "id"}}
+    if conditions:
+        scan_kwargs["FilterExpression"] = " AND ".join(conditions)
+        scan_kwargs["ExpressionAttributeValues"] = values
+    return scan_kwargs
+
+
+def _encode_cursor(key: dict) -> str:
+    """Encode a primary (or index) key as an opaque, URL safe cursor."""
+    serializer = TypeSerializer()
+    serialized = {name: serializer.serialize(value) for name, value in key.items()}
+    return base64.urlsafe_b64encode(json.dumps(serialized).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> dict:
+    """Decode a cursor back into the ExclusiveStartKey it was made from."""
+    serialized = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    deserializer = TypeDeserializer()
+    return {name: deserializer.deserialize(value) for name, value in serialized.items()}
+
+
+class _QueryPlan:
+    """
+    The Scan or index Query requests of NoSqlDb.query, shared by the sync and async backends.
+    See DynamoDBDatabase.query.
+    """
+
+    def __init__(self, table_name: str, indexes: List[str], filters: Optional[Dict[str, Any]],
+                 fields: Optional[List[str]], limit: Optional[int]):
+        self.table_name = table_name
+        self.predicates = normalize_filters(filters)
+        self.fields = fields
+        self.limit = limit
+        # An empty "in" matches nothing, there is no need to ask DynamoDB
+        self.empty = any(op == "in" and not operand for _, op, operand in self.predicates)
+        self.names, self.values = {}, {}
+        self.clauses = [
+            _predicate_clause(i, *predicate, self.names, self.values) for i, predicate in enumerate(self.predicates)
+        ]
+        self.index_at = next(
+            (i for i, (field, op, _) in enumerate(self.predicates) if op == "eq" and field in indexes),
+            None,
+        )
+
+    @property
+    def index_name(self) -> str:
+        return GSI_NAME_FORMAT.format(field=self.predicates[self.index_at][0])
+
+    def key_fields(self, use_index: bool) -> List[str]:
+        """The attributes of the LastEvaluatedKey, which make up the cursor."""
+        return ["id", self.predicates[self.index_at][0]] if use_index else ["id"]
+
+    def request_kwargs(self, use_index: bool, cursor: Optional[str]) -> dict:
+        kwargs = {"TableName": self.table_name}
+        filter_clauses = [clause for i, clause in enumerate(self.clauses) if not (use_index and i == self.index_at)]
+        if use_index:
+            kwargs["IndexName"] = self.index_name
+            kwargs["KeyConditionExpression"] = self.clauses[self.index_at]
+        if filter_clauses:
+            kwargs["FilterExpression"] = " AND ".join(filter_clauses)
+        elif self.limit:
+            kwargs["Limit"] = self.limit
+        expression_names = dict(self.names)
+        if self.fields:
+            # The key attributes are always read, they make up the cursor
+            projected = {*self.key_fields(use_index), *self.fields}
+            for j, field in enumerate(sorted(projected)):
+                expression_names[f"#p{j}"] = field
+            kwargs["ProjectionExpression"] = ", ".join(f"#p{j}" for j in range(len(projected)))
+        if expression_names:
+            kwargs["ExpressionAttributeNames"] = expression_names
+        if self.values:
+            kwargs["ExpressionAttributeValues"] = self.values
+        if cursor:
+            kwargs["ExclusiveStartKey"] = _decode_cursor(cursor)
+        return kwargs
+
+    def add_page(self, items: List[dict], page: List[dict], use_index: bool) -> Optional[str]:
+        """
+        Project the items of a response page into `items`. Returns the cursor once `limit` items
+        were collected, None while more are needed.
+        """
+        for item in page:
+            items.append(project(item, self.fields))
+            if self.limit and len(items) >= self.limit:
+                return _encode_cursor({k: item[k] for k in self.key_fields(use_index)})
+        return None
+
+
+def _update_action(table_name: str, key: str, updates: dict) -> dict:
+    """Build the UpdateItem parameters of update_item, without the fields named id."""
+    updates = {k: v for k, v in updates.items() if k != "id"}
+    names = {f"#u{i}": field for i, field in enumerate(updates)}
+    values = {f":u{i}": value for i, value in enumerate(updates.values())}
+    return {
+        "TableName": table_name,
+        "Key": {"id": key},
+        "UpdateExpression": "SET " + ", ".join(f"#u{i} = :u{i}" for i in range(len(updates))),
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+        "ConditionExpression": "attribute_exists(id)",  # Do not create missing items
+    }
+
+
+def _transact_actions(table_prefix: str, writes: Writes) -> List[dict]:
+    """Build the TransactWriteItems actions of a batch. See DynamoDBDatabase.write_batch."""
+    actions = []
+    for table, table_writes in writes.items():
+        table_name = f"{table_prefix}{table}"
+        puts, updates, deletes = split_writes(table_writes)
+        for key, item in puts.items():
+            actions.append({"Put": {"TableName": table_name, "Item": {**item, "id": str(key)}}})
+        for key, fields in updates.items():
+            if any(field != "id" for field in fields):
+                actions.append({"Update": _update_action(table_name, key, fields)})
+        for key in deletes:
+            actions.append({"Delete": {"TableName": table_name, "Key": {"id": key}}})
+    return actions
+
+
+def _is_missing_update(e: ClientError) -> bool:
+    """Whether a transaction was cancelled because one of its updates targets a missing item."""
+    reasons = e.response.get("CancellationReasons") or []
+    return e.response.get("Error", {}).get("Code") == "TransactionCanceledException" and any(
+        reason.get("Code") == "ConditionalCheckFailed" for reason in reasons
+    )
+
+
+def _is_missing_index(e: ClientError) -> bool:
+    # DynamoDB reports a missing index as ValidationException (some emulators as ResourceNotFoundException)
+    return e.response.get("Error", {}).get("Code") in ("ValidationException", "ResourceNotFoundException")
+
+
 class DynamoDBDatabase(NoSqlDb):
     """Implementation of NoSqlDb using AWS DynamoDB."""
 
@@ -17,26 +219,40 @@ class DynamoDBDatabase(NoSqlDb):
         # aws_secret_access_key: str = None,
         config: Dict[str, str] = None,
     ):
-        """Initialize DynamoDB client with optional AWS credentials."""
+        """
+        Initialize DynamoDB client with optional AWS credentials.
+
+        Expected configuration keys:
+          - region_name, aws_access_key_id, aws_secret_access_key (optional): AWS settings.
+          - aws_max_pool_connections, aws_retry_mode, ... (optional): Tuning of the shared client,
+                    see aws_clients.config_kwargs.
+          - table_prefix (optional): Prefix added to every table name.
+          - scan_segments (optional): Parallel segments used for full table scans. Defaults to 1.
+          - indexes (optional): Secondary indexes as {table: [field, ...]}. Each field needs a global
+                    secondary index named "<field>-index" with the field as hash key and an ALL projection.
+        """
         if not config:
             raise ValueError("Missing configuration for DynamoDB database.")
         
         self.config = config
         
-        self.dynamodb = boto3.resource(
-            "dynamodb",
-            region_name=config.get("region_name"),
-            aws_access_key_id=config.get("aws_access_key_id"),
-            aws_secret_access_key=config.get("aws_secret_access_key")
-        )
+        # Only ever used through self.dynamodb.meta.client: instances are shared by request threads
+        # and boto3 clients are thread safe, resources are not
+        self.dynamodb = get_resource("dynamodb", config)
         
         self.table_prefix = config.get("table_prefix", "")
         self.serializer = TypeSerializer()
+        self.scan_segments = int(config.get("scan_segments") or 1)
+        self.indexes = parse_indexes(config)
 
         
-    def _get_table(self, table: str):
-        """Helper function to get a DynamoDB table."""
-        return self.dynamodb.Table(f"{self.table_prefix}{table}")
+    def _table_name(self, table: str) -> str:
+        """Helper function to get the DynamoDB name of a table."""
+        return f"{self.table_prefix}{table}"
+
+    def _batch_writer(self, table: str) -> BatchWriter:
+        """boto3's batch writer on the thread-safe client: BatchWriteItem, resending unprocessed items."""
+        return BatchWriter(self._table_name(table), self.dynamodb.meta.client, overwrite_by_pkeys=["id"])
 
     def _serialize_item(self, item: dict) -> dict:
         """
@@ -56,7 +272,7 @@ class DynamoDBDatabase(NoSqlDb):
 
             print(f"Inserting key {key} item: {item}")
 
-            table_ref = self._get_table(table)
+            client = self.dynamodb.meta.client
 
             if isinstance(item, BaseModel):
                 item = item.dict()  # Convert Pydantic model to dict
@@ -67,7 +283,7 @@ class DynamoDBDatabase(NoSqlDb):
             serialized_item = item 
 
             print(f"Serialized item: {serialized_item}")
-            table_ref.put_item(Item=serialized_item)
+            client.put_item(TableName=self._table_name(table), Item=serialized_item)
             return item
         except (BotoCoreError, ClientError) as e:
             raise RuntimeError(f"DynamoDB insert failed: {e}")
@@ -77,25 +293,91 @@ class DynamoDBDatabase(NoSqlDb):
         """Retrieve an item by key from DynamoDB."""
         print(f"Retrieving item with key {key} from table {table}")
         try:
-            table_ref = self._get_table(table)
-            response = table_ref.get_item(Key={"id": key})
+            response = self.dynamodb.meta.client.get_item(TableName=self._table_name(table), Key={"id": key})
             return response.get("Item", {})
         except (BotoCoreError, ClientError) as e:
             raise RuntimeError(f"DynamoDB get failed: {e}")
 
-    def get_all_items(self, table: str) -> list:
-        """Retrieve all items from a DynamoDB table (scan operation)."""
+    def _scan_pages(self, table_name: str, scan_kwargs: dict, segment: int = None, total_segments: int = None) -> Iterator[List[dict]]:
+        """Yield deserialized pages of a (segment of a) scan, following LastEvaluatedKey until exhausted."""
+        # Clients are thread safe, resources are not. The resource's client already converts
+        # between DynamoDB attribute values and Python types.
+        client = self.dynamodb.meta.client
+        kwargs = dict(scan_kwargs, TableName=table_name)
+        if total_segments:
+            kwargs.update(Segment=segment, TotalSegments=total_segments)
+        while True:
+            try:
+                response = client.scan(**kwargs)
+            except (BotoCoreError, ClientError) as e:
+                raise RuntimeError(f"DynamoDB scan failed: {e}")
+            yield response.get("Items", [])
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
+
+    def scan_items(self, table: str, segments: int = None, **scan_kwargs) -> Iterator[dict]:
+        """
+        Stream every item of a table, following scan pagination past the 1 MB page limit.
+
+        With more than one segment the scan is split into TotalSegments parallel segments run on a
+        thread pool, and items are yielded as pages arrive (in no particular order).
+
+        :param table: The table to scan.
+        :param segments: Number of parallel segments. Defaults to the `scan_segments` config value.
+        :param scan_kwargs: Extra Scan parameters, e.g. FilterExpression or ProjectionExpression.
+        :return: An iterator over the items.
+        """
+        table_name = f"{self.table_prefix}{table}"
+        segments = segments or self.scan_segments
+        if segments <= 1:
+            for page in self._scan_pages(table_name, scan_kwargs):
+                yield from page
+            return
+
+        pages = queue.Queue(maxsize=segments * 2)  # Bounded so a slow consumer throttles the workers
+        stop = threading.Event()
+
+        def scan_segment(segment: int):
+            try:
+                for page in self._scan_pages(table_name, scan_kwargs, segment, segments):
+                    if not _put_until_stopped(pages, page, stop):
+                        return
+            except Exception as e:
+                _put_until_stopped(pages, e, stop)
+            finally:
+                _put_until_stopped(pages, _SEGMENT_DONE, stop)
+
+        executor = ThreadPoolExecutor(max_workers=segments, thread_name_prefix="dynamodb-scan")
         try:
-            table_ref = self._get_table(table)
-            response = table_ref.scan()
-            return response.get("Items", [])
-        except (BotoCoreError, ClientError) as e:
-            raise RuntimeError(f"DynamoDB scan failed: {e}")
+            for segment in range(segments):
+                executor.submit(scan_segment, segment)
+            remaining = segments
+            while remaining:
+                page = pages.get()
+                if page is _SEGMENT_DONE:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[dict]:
+        """Stream all items from a DynamoDB table, `page_size` items per Scan request."""
+        return self.scan_items(table, Limit=page_size)
+
+    def get_all_items(self, table: str) -> list:
+        """Retrieve all items from a DynamoDB table (paginated, optionally parallel scan)."""
+        return list(self.scan_items(table))
 
     def update_item(self, table: str, key: str, updates: dict) -> dict:
-        """Update an item in DynamoDB."""
+        """Update an existing item in DynamoDB and return the new document, or {} if it does not exist."""
         try:
-            table_ref = self._get_table(table)
+            client = self.dynamodb.meta.client
 
             # Remove 'id' from updates to prevent modification errors
             updates = {k: v for k, v in updates.items() if k != "id"}
@@ -108,21 +390,308 @@ class DynamoDBDatabase(NoSqlDb):
             expression_attr_values = {f":{k}": v for k, v in updates.items()}
             expression_attr_names = {f"#{k}": k for k in updates.keys()}
 
-            response = table_ref.update_item(
+            response = client.update_item(
+                TableName=self._table_name(table),
                 Key={"id": key},  # Ensure 'id' is used only for lookup
                 UpdateExpression=update_expression,
                 ExpressionAttributeValues=expression_attr_values,
                 ExpressionAttributeNames=expression_attr_names,
+                ConditionExpression="attribute_exists(id)",  # Do not create missing items
                 ReturnValues="ALL_NEW",
             )
             return response.get("Attributes", {})
-        except (BotoCoreError, ClientError) as e:
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return {}
+            raise RuntimeError(f"DynamoDB update failed: {e}")
+        except BotoCoreError as e:
             raise RuntimeError(f"DynamoDB update failed: {e}")
 
     def delete_item(self, table: str, key: str) -> None:
         """Delete an item from DynamoDB."""
         try:
-            table_ref = self._get_table(table)
-            table_ref.delete_item(Key={"id": key})
+            self.dynamodb.meta.client.delete_item(TableName=self._table_name(table), Key={"id": key})
         except (BotoCoreError, ClientError) as e:
             raise RuntimeError(f"DynamoDB delete failed: {e}")
+
+    def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        """
+        Search for items whose keys contain or match a part of the given key.
+
+        Prefix searches are evaluated server side with a begins_with filter; regex searches
+        scan the table and filter locally.
+        """
+        if regex:
+            pattern = re.compile(key_part)
+            return [item for item in self.scan_items(table) if "id" in item and pattern.search(item["id"])]
+        return list(self.scan_items(
+            table,
+            FilterExpression="begins_with(#id, :prefix)",
+            ExpressionAttributeNames={"#id": "id"},
+            ExpressionAttributeValues={":prefix": key_part},
+        ))
+
+    def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        List keys with a key-only (projected) scan, filtered server side on the prefix and on the
+        cursor, so only the keys after the cursor are returned and sorted.
+
+        A hash key has no order DynamoDB can start a scan from: every page still reads the key
+        of every item of the table, i.e. O(table) read capacity per call. Walking a large table
+        page by page costs O(table) per page; prefer iter_items or query for full walks.
+        """
+        conditions, values = [], {}
+        if prefix:
+            conditions.append("begins_with(#id, :prefix)")
+            values[":prefix"] = prefix
+        if cursor:
+            conditions.append("#id > :cursor")
+            values[":cursor"] = cursor
+        keys = (item["id"] for item in self.scan_items(table, **_key_scan_kwargs(conditions, values)))
+        # Without a delimiter a page holds at most `limit` keys, plus one to tell whether more follow
+        sorted_keys = heapq.nsmallest(limit + 1, keys) if limit is not None and not delimiter else sorted(keys)
+        return list_sorted_keys(sorted_keys, prefix, delimiter, limit, cursor)
+
+    def exists(self, table: str, key: str) -> bool:
+        """Check whether an item exists with a get_item projected on the key only."""
+        try:
+            response = self.dynamodb.meta.client.get_item(
+                TableName=self._table_name(table),
+                Key={"id": key},
+                ProjectionExpression="#id",
+                ExpressionAttributeNames={"#id": "id"},
+            )
+            return "Item" in response
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB get failed: {e}")
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """Count the items of a table with a Select=COUNT scan, so no item is returned."""
+        client = self.dynamodb.meta.client
+        kwargs = {"TableName": f"{self.table_prefix}{table}", "Select": "COUNT"}
+        if prefix:
+            kwargs["FilterExpression"] = "begins_with(#id, :prefix)"
+            kwargs["ExpressionAttributeNames"] = {"#id": "id"}
+            kwargs["ExpressionAttributeValues"] = {":prefix": prefix}
+        total = 0
+        while True:
+            try:
+                response = client.scan(**kwargs)
+            except (BotoCoreError, ClientError) as e:
+                raise RuntimeError(f"DynamoDB scan failed: {e}")
+            total += response.get("Count", 0)
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return total
+            kwargs["ExclusiveStartKey"] = last_key
+
+    def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose keys fall in [start_key, end_key), in key order: one key-only scan
+        filtered server side on the range, then a BatchGetItem of the keys in it.
+
+        The scan still reads the key of every item of the table (O(table) read capacity per
+        call); only the keys in the range are returned.
+        """
+        conditions, values = [], {}
+        if start_key is not None:
+            conditions.append("#id >= :start")
+            values[":start"] = start_key
+        if end_key is not None:
+            conditions.append("#id < :end")
+            values[":end"] = end_key
+        keys = (item["id"] for item in self.scan_items(table, **_key_scan_kwargs(conditions, values)))
+        return self.get_items(table, heapq.nsmallest(limit, keys) if limit is not None else sorted(keys))
+
+    def _query_pages(self, table_name: str, query_kwargs: dict) -> Iterator[dict]:
+        """Yield the items of a Query, following LastEvaluatedKey until exhausted."""
+        client = self.dynamodb.meta.client
+        kwargs = dict(query_kwargs, TableName=table_name)
+        while True:
+            response = client.query(**kwargs)
+            yield from response.get("Items", [])
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose `field` equals `value`.
+
+        Declared indexes are served by a Query on the "<field>-index" global secondary index.
+        Other fields, or a declared index missing on the table, fall back to a scan with a
+        server side filter.
+        """
+        condition = {
+            "ExpressionAttributeNames": {"#field": field},
+            "ExpressionAttributeValues": {":value": value},
+        }
+        if field in self.indexes.get(table, ()):
+            try:
+                return list(self._query_pages(
+                    f"{self.table_prefix}{table}",
+                    dict(condition, IndexName=GSI_NAME_FORMAT.format(field=field), KeyConditionExpression="#field = :value"),
+                ))
+            except ClientError as e:
+                if not _is_missing_index(e):
+                    raise RuntimeError(f"DynamoDB query failed: {e}")
+                logger.warning(f"Index {GSI_NAME_FORMAT.format(field=field)} not usable on table {table}, scanning instead: {e}")
+            except BotoCoreError as e:
+                raise RuntimeError(f"DynamoDB query failed: {e}")
+        return list(self.scan_items(table, FilterExpression="#field = :value", **condition))
+
+    def query(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the items matching `filters`, one page at a time, evaluated by DynamoDB.
+
+        Predicates become a FilterExpression, `fields` a ProjectionExpression and the cursor the
+        ExclusiveStartKey. An equality on an indexed field is a Query on its "<field>-index"
+        global secondary index (KeyConditionExpression); anything else is a Scan. Without filters
+        `limit` is passed as the native Limit; with filters pages are read until `limit` items
+        matched. Items come in DynamoDB's order (index or hash order), not key order.
+        See NoSqlDb.query for the filter language.
+        """
+        plan = _QueryPlan(f"{self.table_prefix}{table}", self.indexes.get(table, ()), filters, fields, limit)
+        if plan.empty:
+            return {"items": [], "cursor": None}
+
+        def run(use_index: bool) -> Dict[str, Any]:
+            client = self.dynamodb.meta.client
+            call = client.query if use_index else client.scan
+            kwargs = plan.request_kwargs(use_index, cursor)
+            items = []
+            while True:
+                response = call(**kwargs)
+                next_cursor = plan.add_page(items, response.get("Items", []), use_index)
+                if next_cursor:
+                    return {"items": items, "cursor": next_cursor}
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    return {"items": items, "cursor": None}
+                kwargs["ExclusiveStartKey"] = last_key
+
+        try:
+            if plan.index_at is not None:
+                try:
+                    return run(use_index=True)
+                except ClientError as e:
+                    if not _is_missing_index(e):
+                        raise
+                    logger.warning(f"Index {plan.index_name} not usable on table {table}, scanning instead: {e}")
+            return run(use_index=False)
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB query failed: {e}")
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        """Insert items with BatchWriteItem; boto3's batch writer resends unprocessed items."""
+        try:
+            inserted = []
+            with self._batch_writer(table) as batch:
+                for key, item in items.items():
+                    if isinstance(item, BaseModel):
+                        item = item.dict()
+                    item["id"] = str(key)
+                    batch.put_item(Item=item)
+                    inserted.append(item)
+            return inserted
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB batch insert failed: {e}")
+
+    def get_items(self, table: str, keys: List[str]) -> List[dict]:
+        """Retrieve items with BatchGetItem in chunks of 100, retrying unprocessed keys with backoff."""
+        table_name = f"{self.table_prefix}{table}"
+        unique_keys = list(dict.fromkeys(keys))  # BatchGetItem rejects duplicate keys
+        found = {}
+        try:
+            for start in range(0, len(unique_keys), BATCH_GET_SIZE):
+                chunk = unique_keys[start:start + BATCH_GET_SIZE]
+                request = {table_name: {"Keys": [{"id": key} for key in chunk]}}
+                for attempt in range(BATCH_MAX_ATTEMPTS):
+                    response = self.dynamodb.meta.client.batch_get_item(RequestItems=request)
+                    for item in response.get("Responses", {}).get(table_name, []):
+                        found[item["id"]] = item
+                    request = response.get("UnprocessedKeys")
+                    if not request:
+                        break
+                    time.sleep(min(0.05 * (2 ** attempt), 2))
+                else:
+                    raise RuntimeError(f"DynamoDB batch get left unprocessed keys in {table_name}")
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB batch get failed: {e}")
+        return [found[key] for key in keys if key in found]
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        """Delete items with BatchWriteItem; boto3's batch writer resends unprocessed items."""
+        try:
+            with self._batch_writer(table) as batch:
+                for key in keys:
+                    batch.delete_item(Key={"id": key})
+        except (BotoCoreError, ClientError) as e:
+            raise RuntimeError(f"DynamoDB batch delete failed: {e}")
+
+    def write_batch(self, writes: Writes) -> None:
+        """
+        Apply a batch with one TransactWriteItems call when it holds at most 100 writes, so it
+        commits atomically. Larger batches, and batches updating an item that does not exist
+        (which update_item skips but would cancel the transaction), fall back to BatchWriteItem
+        per table plus an update_item per update.
+        """
+        if sum(len(table_writes) for table_writes in writes.values()) > TRANSACT_MAX_ITEMS:
+            return super().write_batch(writes)
+        actions = _transact_actions(self.table_prefix, writes)
+        if not actions:
+            return
+        try:
+            # The resource's client (de)serializes plain Python values, like the Table API
+            self.dynamodb.meta.client.transact_write_items(TransactItems=actions)
+        except ClientError as e:
+            if _is_missing_update(e):
+                logger.warning("Batch updates a missing item, writing it without a transaction")
+                return super().write_batch(writes)
+            raise RuntimeError(f"DynamoDB batch write failed: {e}")
+        except BotoCoreError as e:
+            raise RuntimeError(f"DynamoDB batch write failed: {e}")
+
+    def enable_ttl(self, table: str, attribute: str) -> None:
+        """
+        Turn on DynamoDB's native TTL for a table: items whose `attribute` (epoch seconds) lies
+        in the past are deleted by DynamoDB in the background, typically within a few days.
+        """
+        client = self.dynamodb.meta.client
+        table_name = f"{self.table_prefix}{table}"
+        description = client.describe_time_to_live(TableName=table_name)["TimeToLiveDescription"]
+        if description.get("TimeToLiveStatus") in ("ENABLED", "ENABLING") and description.get("AttributeName") == attribute:
+            return
+        client.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={"Enabled": True, "AttributeName": attribute},
+        )
+        logger.info(f"Enabled TTL on DynamoDB table {table_name} (attribute {attribute})")
+
+    def close(self) -> None:
+        """
+        Release this instance. The DynamoDB client is shared process-wide through aws_clients and
+        stays open for its other users; aws_clients.reset_clients closes it.
+        """
+        pass
@@ -1,16 +1,42 @@
-from typing import Dict
-from .interface import NoSqlDb
-# from app.config import settings  # Ensure settings are accessible here
+import atexit
+import json
+import logging
+import threading
 from typing import Callable, Dict
 from database.interface import NoSqlDb
+from database.async_interface import AsyncNoSqlDb
+from database.aio_client import aiobotocore_available
+from database.async_database import ThreadedAsyncNoSqlDb
+from database.async_dynamodb_database import AsyncDynamoDBDatabase
+from database.async_filesystem_database import AsyncFilesystemDatabase, aiofiles_available
+from database.async_s3_database import AsyncS3Database
+from database.cached_database import CachedNoSqlDb
+from database.changes import DEFAULT_MAX_EVENTS, ChangeFeedNoSqlDb, ChangeLog
+from database.metrics import AsyncMetricsNoSqlDb, MetricsNoSqlDb
+from database.ttl import DEFAULT_SWEEP_BATCH_SIZE, DEFAULT_SWEEP_INTERVAL, DEFAULT_TTL_ATTRIBUTE, TtlNoSqlDb
 from database.tinydb import TinyDBDatabase
 from database.dynamodb_database import DynamoDBDatabase
 from database.filesystem_database import FilesystemDatabase
+from database.log_database import LogDatabase
+from database.sqlite_database import SqliteDatabase
 from database.s3_database import S3Database
+from database.wrapper import NoSqlDbWrapper
 
+logger = logging.getLogger(__name__)
 
-def get_database(config_provider: Callable[[], Dict[str, str]]) -> NoSqlDb:
-    config = config_provider()
+# Process-wide registry of live database instances keyed by their effective config
+_databases: Dict[str, NoSqlDb] = {}
+_databases_lock = threading.Lock()
+# Same for the async instances
+_async_databases: Dict[str, AsyncNoSqlDb] = {}
+
+
+def _registry_key(config: Dict[str, str]) -> str:
+    """Build a stable registry key from the effective database configuration."""
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+def _create_database(config: Dict[str, str]) -> NoSqlDb:
     database_type = config.get("database_type", "").lower()
     if database_type == "dynamodb":
         return DynamoDBDatabase(config=config)
@@ -20,12 +46,215 @@ def get_database(config_provider: Callable[[], Dict[str, str]]) -> NoSqlDb:
         return S3Database(config=config)
     elif database_type == "filesystem":
         return FilesystemDatabase(config=config)
+    elif database_type == "logdb":
+        return LogDatabase(config=config)
+    elif database_type == "sqlite":
+        return SqliteDatabase(config=config)
     elif database_type == "none":
         return None
     else:
         raise ValueError(f"Unsupported database type: {database_type}")
 
 
+def _wrap_changes(db: NoSqlDb, config: Dict[str, str]) -> NoSqlDb:
+    """
+    Record the writes made through the instance for NoSqlDb.watch when "change_feed" is set,
+    retaining the last "change_feed_max_events" events per table (default 10000).
+    """
+    if not db or not config.get("change_feed"):
+        return db
+    return ChangeFeedNoSqlDb(db, ChangeLog(int(config.get("change_feed_max_events") or DEFAULT_MAX_EVENTS)))
+
+
+def _wrap_ttl(db: NoSqlDb, config: Dict[str, str]) -> NoSqlDb:
+    """
+    Expire items when "ttl_tables" is configured as {table: seconds}. The expiry time is kept in
+    the "ttl_attribute" item attribute (default "expires_at"). DynamoDB deletes expired items
+    natively; other backends are swept every "ttl_sweep_interval" seconds (default 60), each
+    sweep examining the next "ttl_sweep_batch_size" keys per table (default 500).
+    """
+    ttl_tables = config.get("ttl_tables")
+    if not db or not ttl_tables:
+        return db
+    attribute = config.get("ttl_attribute") or DEFAULT_TTL_ATTRIBUTE
+    sweep_interval = config.get("ttl_sweep_interval")
+    sweep_interval = DEFAULT_SWEEP_INTERVAL if sweep_interval is None else float(sweep_interval)
+    enable_ttl = getattr(db, "enable_ttl", None)  # Backends with native expiry
+    if enable_ttl is not None:
+        try:
+            for table in ttl_tables:
+                enable_ttl(table, attribute)
+            sweep_interval = 0
+        except Exception:
+            logger.exception("Failed to enable native TTL, sweeping expired items instead")
+    return TtlNoSqlDb(
+        db,
+        tables=ttl_tables,
+        attribute=attribute,
+        sweep_interval=sweep_interval,
+        sweep_batch_size=int(config.get("ttl_sweep_batch_size") or DEFAULT_SWEEP_BATCH_SIZE),
+    )
+
+
+def _wrap_cache(db: NoSqlDb, config: Dict[str, str]) -> NoSqlDb:
+    """
+    Put a read-through cache in front of the database when "cache_tables" is configured:
+    a list of table names, or "*" for every table. Bounded by "cache_ttl" seconds (default 30),
+    "cache_max_items" entries (default 1024) and "cache_negative_ttl" seconds for misses.
+    """
+    cache_tables = config.get("cache_tables")
+    if not db or not cache_tables:
+        return db
+    negative_ttl = config.get("cache_negative_ttl")
+    return CachedNoSqlDb(
+        db,
+        tables=None if cache_tables == "*" else cache_tables,
+        ttl=float(config.get("cache_ttl") or 30),
+        max_items=int(config.get("cache_max_items") or 1024),
+        negative_ttl=None if negative_ttl is None else float(negative_ttl),
+    )
+
+
+def _wrap_metrics(db: NoSqlDb, config: Dict[str, str]) -> NoSqlDb:
+    """
+    Record per (backend, table, operation) metrics of every call when "metrics_enabled" is set,
+    outermost so cache hits are measured as the callers see them. "metrics_measure_bytes" also
+    counts the serialized size of documents.
+    """
+    if not db or not config.get("metrics_enabled"):
+        return db
+    return MetricsNoSqlDb(
+        db,
+        name=config.get("database_type", "").lower() or None,
+        measure_bytes=bool(config.get("metrics_measure_bytes")),
+    )
+
+
+def get_database(config_provider: Callable[[], Dict[str, str]]) -> NoSqlDb:
+    """
+    Return the shared NoSqlDb instance for the current configuration.
+
+    Instances are created once per distinct configuration and reused by every
+    caller in the process, so clients, connection pools and file handles are
+    not rebuilt on each request.
+
+    :param config_provider: A callable that returns the database configuration.
+    :return: An instance of NoSqlDb (or None when database_type is "none").
+    """
+    config = config_provider()
+    key = _registry_key(config)
+    if key in _databases:
+        return _databases[key]
+
+    with _databases_lock:
+        if key not in _databases:  # Double-checked locking
+            logger.info(f"Creating {config.get('database_type')} database instance")
+            db = _wrap_ttl(_wrap_changes(_create_database(config), config), config)
+            _databases[key] = _wrap_metrics(_wrap_cache(db, config), config)
+        return _databases[key]
+
+
+def close_database(config_provider: Callable[[], Dict[str, str]]) -> None:
+    """
+    Close and forget the shared instance for the given configuration, if any.
+
+    :param config_provider: A callable that returns the database configuration.
+    """
+    key = _registry_key(config_provider())
+    with _databases_lock:
+        db = _databases.pop(key, None)
+    if db:
+        db.close()
+
+
+def reset_databases() -> None:
+    """Close every registered database instance and empty the registry."""
+    with _databases_lock:
+        databases = list(_databases.values())
+        _databases.clear()
+    for db in databases:
+        if not db:
+            continue
+        try:
+            db.close()
+        except Exception:
+            logger.exception("Failed to close database instance")
+
+
+# Flush write-behind caches and release clients when the process exits
+atexit.register(reset_databases)
+
+
+def _create_async_database(config: Dict[str, str], db: NoSqlDb) -> AsyncNoSqlDb:
+    """
+    Use a native async backend when the "async" extra is installed and "async_native" is not
+    turned off: aiobotocore clients for S3 and DynamoDB, aiofiles reads for the filesystem.
+    The cache, TTL and change feed layers (and the S3 disk cache) only exist on the shared sync
+    instance, which a native backend would bypass, so with any of them configured - and for the
+    other backends - the shared instance runs on a thread pool of "async_max_workers" threads.
+    """
+    max_workers = config.get("async_max_workers")
+    max_workers = int(max_workers) if max_workers else None
+    database_type = config.get("database_type", "").lower()
+    sync_only = any(config.get(key) for key in ("cache_tables", "ttl_tables", "change_feed", "disk_cache_dir"))
+    native = None
+    if config.get("async_native", True) and not sync_only:
+        if database_type == "s3" and aiobotocore_available():
+            native = AsyncS3Database(config)
+        elif database_type == "dynamodb" and aiobotocore_available():
+            native = AsyncDynamoDBDatabase(config)
+        elif database_type == "filesystem" and aiofiles_available():
+            files = db
+            while isinstance(files, NoSqlDbWrapper):  # The metrics wrapper
+                files = files.backend
+            native = AsyncFilesystemDatabase(files, max_workers=max_workers)
+    if native is None:
+        return ThreadedAsyncNoSqlDb(db, max_workers=max_workers)
+    if not config.get("metrics_enabled"):
+        return native
+    return AsyncMetricsNoSqlDb(
+        native,
+        name=database_type or None,
+        measure_bytes=bool(config.get("metrics_measure_bytes")),
+    )
+
+
+def get_async_database(config_provider: Callable[[], Dict[str, str]]) -> AsyncNoSqlDb:
+    """
+    Return the shared AsyncNoSqlDb instance for the current configuration, for callers running
+    on an event loop: a native async backend where one is available, else the shared instance
+    of get_database on a thread pool (see _create_async_database). Either way it works on the
+    same data as get_database and records into the same metrics.
+
+    :param config_provider: A callable that returns the database configuration.
+    :return: An instance of AsyncNoSqlDb (or None when database_type is "none").
+    """
+    config = config_provider()
+    key = _registry_key(config)
+    if key in _async_databases:
+        return _async_databases[key]
+
+    db = get_database(lambda: config)  # Outside the lock: get_database takes it as well
+    with _databases_lock:
+        if key not in _async_databases:
+            _async_databases[key] = None if db is None else _create_async_database(config, db)
+        return _async_databases[key]
+
+
+async def reset_async_databases() -> None:
+    """Close every registered async database instance and empty the registry."""
+    with _databases_lock:
+        databases = list(_async_databases.values())
+        _async_databases.clear()
+    for db in databases:
+        if db is None:
+            continue
+        try:
+            await db.close()
+        except Exception:
+            logger.exception("Failed to close async database instance")
+
+
 def get_db(config_provider: Callable[[], Dict[str, str]]) -> NoSqlDb:
     """
     Load database implementation dynamically based on a configuration provider.
@@ -37,4 +266,4 @@ def get_db(config_provider: Callable[[], Dict[str, str]]) -> NoSqlDb:
     # database_type = config.get("database_type", "").lower()
     # db_params: Dict[str, str] = {k: v for k, v in config.items() if k != "database_type"}
 
-    return get_database(config_provider=config_provider)
\ No newline at end of file
+    return get_database(config_provider=config_provider)
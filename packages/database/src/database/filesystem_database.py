@@ -1,13 +1,24 @@
 import os
-import json
 import logging
 import re
-from typing import Dict, List, Any, Union
+import tempfile
+import threading
+from typing import BinaryIO, Dict, List, Any, Iterable, Iterator, Optional, Tuple, Union
+from urllib.parse import unquote
 
+from .blob import MmapBlobReader, copy_stream
+from .codec import get_codec
 from .interface import NoSqlDb
+from .key_index import SortedKeyIndex, list_sorted_keys
+from .secondary_index import index_token, indexed_values, parse_indexes, still_indexed
 
 logger = logging.getLogger(__name__)
 
+# Number of striped locks guarding read-modify-write cycles on item files
+LOCK_STRIPES = 64
+# Directory under base_dir holding the secondary index marker files
+INDEX_DIR = "_indexes"
+
 
 class FilesystemDatabase(NoSqlDb):
     def __init__(self, config: Dict[str, str]):
@@ -17,12 +28,26 @@ class FilesystemDatabase(NoSqlDb):
         Expected configuration keys:
           - base_dir: The base directory path where files will be stored.
                     If not provided, defaults to "data/filesystem_db".
+          - indexes (optional): Secondary indexes as {table: [field, ...]}, served by query_by_index.
+          - codec, compression, compression_threshold (optional): How documents are serialized,
+                    see database.codec.get_codec. Defaults to uncompressed JSON.
+          - filesystem_key_index (optional): Keep a sorted in-memory index of the keys of each table,
+                    built on first use and updated on writes, so prefix searches, range scans and
+                    key listings bisect it instead of walking directories. Only writes made through
+                    this instance are seen, so leave it off when other processes write the same
+                    base_dir. Defaults to False.
         """
         self.config = config
         self.base_dir = config.get("base_dir", os.path.join("data", "filesystem_db"))
         if not os.path.exists(self.base_dir):
             os.makedirs(self.base_dir, exist_ok=True)
-        logger.info(f"FilesystemDatabase initialized with base directory: {self.base_dir}")
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.indexes = parse_indexes(config)
+        self.codec = get_codec(config)
+        self.key_index_enabled = bool(config.get("filesystem_key_index", False))
+        self._key_indexes: Dict[str, SortedKeyIndex] = {}
+        self._key_index_lock = threading.Lock()
+        logger.info(f"FilesystemDatabase initialized with base directory: {self.base_dir} (key_index={self.key_index_enabled})")
 
     def _get_table_dir(self, table: str) -> str:
         """
@@ -40,17 +65,84 @@ class FilesystemDatabase(NoSqlDb):
         table_dir = self._get_table_dir(table)
         return os.path.join(table_dir, f"{key}.json")
 
+    def _lock(self, file_path: str) -> threading.Lock:
+        """
+        Get the striped lock guarding a file path.
+        """
+        return self._locks[hash(file_path) % LOCK_STRIPES]
+
+    def _read_item(self, file_path: str) -> Dict[str, Any]:
+        """
+        Read and decode an item file, whichever codec wrote it.
+        """
+        with open(file_path, "rb") as f:
+            return self.codec.decode(f.read())
+
+    def _write_temp(self, file_path: str, item: dict) -> str:
+        """
+        Write an encoded item to a temp file in the target's directory and return the temp file path.
+        """
+        data = self.codec.encode(item)
+        directory = os.path.dirname(file_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def _write_json(self, file_path: str, item: dict) -> None:
+        """
+        Atomically write an item: write to a temp file in the same directory, then rename over the target.
+        """
+        os.replace(self._write_temp(file_path, item), file_path)
+
+    def _index_dir(self, table: str, field: str) -> str:
+        """
+        Get the directory holding the index of a field: <base_dir>/_indexes/<table>/<field>.
+        """
+        return os.path.join(self.base_dir, INDEX_DIR, table, field)
+
+    def _index_item(self, table: str, key: str, item: dict, fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Add the index markers of an item, one empty file per indexed field at
+        <index dir>/values/<value>/<key>. Stale markers are dropped by query_by_index.
+        """
+        fields = self.indexes.get(table, ()) if fields is None else fields
+        for field, value in indexed_values(item, fields).items():
+            marker_dir = os.path.join(self._index_dir(table, field), "values", index_token(value))
+            os.makedirs(marker_dir, exist_ok=True)
+            open(os.path.join(marker_dir, index_token(key)), "a").close()
+
+    def _build_index(self, table: str, field: str) -> None:
+        """
+        Backfill the index of a field from the existing items the first time it is queried.
+        """
+        built_path = os.path.join(self._index_dir(table, field), "built")
+        if os.path.exists(built_path):
+            return
+        logger.info(f"Building index on '{field}' for table '{table}'")
+        for item in self.iter_items(table):
+            if "id" in item:
+                self._index_item(table, item["id"], item, [field])
+        open(built_path, "a").close()
+
     def insert_item(self, table: str, key: str, item: dict) -> dict:
         """
-        Insert an item into the specified table by writing it as a JSON file.
+        Insert an item into the specified table by writing it as a file (JSON unless another codec is configured).
         The item is stored at: <base_dir>/<table>/<key>.json.
         """
         logger.info(f"Inserting item into table '{table}' with key '{key}': {item}")
         item["id"] = key  # Ensure the key is included in the item.
         file_path = self._get_file_path(table, key)
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(item, f)
+            with self._lock(file_path):
+                self._write_json(file_path, item)
+                self._index_item(table, key, item)
+            self._update_key_index(table, added=[key])
             logger.info(f"Item inserted successfully at {file_path}")
         except Exception as e:
             logger.exception("Failed to insert item into filesystem")
@@ -76,8 +168,7 @@ class FilesystemDatabase(NoSqlDb):
         try:
             # Check the file extension to decide if it is JSON.
             if file_path.lower().endswith(".json"):
-                with open(file_path, "r", encoding="utf-8") as f:
-                    item = json.load(f)
+                item = self._read_item(file_path)
                 logger.info(f"JSON item retrieved: {item}")
                 return item
             else:
@@ -116,42 +207,176 @@ class FilesystemDatabase(NoSqlDb):
             logger.exception("Error reading item from filesystem")
             raise e        
 
-    def get_all_items(self, table: str) -> list:
+    def open_blob_reader(
+        self, table: str, key: str, start: int = 0, end: Optional[int] = None
+    ) -> Optional[MmapBlobReader]:
         """
-        Retrieve all items from the specified table.
-        Scans the table directory for all JSON files and returns their contents.
+        Open a binary item as a memory-mapped reader over [start, end), or None if it does not exist.
+        """
+        file_path = self._get_file_path(table, key)
+        logger.info(f"Opening blob reader on table '{table}' with key: {key} [{start}, {end})")
+        try:
+            return MmapBlobReader(file_path, start, end)
+        except FileNotFoundError:
+            logger.warning(f"Item with key '{key}' not found in table '{table}'.")
+            return None
+
+    def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        """
+        Copy a stream into a temp file in chunks, then rename it over the item so readers never see
+        a partial blob. The content type is not recorded.
+        """
+        file_path = self._get_file_path(table, key)
+        directory = os.path.dirname(file_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                size = copy_stream(stream, f)
+            os.replace(tmp_path, file_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        self._update_key_index(table, added=[key])
+        logger.info(f"Blob stored in table '{table}' with key: {key} ({size} bytes)")
+
+    def _walk_dir(self, directory: str, base: str, name_prefix: str) -> Iterator[str]:
+        """
+        Yield the keys stored under a directory in sorted order, skipping entries whose name does
+        not start with `name_prefix`. Directories sort as "<name>/" so the walk order matches key order.
+        """
+        try:
+            with os.scandir(directory) as it:
+                entries = [entry for entry in it if entry.name.startswith(name_prefix)]
+        except FileNotFoundError:
+            return
+        sortable = []
+        for entry in entries:
+            if entry.is_dir():
+                sortable.append((f"{entry.name}/", entry))
+            elif entry.name.endswith(".json"):
+                sortable.append((entry.name[:-len(".json")], entry))
+        for name, entry in sorted(sortable, key=lambda pair: pair[0]):
+            if name.endswith("/"):
+                yield from self._walk_dir(entry.path, f"{base}{name}", "")
+            else:
+                yield f"{base}{name}"
+
+    def _walk_keys(self, table: str, prefix: str = "") -> Iterator[str]:
+        """
+        Yield the keys of a table starting with `prefix`, in sorted order. Hierarchical keys map to
+        sub directories, so only the directory named by the prefix is visited and file names are
+        matched against the last prefix component.
         """
-        logger.info(f"Retrieving all items from table '{table}'")
         table_dir = self._get_table_dir(table)
-        items = []
+        dir_part, _, name_part = prefix.rpartition("/")
+        start_dir = os.path.join(table_dir, dir_part) if dir_part else table_dir
+        yield from self._walk_dir(start_dir, f"{dir_part}/" if dir_part else "", name_part)
+
+    def _key_index(self, table: str) -> Optional[SortedKeyIndex]:
+        """
+        Return the sorted key index of a table, building it from a directory walk on first use,
+        or None when the key index is disabled. Caller holds the key index lock.
+        """
+        if not self.key_index_enabled:
+            return None
+        index = self._key_indexes.get(table)
+        if index is None:
+            index = SortedKeyIndex(self._walk_keys(table))
+            self._key_indexes[table] = index
+        return index
+
+    def _update_key_index(self, table: str, added: Iterable[str] = (), removed: Iterable[str] = ()) -> None:
+        """
+        Apply a write to the key index, if one was built. Called after the files were written, under
+        the same lock as the build, so a concurrent build either sees the files or is updated here.
+        """
+        if not self.key_index_enabled:
+            return
+        with self._key_index_lock:
+            index = self._key_indexes.get(table)
+            if index is None:
+                return
+            for key in added:
+                index.add(key)
+            for key in removed:
+                index.discard(key)
+
+    def _keys(self, table: str, prefix: str = "") -> Iterable[str]:
+        """
+        Return the keys of a table starting with `prefix`, in sorted order: a bisect of the key
+        index when enabled, a directory walk otherwise.
+        """
+        with self._key_index_lock:
+            index = self._key_index(table)
+            if index is not None:
+                return index.with_prefix(prefix)
+        return self._walk_keys(table, prefix)
+
+    def _load_items(self, table: str, keys: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Load the JSON items for the given keys, skipping keys deleted in the meantime.
+        """
+        for key in keys:
+            try:
+                yield self._read_item(self._get_file_path(table, key))
+            except FileNotFoundError:
+                continue
+
+    def _iter_sorted_items(
+        self, table: str, start_after: Optional[str] = None, prefix: str = ""
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (key, item) pairs in key order from the sorted directory walk, reading only the files
+        after `start_after`.
+        """
+        for key in self._keys(table, prefix):
+            if start_after is not None and key <= start_after:
+                continue
+            try:
+                yield key, self._read_item(self._get_file_path(table, key))
+            except FileNotFoundError:
+                continue
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all items from the specified table, loading one JSON file at a time.
+        """
+        logger.info(f"Iterating items from table '{table}'")
         try:
-            for filename in os.listdir(table_dir):
-                if filename.endswith(".json"):
-                    file_path = os.path.join(table_dir, filename)
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        item = json.load(f)
-                        items.append(item)
-            logger.info(f"Total items retrieved from '{table}': {len(items)}")
-            return items
+            yield from self._load_items(table, self._keys(table))
         except Exception as e:
             logger.exception("Error retrieving all items from filesystem")
             raise e
 
+    def get_all_items(self, table: str) -> list:
+        """
+        Retrieve all items from the specified table.
+        Scans the table directory for all JSON files and returns their contents.
+        """
+        logger.info(f"Retrieving all items from table '{table}'")
+        items = list(self.iter_items(table))
+        logger.info(f"Total items retrieved from '{table}': {len(items)}")
+        return items
+
     def update_item(self, table: str, key: str, updates: dict) -> dict:
         """
         Update an item in the specified table by merging the provided updates.
+        The read, merge and atomic rewrite happen under one lock.
         Returns the updated item.
         """
         logger.info(f"Updating item in table '{table}' with key '{key}' using updates: {updates}")
-        item = self.get_item(table, key)
-        if not item:
-            logger.warning(f"Item with key '{key}' not found in table '{table}', update skipped.")
-            return {}
-        item.update(updates)
         file_path = self._get_file_path(table, key)
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(item, f)
+            with self._lock(file_path):
+                try:
+                    item = self._read_item(file_path)
+                except FileNotFoundError:
+                    logger.warning(f"Item with key '{key}' not found in table '{table}', update skipped.")
+                    return {}
+                item.update(updates)
+                self._write_json(file_path, item)
+                self._index_item(table, key, item)
             logger.info(f"Item updated successfully: {item}")
         except Exception as e:
             logger.exception("Failed to update item in filesystem")
@@ -160,13 +385,13 @@ class FilesystemDatabase(NoSqlDb):
 
     def delete_item(self, table: str, key: str) -> None:
         """
-        Delete an item from the specified table by removing its JSON file.
+        Delete an item from the specified table by removing its JSON file, under the same lock
+        as update_item so a concurrent update cannot write the item back.
         """
         logger.info(f"Deleting item from table '{table}' with key: {key}")
-        file_path = self._get_file_path(table, key)
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            if self._remove_file(table, key):
+                self._update_key_index(table, removed=[key])
                 logger.info(f"Item with key '{key}' deleted from table '{table}'")
             else:
                 logger.warning(f"Item with key '{key}' not found in table '{table}', nothing to delete.")
@@ -174,17 +399,154 @@ class FilesystemDatabase(NoSqlDb):
             logger.exception("Failed to delete item from filesystem")
             raise e
 
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        """
+        Delete several items, each under its key's lock, updating the key index once.
+        """
+        logger.info(f"Deleting {len(keys)} items from table '{table}'")
+        try:
+            removed = [key for key in keys if self._remove_file(table, key)]
+            self._update_key_index(table, removed=removed)
+        except Exception as e:
+            logger.exception("Failed to delete items from filesystem")
+            raise e
+        logger.info(f"Deleted {len(removed)} items from table '{table}'")
+
+    def _remove_file(self, table: str, key: str) -> bool:
+        """Remove the file of an item under its lock. Returns False when there was none."""
+        file_path = self._get_file_path(table, key)
+        with self._lock(file_path):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                return False
+        return True
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        """
+        Insert several items. Every item is first written to a temp file and only once all
+        writes succeeded are they renamed into place, so a failed batch leaves no partial items.
+        """
+        logger.info(f"Inserting {len(items)} items into table '{table}'")
+        staged = []
+        try:
+            for key, item in items.items():
+                item["id"] = key  # Ensure the key is included in the item.
+                file_path = self._get_file_path(table, key)
+                staged.append((self._write_temp(file_path, item), file_path))
+        except Exception as e:
+            for tmp_path, _ in staged:
+                os.remove(tmp_path)
+            logger.exception("Failed to insert items into filesystem")
+            raise e
+        for (key, item), (tmp_path, file_path) in zip(items.items(), staged):
+            with self._lock(file_path):
+                os.replace(tmp_path, file_path)
+                self._index_item(table, key, item)
+        self._update_key_index(table, added=items.keys())
+        logger.info(f"Inserted {len(staged)} items into table '{table}'")
+        return list(items.values())
+
+    def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        List keys (and common prefixes) of a table from file names (or the key index), without
+        reading any file.
+        """
+        logger.info(f"Listing keys in table '{table}' with prefix '{prefix}' (delimiter={delimiter})")
+        return list_sorted_keys(list(self._keys(table, prefix)), prefix, delimiter, limit, cursor)
+
+    def exists(self, table: str, key: str) -> bool:
+        """
+        Check whether an item exists with a single stat of its file.
+        """
+        return os.path.isfile(self._get_file_path(table, key))
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """
+        Count the items of a table from file names (or the key index), without reading any file.
+        """
+        if self.key_index_enabled:
+            with self._key_index_lock:
+                return self._key_index(table).count(prefix or "")
+        return sum(1 for _ in self._walk_keys(table, prefix or ""))
+
+    def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose keys fall in [start_key, end_key), in key order, reading only their
+        files. The range is located by bisect in the key index, or in the file names of the table
+        when the key index is disabled.
+        """
+        logger.info(f"Scanning table '{table}' from {start_key} to {end_key} (limit={limit})")
+        with self._key_index_lock:
+            index = self._key_index(table)
+            if index is not None:
+                keys = index.key_range(start_key, end_key, limit)
+        if index is None:
+            keys = SortedKeyIndex(self._walk_keys(table)).key_range(start_key, end_key, limit)
+        return list(self._load_items(table, keys))
+
     def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
         """
         Search for items in the specified table whose keys contain or match a part of the given key.
         If regex is True, treats key_part as a regular expression; otherwise, does a prefix search.
+        Keys are matched on file names (a bisect of the key index when enabled) first and only the
+        matching files are read.
         """
         logger.info(f"Searching in table '{table}' for keys matching: {key_part} (regex={regex})")
-        items = self.get_all_items(table)
         if regex:
             pattern = re.compile(key_part)
-            matching_items = [item for item in items if "id" in item and pattern.search(item["id"])]
+            keys = [key for key in self._keys(table) if pattern.search(key)]
         else:
-            matching_items = [item for item in items if "id" in item and item["id"].startswith(key_part)]
+            keys = self._keys(table, key_part)
+        matching_items = list(self._load_items(table, keys))
         logger.info(f"Found {len(matching_items)} matching items in table '{table}'")
         return matching_items
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose `field` equals `value`. Indexed fields only read the item files
+        listed under the value's marker directory; markers left behind by updates and deletes are
+        removed here. Other fields fall back to a scan.
+        """
+        if field not in self.indexes.get(table, ()):
+            return super().query_by_index(table, field, value)
+        logger.info(f"Querying table '{table}' by index on '{field}'")
+        self._build_index(table, field)
+        token = index_token(value)
+        marker_dir = os.path.join(self._index_dir(table, field), "values", token)
+        try:
+            keys = sorted(unquote(name) for name in os.listdir(marker_dir))
+        except FileNotFoundError:
+            return []
+
+        matching_items = []
+        for key in keys:
+            file_path = self._get_file_path(table, key)
+            with self._lock(file_path):
+                try:
+                    item = self._read_item(file_path)
+                except FileNotFoundError:
+                    item = None
+                if not still_indexed(item, field, token):
+                    try:
+                        os.remove(os.path.join(marker_dir, index_token(key)))
+                    except FileNotFoundError:
+                        pass
+                    continue
+            if item.get(field) == value:
+                matching_items.append(item)
+        logger.info(f"Found {len(matching_items)} items in table '{table}' with {field}={value}")
+        return matching_items
@@ -1,7 +1,19 @@
+import io
+import os
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Union
+from typing import TYPE_CHECKING, BinaryIO, List, Dict, Any, Iterator, Optional, Tuple, Union
+from .batch import WriteBatch, Writes, split_writes
+from .blob import byte_range
+from .key_index import SortedKeyIndex, list_sorted_keys
+from .query import normalize_filters, query_items
+
+if TYPE_CHECKING:
+    from .changes import ChangeEvent
 
 class NoSqlDb(ABC):
+    # Secondary indexes declared in the "indexes" config: {table: [field, ...]}
+    indexes: Dict[str, List[str]] = {}
+
     @abstractmethod
     def insert_item(self, table: str, key:str, item: dict) -> dict:
         """Insert an item into the specified table."""
@@ -15,14 +27,65 @@ class NoSqlDb(ABC):
     def get_binary_item(self, table: str, key: str) -> bytes:
         """Retrieve an item by its key from the specified table."""
 
+    def open_blob_reader(
+        self, table: str, key: str, start: int = 0, end: Optional[int] = None
+    ) -> Optional[BinaryIO]:
+        """
+        Open a binary item for streaming reads, optionally limited to a byte range, without
+        loading it into memory. The caller closes the returned file object.
+
+        :param table: The table to read from.
+        :param key: The key of the binary item.
+        :param start: First byte to read.
+        :param end: End of the byte range (exclusive). Defaults to the end of the item.
+        :return: A readable binary file object, or None if the item does not exist.
+        """
+        data = self.get_binary_item(table, key)
+        if not isinstance(data, (bytes, bytearray)):  # Backends return {} or None for a missing item
+            return None
+        start, end = byte_range(len(data), start, end)
+        return io.BytesIO(data[start:end])
+
+    def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        """
+        Store a binary item read from a stream, chunk by chunk, replacing any existing item.
+
+        :param table: The table to write to.
+        :param key: The key of the binary item.
+        :param stream: A readable binary file object.
+        :param content_type: MIME type of the data, for backends that record one.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not store binary items")
+
+    def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        """
+        Return a URL a remote consumer can download the binary item from, so it does not have to
+        pass through this process, or None if the backend cannot hand out URLs.
+
+        :param table: The table to read from.
+        :param key: The key of the binary item.
+        :param expires_in: Seconds the URL stays valid.
+        """
+        return None
+
     @abstractmethod
     def get_all_items(self, table: str) -> list:
         """Retrieve all items from the specified table."""
         pass
 
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all items from the specified table without building the whole table in memory.
+
+        :param table: The table to read.
+        :param page_size: How many items the backend fetches per round trip, where it pages.
+        :return: An iterator over the items.
+        """
+        yield from self.get_all_items(table)
+
     @abstractmethod
     def update_item(self, table: str, key: str, updates: dict) -> dict:
-        """Update an item in the specified table."""
+        """Update an item in the specified table and return the updated item ({} if it does not exist)."""
         pass
 
     @abstractmethod
@@ -42,4 +105,240 @@ class NoSqlDb(ABC):
         :param regex: Whether to treat key_part as a regular expression. Defaults to False (prefix search).
         :return: A list of matching items.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        """
+        Insert several items into the specified table in as few round trips as the backend allows.
+
+        :param table: The table to insert into.
+        :param items: A mapping of key -> item.
+        :return: The inserted items.
+        """
+        return [self.insert_item(table, key, item) for key, item in items.items()]
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        """
+        Retrieve several items by key from the specified table.
+
+        :param table: The table to read from.
+        :param keys: The keys to retrieve.
+        :return: The items found, in the order of `keys`. Missing keys are skipped.
+        """
+        items = []
+        for key in keys:
+            item = self.get_item(table, key)
+            if item:
+                items.append(item)
+        return items
+
+    def _get_keyed_items(self, table: str, keys: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        get_items as (key, item) pairs, for callers that need the key of every item. Backends that
+        do not store the key in the item (S3) override this.
+        """
+        return [(item["id"], item) for item in self.get_items(table, keys) if "id" in item]
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        """
+        Delete several items by key from the specified table.
+
+        :param table: The table to delete from.
+        :param keys: The keys to delete. Missing keys are ignored.
+        """
+        for key in keys:
+            self.delete_item(table, key)
+
+    def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        List the keys of a table without loading item bodies, S3 ListObjectsV2 style.
+
+        :param table: The table to list.
+        :param prefix: Only list keys starting with this prefix.
+        :param delimiter: Roll up keys containing this delimiter after the prefix into common prefixes.
+        :param limit: Maximum number of keys plus prefixes to return.
+        :param cursor: Opaque cursor returned by the previous call, to fetch the next page.
+        :return: {"keys": [...], "prefixes": [...], "cursor": str or None when there are no more entries}
+        """
+        sorted_keys = sorted(item["id"] for item in self.iter_items(table) if "id" in item)
+        return list_sorted_keys(sorted_keys, prefix, delimiter, limit, cursor)
+
+    def exists(self, table: str, key: str) -> bool:
+        """
+        Check whether an item exists. Backends answer this without reading the item body.
+
+        :param table: The table to look in.
+        :param key: The key of the item.
+        :return: Whether the item exists.
+        """
+        return bool(self.get_item(table, key))
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """
+        Count the items of a table without materializing them.
+
+        :param table: The table to count.
+        :param prefix: Only count keys starting with this prefix.
+        :return: The number of items.
+        """
+        total, cursor = 0, None
+        while True:
+            page = self.list_keys(table, prefix or "", limit=1000, cursor=cursor)
+            total += len(page["keys"])
+            cursor = page["cursor"]
+            if cursor is None:
+                return total
+
+    def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose keys fall in [start_key, end_key), in key order. Backends with a
+        sorted key index locate the range with bisect instead of walking the whole table.
+
+        :param table: The table to scan.
+        :param start_key: The first key of the range (inclusive). Defaults to the first key.
+        :param end_key: The end of the range (exclusive). Defaults to past the last key.
+        :param limit: Maximum number of items to return.
+        :return: The items in the range.
+        """
+        # One listing of the keys under the longest prefix the range shares, then only the items
+        # in the range are read
+        prefix = os.path.commonprefix([start_key, end_key]) if start_key is not None and end_key is not None else ""
+        keys = self.list_keys(table, prefix)["keys"]
+        return self.get_items(table, SortedKeyIndex(keys).key_range(start_key, end_key, limit))
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose `field` attribute equals `value`.
+
+        Backends serve attributes declared in the "indexes" config ({table: [field, ...]}) from a
+        secondary index; other attributes fall back to a filtered scan.
+
+        :param table: The table to query.
+        :param field: The attribute to match.
+        :param value: The value to match.
+        :return: The matching items.
+        """
+        return [item for item in self.iter_items(table) if item.get(field) == value]
+
+    def _keyed_query_by_index(self, table: str, field: str, value: Any) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        query_by_index as (key, item) pairs, so results can be ordered and paged by key. Backends
+        that do not store the key in the item (S3) override this.
+        """
+        return [(item["id"], item) for item in self.query_by_index(table, field, value) if "id" in item]
+
+    def _iter_sorted_items(
+        self, table: str, start_after: Optional[str] = None, prefix: str = ""
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (key, item) pairs in key order, for keys starting with `prefix` and sorting after
+        `start_after`. Backends that can walk their keys in order override this to stream instead
+        of sorting the whole table.
+        """
+        items = sorted((item for item in self.iter_items(table) if "id" in item), key=lambda item: item["id"])
+        for item in items:
+            if item["id"].startswith(prefix) and (start_after is None or item["id"] > start_after):
+                yield item["id"], item
+
+    def query(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the items matching `filters`, in key order, one page at a time.
+
+        Filters map a field to a value (equality) or to {operator: operand} with the operators
+        eq, in, gt, gte, lt, lte and prefix, e.g. {"status": "done", "started": {"gte": 1700000000}}.
+        An equality on an indexed field is served from the secondary index and a prefix on id
+        only visits the keys under that prefix.
+
+        :param table: The table to query.
+        :param filters: The predicates every returned item satisfies.
+        :param fields: Only return these fields (plus id). Defaults to whole items.
+        :param limit: Maximum number of items to return.
+        :param cursor: Opaque cursor returned by the previous call, to fetch the next page.
+        :return: {"items": [...], "cursor": str or None when there are no more items}
+        """
+        predicates = normalize_filters(filters)
+        indexed = next((p for p in predicates if p[1] == "eq" and p[0] in self.indexes.get(table, ())), None)
+        if indexed:
+            field, _, value = indexed
+            keyed_items = sorted(self._keyed_query_by_index(table, field, value), key=lambda pair: pair[0])
+            keyed_items = ((key, item) for key, item in keyed_items if cursor is None or key > cursor)
+        else:
+            prefix = next((p[2] for p in predicates if p[0] == "id" and p[1] == "prefix"), "")
+            keyed_items = self._iter_sorted_items(table, cursor, prefix)
+        return query_items(keyed_items, predicates, fields, limit)
+
+    def batch(self) -> WriteBatch:
+        """
+        Start a unit of work: writes made on the returned batch are merged per key and committed
+        together when the `with` block exits, in as few round trips as the backend allows.
+
+            with db.batch() as batch:
+                batch.insert_item("output", "a", {...})
+                batch.update_item("user", username, {...})
+        """
+        return WriteBatch(self)
+
+    def write_batch(self, writes: Writes) -> None:
+        """
+        Apply the merged writes of a batch ({table: {key: Write}}). Defaults to one insert_items
+        and one delete_items call per table plus an update_item per updated key; backends that
+        can do better override this.
+        """
+        for table, table_writes in writes.items():
+            puts, updates, deletes = split_writes(table_writes)
+            if puts:
+                self.insert_items(table, puts)
+            for key, fields in updates.items():
+                self.update_item(table, key, fields)
+            if deletes:
+                self.delete_items(table, deletes)
+
+    def watch(self, table: str, since: Optional[int] = None, timeout: Optional[float] = None) -> Iterator["ChangeEvent"]:
+        """
+        Stream the inserts, updates and deletes of a table as ChangeEvents, in order.
+
+        Backends have no change feed of their own; enable "change_feed" in the config to record
+        the writes made through the shared instance (see ChangeFeedNoSqlDb).
+
+        :param table: The table to watch.
+        :param since: Only yield events with a seq above this one, e.g. the last seq a consumer
+            processed; 0 replays every retained event. Defaults to events from now on.
+        :param timeout: Seconds to wait for the next event before the iterator ends. Waits forever when None.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no change feed; enable change_feed in the config")
+
+    def compact(self, table: str, force: bool = True) -> bool:
+        """
+        Reclaim the space left behind by deleted and overwritten items of a table. Backends that
+        free space as they delete (one file or object per item, DynamoDB) have nothing to do.
+
+        :param table: The table to compact.
+        :param force: Compact even if the backend's own thresholds say it is not worth it yet.
+            Background callers pass False.
+        :return: Whether a compaction ran.
+        """
+        return False
+
+    def close(self) -> None:
+        """Release any clients, connections or file handles held by this instance."""
+        pass
@@ -0,0 +1,124 @@
+import bisect
+from typing import Any, Dict, Iterable, List, Optional
+
+# Sorts after any character a key can contain; appended to a common prefix to skip past all of its keys
+_MAX_CHAR = "\U0010ffff"
+
+
+def list_sorted_keys(
+    sorted_keys: List[str],
+    prefix: str = "",
+    delimiter: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Page through a sorted list of keys with S3 ListObjectsV2 semantics.
+
+    Only the keys that start with `prefix` are visited (located with bisect), so a page
+    costs O(log n + k). With a delimiter, keys containing the delimiter after the prefix are
+    rolled up into one common prefix that ends with the delimiter.
+
+    :param sorted_keys: The keys, sorted ascending.
+    :param prefix: Only list keys starting with this prefix.
+    :param delimiter: Roll up keys on this delimiter (e.g. "/").
+    :param limit: Maximum number of keys plus prefixes to return.
+    :param cursor: The cursor returned by the previous page.
+    :return: {"keys": [...], "prefixes": [...], "cursor": str or None when there are no more entries}
+    """
+    keys: List[str] = []
+    prefixes: List[str] = []
+    last = None
+    i = bisect.bisect_left(sorted_keys, prefix)
+    if cursor:
+        i = max(i, bisect.bisect_right(sorted_keys, cursor))
+
+    while i < len(sorted_keys):
+        key = sorted_keys[i]
+        if not key.startswith(prefix):
+            break
+        if limit is not None and len(keys) + len(prefixes) >= limit:
+            return {"keys": keys, "prefixes": prefixes, "cursor": last}
+
+        if delimiter:
+            pos = key.find(delimiter, len(prefix))
+            if pos >= 0:
+                common_prefix = key[:pos + len(delimiter)]
+                prefixes.append(common_prefix)
+                last = common_prefix + _MAX_CHAR
+                i = bisect.bisect_left(sorted_keys, last, i)
+                continue
+
+        keys.append(key)
+        last = key
+        i += 1
+
+    return {"keys": keys, "prefixes": prefixes, "cursor": None}
+
+
+class SortedKeyIndex:
+    """
+    In-memory sorted list of the keys of one table, kept up to date by the owning backend.
+    Not thread safe on its own - callers hold the table lock.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._keys = sorted(set(keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        i = bisect.bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def add(self, key: str) -> None:
+        i = bisect.bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            self._keys.insert(i, key)
+
+    def discard(self, key: str) -> None:
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    def keys_after(self, start_after: Optional[str] = None) -> List[str]:
+        """Return the keys sorting after `start_after` (all keys when None), in order."""
+        if start_after is None:
+            return list(self._keys)
+        return self._keys[bisect.bisect_right(self._keys, start_after):]
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """Return the keys starting with `prefix`, in order."""
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + _MAX_CHAR, start)
+        return self._keys[start:end]
+
+    def key_range(self, start_key: Optional[str] = None, end_key: Optional[str] = None,
+                  limit: Optional[int] = None) -> List[str]:
+        """Return the keys in [start_key, end_key), in order, at most `limit` of them, in O(log n + k)."""
+        start = 0 if start_key is None else bisect.bisect_left(self._keys, start_key)
+        end = len(self._keys) if end_key is None else bisect.bisect_left(self._keys, end_key, start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self._keys[start:end]
+
+    def count(self, prefix: str = "") -> int:
+        """Return the number of keys starting with `prefix`, in O(log n)."""
+        if not prefix:
+            return len(self._keys)
+        start = bisect.bisect_left(self._keys, prefix)
+        return bisect.bisect_left(self._keys, prefix + _MAX_CHAR, start) - start
+
+    def list_keys(
+        self,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Page through the keys. See list_sorted_keys."""
+        return list_sorted_keys(self._keys, prefix, delimiter, limit, cursor)
@@ -0,0 +1,526 @@
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .interface import NoSqlDb
+from .key_index import SortedKeyIndex
+from .secondary_index import ValueIndex, parse_indexes
+
+logger = logging.getLogger(__name__)
+
+# Segment file names: zero padded ids so that name order is replay order
+SEGMENT_FORMAT = "{:08d}.log"
+SEGMENT_PATTERN = re.compile(r"^(\d{8})\.log$")
+# Suffix of a compaction output until it is renamed into place
+COMPACT_SUFFIX = ".compact"
+# Bytes a record line adds around its JSON payload: 8 hex digits of CRC, a space and a newline
+RECORD_OVERHEAD = 10
+
+# (segment id, offset of the JSON payload, payload length)
+Location = Tuple[int, int, int]
+
+
+def _encode(record: dict) -> bytes:
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+
+def _decode(line: bytes) -> Optional[dict]:
+    """Decode one record line, or return None if it is torn or corrupt."""
+    if len(line) < RECORD_OVERHEAD or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+class _Table:
+    """Open state of one table. Every field is guarded by `lock`."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.lock = threading.RLock()
+        # One compaction at a time, without holding `lock` while records are copied
+        self.compact_lock = threading.Lock()
+        self.locations: Dict[str, Location] = {}
+        self.keys = SortedKeyIndex()
+        self.values: Optional[ValueIndex] = None
+        self.fds: Dict[int, int] = {}
+        self.sizes: Dict[int, int] = {}
+        self.live: Dict[int, int] = {}
+        self.active = 0
+
+
+class LogDatabase(NoSqlDb):
+    """
+    Log-structured local storage.
+
+    Each table is a directory of append-only segment files. Every write appends one record line
+    ("<crc32> <json>") to the active segment, so writes cost the size of the item, not of the
+    table. An in-memory index maps each key to the location of its latest record; it is rebuilt
+    by replaying the segments when a table is first opened, dropping a torn record at the tail.
+
+    Overwritten and deleted records stay in the segments until compaction rewrites the live ones
+    into a single segment. A compacted segment starts with a header naming the segments it
+    replaces, so a compaction interrupted after its output was renamed into place is completed
+    on the next open.
+    """
+
+    def __init__(self, config: Dict[str, str]):
+        """
+        Initialize the LogDatabase implementation.
+
+        Expected configuration keys:
+          - base_dir (optional): Directory holding one sub directory of segments per table.
+                    Defaults to "data/logdb".
+          - logdb_fsync (optional): fsync after every write so acknowledged writes survive a
+                    power loss, not only a process crash. Defaults to False.
+          - logdb_segment_size (optional): Start a new segment once the active one reaches this
+                    many bytes. Defaults to 64 MiB.
+          - logdb_compact_interval (optional): Seconds between background compaction checks.
+                    0 disables background compaction. Defaults to 60.
+          - logdb_compact_ratio (optional): Compact a table once this fraction of its bytes is
+                    overwritten or deleted records. Defaults to 0.5.
+          - logdb_compact_min_bytes (optional): Do not compact tables smaller than this. Defaults to 1 MiB.
+          - indexes (optional): Secondary indexes as {table: [field, ...]}, kept in memory and
+                    served by query_by_index.
+        """
+        self.config = config
+        self.base_dir = config.get("base_dir") or os.path.join("data", "logdb")
+        self.fsync = bool(config.get("logdb_fsync", False))
+        self.segment_size = int(config.get("logdb_segment_size") or 64 * 1024 * 1024)
+        compact_interval = config.get("logdb_compact_interval")
+        self.compact_interval = float(60 if compact_interval is None else compact_interval)
+        compact_ratio = config.get("logdb_compact_ratio")
+        self.compact_ratio = float(0.5 if compact_ratio is None else compact_ratio)
+        compact_min_bytes = config.get("logdb_compact_min_bytes")
+        self.compact_min_bytes = int(1024 * 1024 if compact_min_bytes is None else compact_min_bytes)
+        self.indexes = parse_indexes(config)
+        self._tables: Dict[str, _Table] = {}
+        self._tables_lock = threading.Lock()
+        self._stop_compactor = threading.Event()
+        self._compactor = None
+        os.makedirs(self.base_dir, exist_ok=True)
+        logger.info(f"LogDatabase initialized with base directory: {self.base_dir}")
+
+        if self.compact_interval > 0:
+            self._compactor = threading.Thread(target=self._compact_loop, name="logdb-compactor", daemon=True)
+            self._compactor.start()
+
+    # Segments
+
+    def _segment_path(self, t: _Table, segment: int) -> str:
+        return os.path.join(t.directory, SEGMENT_FORMAT.format(segment))
+
+    def _open_segment(self, t: _Table, segment: int) -> None:
+        fd = os.open(self._segment_path(t, segment), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        t.fds[segment] = fd
+        t.sizes[segment] = os.fstat(fd).st_size
+        t.live.setdefault(segment, 0)
+
+    def _close_segment(self, t: _Table, segment: int) -> None:
+        os.close(t.fds.pop(segment))
+        t.sizes.pop(segment, None)
+        t.live.pop(segment, None)
+
+    def _sync_dir(self, t: _Table) -> None:
+        """Persist file creations and renames in the table directory, when fsync is enabled."""
+        if not self.fsync:
+            return
+        fd = os.open(t.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _table(self, table: str) -> _Table:
+        """Return an open table, replaying its segments on first use."""
+        t = self._tables.get(table)
+        if t is not None:
+            return t
+        with self._tables_lock:
+            t = self._tables.get(table)
+            if t is None:
+                t = _Table(os.path.join(self.base_dir, table))
+                with t.lock:
+                    self._load(t)
+                self._tables[table] = t
+                logger.info(f"Opened log table '{table}': {len(t.locations)} keys in {len(t.fds)} segments")
+            return t
+
+    def _load(self, t: _Table) -> None:
+        """Rebuild the key index of a table from its segments. Caller holds the table lock."""
+        os.makedirs(t.directory, exist_ok=True)
+        segments = []
+        for name in os.listdir(t.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                segments.append(int(match.group(1)))
+            elif name.endswith(COMPACT_SUFFIX):  # Output of an interrupted compaction
+                os.remove(os.path.join(t.directory, name))
+        segments.sort()
+
+        # Segments older than the newest compacted segment were already merged into it
+        through = 0
+        for segment in segments:
+            with open(self._segment_path(t, segment), "rb") as f:
+                header = _decode(f.readline())
+            if header and header.get("op") == "compacted":
+                through = max(through, header["through"])
+        for segment in [segment for segment in segments if segment < through]:
+            logger.info(f"Removing segment {segment} of {t.directory}, already compacted")
+            os.remove(self._segment_path(t, segment))
+            segments.remove(segment)
+
+        for segment in segments:
+            self._open_segment(t, segment)
+            self._replay(t, segment)
+        if not segments:
+            self._open_segment(t, 1)
+            self._sync_dir(t)
+        t.active = max(t.fds)
+
+    def _replay(self, t: _Table, segment: int) -> None:
+        """Apply the records of one segment to the index, truncating a torn or corrupt tail."""
+        offset = 0
+        with open(self._segment_path(t, segment), "rb") as f:
+            for line in f:
+                record = _decode(line)
+                if record is None:
+                    logger.warning(f"Truncating segment {segment} of {t.directory} at byte {offset}: torn or corrupt record")
+                    os.ftruncate(t.fds[segment], offset)
+                    t.sizes[segment] = offset
+                    return
+                location = (segment, offset + 9, len(line) - RECORD_OVERHEAD)
+                if record["op"] == "put":
+                    self._set(t, record["key"], location)
+                elif record["op"] == "del":
+                    self._unset(t, record["key"])
+                offset += len(line)
+
+    def _set(self, t: _Table, key: str, location: Location) -> None:
+        """Point a key at a record, moving its bytes from the old record's segment to the new one."""
+        old = t.locations.get(key)
+        if old is not None:
+            t.live[old[0]] -= old[2] + RECORD_OVERHEAD
+        else:
+            t.keys.add(key)
+        t.locations[key] = location
+        t.live[location[0]] += location[2] + RECORD_OVERHEAD
+
+    def _unset(self, t: _Table, key: str) -> None:
+        old = t.locations.pop(key, None)
+        if old is not None:
+            t.live[old[0]] -= old[2] + RECORD_OVERHEAD
+            t.keys.discard(key)
+
+    def _append(self, t: _Table, records: List[dict]) -> List[Location]:
+        """
+        Append records to the active segment with a single write and return their locations.
+        Caller holds the table lock.
+        """
+        if t.sizes[t.active] >= self.segment_size:
+            self._roll(t)
+        fd = t.fds[t.active]
+        offset = t.sizes[t.active]
+        data = bytearray()
+        locations = []
+        for record in records:
+            line = _encode(record)
+            locations.append((t.active, offset + len(data) + 9, len(line) - RECORD_OVERHEAD))
+            data += line
+        written = 0
+        view = memoryview(data)
+        while written < len(data):
+            written += os.write(fd, view[written:])
+        if self.fsync:
+            os.fsync(fd)
+        t.sizes[t.active] = offset + len(data)
+        return locations
+
+    def _roll(self, t: _Table) -> None:
+        """Seal the active segment and start a new one. Caller holds the table lock."""
+        t.active += 1
+        self._open_segment(t, t.active)
+        self._sync_dir(t)
+
+    def _read(self, t: _Table, key: str) -> Optional[dict]:
+        """Read the latest version of an item, or None. Caller holds the table lock."""
+        location = t.locations.get(key)
+        if location is None:
+            return None
+        segment, offset, length = location
+        return json.loads(os.pread(t.fds[segment], length, offset))["item"]
+
+    def _put(self, t: _Table, items: Dict[str, dict]) -> None:
+        """Append put records for items and index them. Caller holds the table lock."""
+        locations = self._append(t, [{"op": "put", "key": key, "item": item} for key, item in items.items()])
+        for (key, item), location in zip(items.items(), locations):
+            self._set(t, key, location)
+            if t.values is not None:
+                t.values.add(key, item)
+
+    # Compaction
+
+    def _compact_loop(self) -> None:
+        """Background loop compacting tables whose dead bytes exceed the ratio."""
+        while not self._stop_compactor.wait(self.compact_interval):
+            for table in list(self._tables):
+                try:
+                    self.compact(table, force=False)
+                except Exception:
+                    logger.exception(f"Compaction of log table '{table}' failed")
+
+    def compact(self, table: str, force: bool = True) -> bool:
+        """
+        Rewrite the live records of a table's segments into one segment and delete the old ones.
+        Writes keep going to a fresh active segment meanwhile; only the final switch holds the table lock.
+
+        :param table: The table to compact.
+        :param force: Compact even if the table is below the size and dead bytes thresholds.
+        :return: Whether a compaction ran.
+        """
+        t = self._table(table)
+        with t.compact_lock:
+            with t.lock:
+                total = sum(t.sizes.values())
+                dead = total - sum(t.live.values())
+                if not force and (total < self.compact_min_bytes or dead < total * self.compact_ratio):
+                    return False
+                if t.sizes[t.active] > 0:
+                    self._roll(t)
+                through = t.active - 1
+                segments = sorted(segment for segment in t.fds if segment <= through)
+                if not segments:
+                    return False
+                moved = {key: location for key, location in t.locations.items() if location[0] <= through}
+                fds = {segment: t.fds[segment] for segment in segments}
+
+            # Copy the live records without blocking readers and writers; sealed segments never change
+            tmp_path = self._segment_path(t, through) + COMPACT_SUFFIX
+            new_locations: Dict[str, Location] = {}
+            with open(tmp_path, "wb") as f:
+                offset = f.write(_encode({"op": "compacted", "through": through}))
+                for key in sorted(moved):
+                    segment, old_offset, length = moved[key]
+                    payload = os.pread(fds[segment], length, old_offset)
+                    line = b"%08x " % zlib.crc32(payload) + payload + b"\n"
+                    new_locations[key] = (through, offset + 9, length)
+                    offset += f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+            with t.lock:
+                # Renaming over the newest compacted segment is the commit point, see _load
+                os.replace(tmp_path, self._segment_path(t, through))
+                self._sync_dir(t)
+                for segment in segments:
+                    self._close_segment(t, segment)
+                self._open_segment(t, through)
+                for key, location in new_locations.items():
+                    # Keys written or deleted during the copy already point past `through`
+                    if t.locations.get(key) == moved[key]:
+                        t.locations[key] = location
+                        t.live[through] += location[2] + RECORD_OVERHEAD
+                for segment in segments:
+                    if segment != through:
+                        os.remove(self._segment_path(t, segment))
+        logger.info(f"Compacted log table '{table}': {len(segments)} segments, {total} -> {offset} bytes")
+        return True
+
+    # NoSqlDb
+
+    def insert_item(self, table: str, key: str, item: dict) -> dict:
+        logger.info(f"Inserting item into {table} with key {key}")
+        item["id"] = key  # Ensure the key is included in the item
+        t = self._table(table)
+        with t.lock:
+            self._put(t, {key: item})
+        return item
+
+    def get_item(self, table: str, key: str) -> dict:
+        logger.info(f"Retrieving item from {table} with id: {key}")
+        t = self._table(table)
+        with t.lock:
+            item = self._read(t, key)
+        if item is None:
+            logger.warning(f"Item with id {key} not found in {table}")
+        return item or {}
+
+    def get_all_items(self, table: str) -> list:
+        logger.info(f"Retrieving all items from {table}")
+        items = list(self.iter_items(table))
+        logger.info(f"Total items retrieved from {table}: {len(items)}")
+        return items
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Stream the items in key order, reading `page_size` records per lock acquisition."""
+        t = self._table(table)
+        with t.lock:
+            keys = t.keys.keys()
+        for start in range(0, len(keys), page_size):
+            with t.lock:
+                items = [self._read(t, key) for key in keys[start:start + page_size]]
+            yield from (item for item in items if item is not None)
+
+    def update_item(self, table: str, key: str, updates: dict) -> dict:
+        logger.info(f"Updating item in {table} with id {key}")
+        t = self._table(table)
+        with t.lock:
+            item = self._read(t, key)
+            if item is None:
+                logger.warning(f"Item with id {key} not found in {table}, update skipped")
+                return {}
+            item.update(updates)
+            self._put(t, {key: item})
+        return item
+
+    def delete_item(self, table: str, key: str) -> None:
+        self.delete_items(table, [key])
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        logger.info(f"Inserting {len(items)} items into {table}")
+        for key, item in items.items():
+            item["id"] = key  # Ensure the key is included in the item
+        t = self._table(table)
+        with t.lock:
+            self._put(t, items)
+        return list(items.values())
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        logger.info(f"Retrieving {len(keys)} items from {table}")
+        t = self._table(table)
+        with t.lock:
+            items = [self._read(t, key) for key in keys]
+        return [item for item in items if item is not None]
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        logger.info(f"Deleting {len(keys)} items from {table}")
+        t = self._table(table)
+        with t.lock:
+            existing = [key for key in dict.fromkeys(keys) if key in t.locations]
+            if existing:
+                self._append(t, [{"op": "del", "key": key} for key in existing])
+            for key in existing:
+                self._unset(t, key)
+        logger.info(f"Deleted {len(existing)} items from {table}")
+
+    def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """List keys (and common prefixes) of a table from the in-memory key index."""
+        t = self._table(table)
+        with t.lock:
+            return t.keys.list_keys(prefix, delimiter, limit, cursor)
+
+    def exists(self, table: str, key: str) -> bool:
+        """Check whether an item exists in the in-memory key index, without reading its record."""
+        t = self._table(table)
+        with t.lock:
+            return key in t.locations
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """Count the items of a table from the in-memory key index."""
+        t = self._table(table)
+        with t.lock:
+            return t.keys.count(prefix or "")
+
+    def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the items whose keys fall in [start_key, end_key), located in the in-memory key index."""
+        t = self._table(table)
+        with t.lock:
+            items = [self._read(t, key) for key in t.keys.key_range(start_key, end_key, limit)]
+        return [item for item in items if item is not None]
+
+    def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        """
+        Search for items whose keys contain or match a part of the given key. Keys are matched
+        in the in-memory index, so only matching records are read.
+
+        :param table: The table to search in.
+        :param key_part: The key part to search for.
+        :param regex: Whether to treat key_part as a regular expression. Defaults to False (prefix search).
+        :return: A list of matching items.
+        """
+        logger.info(f"Searching in {table} for keys matching: {key_part} (regex={regex})")
+        t = self._table(table)
+        with t.lock:
+            if regex:
+                pattern = re.compile(key_part)
+                keys = [key for key in t.keys.keys() if pattern.search(key)]
+            else:
+                keys = t.keys.with_prefix(key_part)
+            matching_items = [self._read(t, key) for key in keys]
+        logger.info(f"Found {len(matching_items)} matching items in {table}")
+        return matching_items
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose `field` equals `value`. Declared indexes are built in memory on
+        first use and kept up to date by writes; entries left behind by updates and deletes are
+        dropped here. Other fields are scanned.
+        """
+        if field not in self.indexes.get(table, ()):
+            return super().query_by_index(table, field, value)
+        logger.info(f"Querying {table} for {field}={value}")
+        t = self._table(table)
+        with t.lock:
+            if t.values is None:
+                t.values = ValueIndex(self.indexes[table])
+                for key in t.keys.keys():
+                    t.values.add(key, self._read(t, key))
+            matching_items = []
+            for key in t.values.keys_for(field, value):
+                item = self._read(t, key)
+                if item is None or item.get(field) != value:
+                    t.values.discard(field, value, key)
+                    continue
+                matching_items.append(item)
+        logger.info(f"Found {len(matching_items)} matching items in {table}")
+        return matching_items
+
+    def _iter_sorted_items(
+        self, table: str, start_after: Optional[str] = None, prefix: str = ""
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        t = self._table(table)
+        with t.lock:
+            keys = t.keys.with_prefix(prefix)
+        for key in keys:
+            if start_after is not None and key <= start_after:
+                continue
+            with t.lock:
+                item = self._read(t, key)
+            if item is not None:
+                yield key, item
+
+    def close(self) -> None:
+        """Stop the background compactor and close every segment file."""
+        self._stop_compactor.set()
+        if self._compactor and self._compactor is not threading.current_thread():
+            self._compactor.join()
+        with self._tables_lock:
+            tables = list(self._tables.values())
+            self._tables.clear()
+        for t in tables:
+            with t.lock:
+                for segment in list(t.fds):
+                    self._close_segment(t, segment)
@@ -0,0 +1,479 @@
+import bisect
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .async_interface import AsyncNoSqlDb
+from .batch import Writes
+from .blob import AsyncBlobReader
+from .codec import json_dumps
+from .interface import NoSqlDb
+from .wrapper import NoSqlDbWrapper
+
+if TYPE_CHECKING:
+    from .changes import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Series:
+    """Counters and latency histogram of one (backend, table, operation)."""
+
+    __slots__ = ("calls", "errors", "items", "bytes_read", "bytes_written", "seconds", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.items = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class DbMetrics:
+    """
+    Thread-safe registry of NoSqlDb call metrics, rendered in the Prometheus text format.
+
+    Kept free of prometheus_client so the apps need no extra dependency to expose /metrics.
+    """
+
+    def __init__(self, prefix: str = "nosqldb"):
+        """
+        :param prefix: Prefix of the exported metric names.
+        """
+        self.prefix = prefix
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        backend: str,
+        table: str,
+        operation: str,
+        seconds: float,
+        error: bool = False,
+        items: int = 0,
+        bytes_read: int = 0,
+        bytes_written: int = 0,
+    ) -> None:
+        """Record one call."""
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            series = self._series.get((backend, table, operation))
+            if series is None:
+                series = self._series[(backend, table, operation)] = _Series()
+            series.calls += 1
+            series.errors += error
+            series.items += items
+            series.bytes_read += bytes_read
+            series.bytes_written += bytes_written
+            series.seconds += seconds
+            series.buckets[bucket] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        """Return the counters of every (backend, table, operation) seen so far."""
+        with self._lock:
+            return {
+                labels: {
+                    "calls": series.calls,
+                    "errors": series.errors,
+                    "items": series.items,
+                    "bytes_read": series.bytes_read,
+                    "bytes_written": series.bytes_written,
+                    "seconds": series.seconds,
+                    "buckets": list(series.buckets),
+                }
+                for labels, series in self._series.items()
+            }
+
+    def reset(self) -> None:
+        """Forget every recorded call."""
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        snapshot = sorted(self.snapshot().items())
+        p = self.prefix
+        lines = []
+        counters = (
+            ("calls", f"{p}_calls_total", "NoSqlDb calls."),
+            ("errors", f"{p}_errors_total", "NoSqlDb calls that raised."),
+            ("items", f"{p}_items_total", "Items read or written by NoSqlDb calls."),
+            ("bytes_read", f"{p}_read_bytes_total", "Bytes read by NoSqlDb calls."),
+            ("bytes_written", f"{p}_written_bytes_total", "Bytes written by NoSqlDb calls."),
+        )
+        for field, name, help_text in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f"{name}{{{_labels(labels)}}} {values[field]}" for labels, values in snapshot]
+
+        name = f"{p}_latency_seconds"
+        lines += [f"# HELP {name} Latency of NoSqlDb calls.", f"# TYPE {name} histogram"]
+        for labels, values in snapshot:
+            label_text = _labels(labels)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), values["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{label_text},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{label_text}}} {values['seconds']}")
+            lines.append(f"{name}_count{{{label_text}}} {values['calls']}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Tuple[str, str, str]) -> str:
+    backend, table, operation = (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels
+    )
+    return f'backend="{backend}",table="{table}",operation="{operation}"'
+
+
+# Process-wide registry used by the factory and rendered by the apps' /metrics endpoint
+REGISTRY = DbMetrics()
+
+
+def render_metrics() -> str:
+    """Render the process-wide registry in the Prometheus text format."""
+    return REGISTRY.render()
+
+
+class _CountingStream:
+    """Counts the bytes read through a stream."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.count += len(data)
+        return data
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+class MetricsNoSqlDb(NoSqlDbWrapper):
+    """
+    Instrumentation wrapper around any NoSqlDb backend.
+
+    Records call and error counts, a latency histogram and the number of items per
+    (backend, table, operation) in a DbMetrics registry. Bytes are exact for binary items and
+    blobs; for documents they are the JSON size, only measured when `measure_bytes` is set since
+    it costs a serialization per call. Any other attribute (e.g. `flush`, `stats`) is forwarded
+    to the backend.
+    """
+
+    def __init__(
+        self,
+        backend: NoSqlDb,
+        name: Optional[str] = None,
+        registry: Optional[DbMetrics] = None,
+        measure_bytes: bool = False,
+    ):
+        """
+        :param backend: The wrapped database.
+        :param name: The backend label. Defaults to the backend class name.
+        :param registry: Where calls are recorded. Defaults to the process-wide REGISTRY.
+        :param measure_bytes: Also count the serialized size of documents read and written.
+        """
+        super().__init__(backend)
+        self.name = name or type(backend).__name__
+        self.registry = REGISTRY if registry is None else registry
+        self.measure_bytes = measure_bytes
+        logger.info(f"MetricsNoSqlDb wrapping {type(backend).__name__} as {self.name}")
+
+    def _size(self, value: Any) -> int:
+        return len(json_dumps(value)) if self.measure_bytes and value else 0
+
+    def _call(
+        self,
+        table: str,
+        operation: str,
+        fn: Callable[[], Any],
+        measure: Callable[[Any], Tuple[int, int, int]] = lambda result: (0, 0, 0),
+    ) -> Any:
+        """
+        Run a backend call and record it. `measure` maps the result to (items, bytes_read, bytes_written).
+        """
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception:
+            self.registry.observe(self.name, table, operation, time.perf_counter() - start, error=True)
+            raise
+        seconds = time.perf_counter() - start
+        items, bytes_read, bytes_written = measure(result)
+        self.registry.observe(self.name, table, operation, seconds, False, items, bytes_read, bytes_written)
+        return result
+
+    def _read_list(self, items: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+        return len(items), self._size(items), 0
+
+    def insert_item(self, table: str, key: str, item: dict) -> dict:
+        return self._call(table, "insert_item", lambda: self.backend.insert_item(table, key, item),
+                          lambda result: (1, 0, self._size(item)))
+
+    def get_item(self, table: str, key: str) -> dict:
+        return self._call(table, "get_item", lambda: self.backend.get_item(table, key),
+                          lambda result: (1 if result else 0, self._size(result), 0))
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        return self._call(table, "get_items", lambda: self.backend.get_items(table, keys), self._read_list)
+
+    def get_binary_item(self, table: str, key: str) -> bytes:
+        return self._call(table, "get_binary_item", lambda: self.backend.get_binary_item(table, key),
+                          lambda result: (1 if result else 0, len(result or b""), 0))
+
+    def open_blob_reader(self, table: str, key: str, start: int = 0, end: Optional[int] = None) -> Optional[BinaryIO]:
+        # Only the open is timed: the bytes are read later, at the caller's pace
+        return self._call(table, "open_blob_reader", lambda: self.backend.open_blob_reader(table, key, start, end),
+                          lambda result: (1 if result is not None else 0, 0, 0))
+
+    def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        counting = _CountingStream(stream)
+        self._call(table, "put_blob_stream", lambda: self.backend.put_blob_stream(table, key, counting, content_type),
+                   lambda result: (1, 0, counting.count))
+
+    def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        return self._call(table, "get_blob_url", lambda: self.backend.get_blob_url(table, key, expires_in))
+
+    def get_all_items(self, table: str) -> list:
+        return self._call(table, "get_all_items", lambda: self.backend.get_all_items(table), self._read_list)
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        # Recorded once the iteration ends (exhausted, closed or failed), timing the whole walk
+        start = time.perf_counter()
+        items = bytes_read = 0
+        error = False
+        try:
+            for item in self.backend.iter_items(table, page_size):
+                items += 1
+                bytes_read += self._size(item)
+                yield item
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.registry.observe(self.name, table, "iter_items", time.perf_counter() - start, error, items, bytes_read)
+
+    def update_item(self, table: str, key: str, updates: dict) -> dict:
+        return self._call(table, "update_item", lambda: self.backend.update_item(table, key, updates),
+                          lambda result: (1, 0, self._size(updates)))
+
+    def delete_item(self, table: str, key: str) -> None:
+        self._call(table, "delete_item", lambda: self.backend.delete_item(table, key), lambda result: (1, 0, 0))
+
+    def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        return self._call(table, "search_by_key_part", lambda: self.backend.search_by_key_part(table, key_part, regex),
+                          self._read_list)
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        return self._call(table, "insert_items", lambda: self.backend.insert_items(table, items),
+                          lambda result: (len(items), 0, self._size(items)))
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        self._call(table, "delete_items", lambda: self.backend.delete_items(table, keys), lambda result: (len(keys), 0, 0))
+
+    def list_keys(self, table: str, prefix: str = "", delimiter: Optional[str] = None,
+                  limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return self._call(table, "list_keys", lambda: self.backend.list_keys(table, prefix, delimiter, limit, cursor),
+                          lambda result: (len(result["keys"]), 0, 0))
+
+    def exists(self, table: str, key: str) -> bool:
+        return self._call(table, "exists", lambda: self.backend.exists(table, key))
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        return self._call(table, "count", lambda: self.backend.count(table, prefix))
+
+    def scan_range(self, table: str, start_key: Optional[str] = None, end_key: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._call(table, "scan_range", lambda: self.backend.scan_range(table, start_key, end_key, limit),
+                          self._read_list)
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        return self._call(table, "query_by_index", lambda: self.backend.query_by_index(table, field, value),
+                          self._read_list)
+
+    def query(self, table: str, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+              limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return self._call(table, "query", lambda: self.backend.query(table, filters, fields, limit, cursor),
+                          lambda result: self._read_list(result["items"]))
+
+    def write_batch(self, writes: Writes) -> None:
+        values = [write.value for table_writes in writes.values() for write in table_writes.values()]
+        self._call(",".join(sorted(writes)), "write_batch", lambda: self.backend.write_batch(writes),
+                   lambda result: (len(values), 0, self._size(values)))
+
+    def compact(self, table: str, force: bool = True) -> bool:
+        return self._call(table, "compact", lambda: self.backend.compact(table, force))
+
+
+class AsyncMetricsNoSqlDb(AsyncNoSqlDb):
+    """
+    MetricsNoSqlDb for an AsyncNoSqlDb backend: records the same series, in the same registry,
+    timing each call from the caller's point of view (including its wait for the event loop).
+    Any other attribute is forwarded to the backend.
+    """
+
+    def __init__(
+        self,
+        backend: AsyncNoSqlDb,
+        name: Optional[str] = None,
+        registry: Optional[DbMetrics] = None,
+        measure_bytes: bool = False,
+    ):
+        """
+        :param backend: The wrapped database.
+        :param name: The backend label. Defaults to the backend class name.
+        :param registry: Where calls are recorded. Defaults to the process-wide REGISTRY.
+        :param measure_bytes: Also count the serialized size of documents read and written.
+        """
+        self.backend = backend
+        self.name = name or type(backend).__name__
+        self.registry = REGISTRY if registry is None else registry
+        self.measure_bytes = measure_bytes
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    @property
+    def indexes(self) -> Dict[str, List[str]]:
+        return self.backend.indexes
+
+    # Same measurements as the sync wrapper
+    _size = MetricsNoSqlDb._size
+    _read_list = MetricsNoSqlDb._read_list
+
+    async def _call(
+        self,
+        table: str,
+        operation: str,
+        call: Awaitable,
+        measure: Callable[[Any], Tuple[int, int, int]] = lambda result: (0, 0, 0),
+    ) -> Any:
+        """Await a backend call and record it. See MetricsNoSqlDb._call."""
+        start = time.perf_counter()
+        try:
+            result = await call
+        except Exception:
+            self.registry.observe(self.name, table, operation, time.perf_counter() - start, error=True)
+            raise
+        seconds = time.perf_counter() - start
+        items, bytes_read, bytes_written = measure(result)
+        self.registry.observe(self.name, table, operation, seconds, False, items, bytes_read, bytes_written)
+        return result
+
+    async def insert_item(self, table: str, key: str, item: dict) -> dict:
+        return await self._call(table, "insert_item", self.backend.insert_item(table, key, item),
+                                lambda result: (1, 0, self._size(item)))
+
+    async def get_item(self, table: str, key: str) -> dict:
+        return await self._call(table, "get_item", self.backend.get_item(table, key),
+                                lambda result: (1 if result else 0, self._size(result), 0))
+
+    async def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        return await self._call(table, "get_items", self.backend.get_items(table, keys), self._read_list)
+
+    async def get_binary_item(self, table: str, key: str) -> bytes:
+        return await self._call(table, "get_binary_item", self.backend.get_binary_item(table, key),
+                                lambda result: (1 if result else 0, len(result or b""), 0))
+
+    async def open_blob_reader(
+        self, table: str, key: str, start: int = 0, end: Optional[int] = None
+    ) -> Optional[AsyncBlobReader]:
+        return await self._call(table, "open_blob_reader", self.backend.open_blob_reader(table, key, start, end),
+                                lambda result: (1 if result is not None else 0, 0, 0))
+
+    async def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        counting = _CountingStream(stream)
+        await self._call(table, "put_blob_stream", self.backend.put_blob_stream(table, key, counting, content_type),
+                         lambda result: (1, 0, counting.count))
+
+    async def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        return await self._call(table, "get_blob_url", self.backend.get_blob_url(table, key, expires_in))
+
+    async def get_all_items(self, table: str) -> list:
+        return await self._call(table, "get_all_items", self.backend.get_all_items(table), self._read_list)
+
+    async def iter_items(self, table: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        # Recorded once the iteration ends, like MetricsNoSqlDb.iter_items
+        start = time.perf_counter()
+        items = bytes_read = 0
+        error = False
+        try:
+            async for item in self.backend.iter_items(table, page_size):
+                items += 1
+                bytes_read += self._size(item)
+                yield item
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.registry.observe(self.name, table, "iter_items", time.perf_counter() - start, error, items, bytes_read)
+
+    async def update_item(self, table: str, key: str, updates: dict) -> dict:
+        return await self._call(table, "update_item", self.backend.update_item(table, key, updates),
+                                lambda result: (1, 0, self._size(updates)))
+
+    async def delete_item(self, table: str, key: str) -> None:
+        await self._call(table, "delete_item", self.backend.delete_item(table, key), lambda result: (1, 0, 0))
+
+    async def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        return await self._call(table, "search_by_key_part", self.backend.search_by_key_part(table, key_part, regex),
+                                self._read_list)
+
+    async def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        return await self._call(table, "insert_items", self.backend.insert_items(table, items),
+                                lambda result: (len(items), 0, self._size(items)))
+
+    async def delete_items(self, table: str, keys: List[str]) -> None:
+        await self._call(table, "delete_items", self.backend.delete_items(table, keys), lambda result: (len(keys), 0, 0))
+
+    async def list_keys(self, table: str, prefix: str = "", delimiter: Optional[str] = None,
+                        limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await self._call(table, "list_keys", self.backend.list_keys(table, prefix, delimiter, limit, cursor),
+                                lambda result: (len(result["keys"]), 0, 0))
+
+    async def exists(self, table: str, key: str) -> bool:
+        return await self._call(table, "exists", self.backend.exists(table, key))
+
+    async def count(self, table: str, prefix: Optional[str] = None) -> int:
+        return await self._call(table, "count", self.backend.count(table, prefix))
+
+    async def scan_range(self, table: str, start_key: Optional[str] = None, end_key: Optional[str] = None,
+                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self._call(table, "scan_range", self.backend.scan_range(table, start_key, end_key, limit),
+                                self._read_list)
+
+    async def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        return await self._call(table, "query_by_index", self.backend.query_by_index(table, field, value),
+                                self._read_list)
+
+    async def query(self, table: str, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+                    limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await self._call(table, "query", self.backend.query(table, filters, fields, limit, cursor),
+                                lambda result: self._read_list(result["items"]))
+
+    async def write_batch(self, writes: Writes) -> None:
+        values = [write.value for table_writes in writes.values() for write in table_writes.values()]
+        await self._call(",".join(sorted(writes)), "write_batch", self.backend.write_batch(writes),
+                         lambda result: (len(values), 0, self._size(values)))
+
+    def watch(self, table: str, since: Optional[int] = None, timeout: Optional[float] = None) -> AsyncIterator["ChangeEvent"]:
+        return self.backend.watch(table, since, timeout)
+
+    async def compact(self, table: str, force: bool = True) -> bool:
+        return await self._call(table, "compact", self.backend.compact(table, force))
+
+    async def close(self) -> None:
+        await self.backend.close()
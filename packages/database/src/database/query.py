@@ -0,0 +1,137 @@
+import json
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Tuple
+
+# Supported predicate operators
+OPERATORS = ("eq", "in", "gt", "gte", "lt", "lte", "prefix")
+
+# (field, operator, operand)
+Predicate = Tuple[str, str, Any]
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> List[Predicate]:
+    """
+    Turn a filters mapping into a list of predicates.
+
+    A plain value is an equality test; a dict maps operators to operands, e.g.
+    {"status": "done", "user_id": {"in": ["a", "b"]}, "started": {"gte": 1700000000}, "id": {"prefix": "2024/"}}.
+
+    :raises ValueError: On an unknown operator or an "in" operand that is not a list.
+    """
+    predicates = []
+    for field, condition in (filters or {}).items():
+        if not isinstance(condition, dict):
+            condition = {"eq": condition}
+        for op, operand in condition.items():
+            if op not in OPERATORS:
+                raise ValueError(f"Unsupported filter operator '{op}' on '{field}', expected one of {OPERATORS}")
+            if op == "in" and not isinstance(operand, (list, tuple, set)):
+                raise ValueError(f"Filter operator 'in' on '{field}' needs a list of values")
+            predicates.append((field, op, operand))
+    return predicates
+
+
+def _test(value: Any, op: str, operand: Any) -> bool:
+    if op == "eq":
+        return value == operand
+    if op == "in":
+        return value in operand
+    if op == "prefix":
+        return isinstance(value, str) and value.startswith(operand)
+    if value is None:
+        return False
+    try:
+        if op == "gt":
+            return value > operand
+        if op == "gte":
+            return value >= operand
+        if op == "lt":
+            return value < operand
+        return value <= operand
+    except TypeError:  # Values of different types never match, like in DynamoDB
+        return False
+
+
+def matches(item: Dict[str, Any], predicates: List[Predicate]) -> bool:
+    """Whether an item satisfies every predicate."""
+    return all(_test(item.get(field), op, operand) for field, op, operand in predicates)
+
+
+def project(item: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested fields of an item (plus its id)."""
+    if not fields:
+        return item
+    return {field: item[field] for field in ["id", *fields] if field in item}
+
+
+def query_items(
+    keyed_items: Iterable[Tuple[str, Dict[str, Any]]],
+    predicates: List[Predicate],
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate a query in one pass over (key, item) pairs in key order, stopping at `limit` matches.
+
+    :return: {"items": [...], "cursor": key of the last returned item when the limit was reached, else None}
+    """
+    items = []
+    for key, item in keyed_items:
+        if "id" not in item:  # Backends that do not store the key in the item (S3)
+            item = {"id": key, **item}
+        if not matches(item, predicates):
+            continue
+        items.append(project(item, fields))
+        if limit is not None and len(items) >= limit:
+            return {"items": items, "cursor": key}
+    return {"items": items, "cursor": None}
+
+
+async def query_items_async(
+    keyed_items: AsyncIterable[Tuple[str, Dict[str, Any]]],
+    predicates: List[Predicate],
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """query_items over an async iterator, for AsyncNoSqlDb.query."""
+    items = []
+    async for key, item in keyed_items:
+        if "id" not in item:
+            item = {"id": key, **item}
+        if not matches(item, predicates):
+            continue
+        items.append(project(item, fields))
+        if limit is not None and len(items) >= limit:
+            return {"items": items, "cursor": key}
+    return {"items": items, "cursor": None}
+
+
+def _coerce(text: str) -> Any:
+    """Read numbers, booleans and null as JSON; anything else (or a quoted value) is a string."""
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return text
+    return value if isinstance(value, (str, int, float, bool)) or value is None else text
+
+
+def parse_filters(expressions: Optional[List[str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse "field:op:value" filter expressions, as passed in query parameters, into a filters mapping.
+
+    "in" takes a comma separated list. Values that read as JSON numbers, booleans or null are
+    converted; quote a value ("123") to keep it a string.
+    e.g. ["status:eq:done", "started:gte:1700000000", "user_id:in:a,b"]
+
+    :raises ValueError: On a malformed expression or unknown operator.
+    """
+    filters: Dict[str, Dict[str, Any]] = {}
+    for expression in expressions or []:
+        field, sep, rest = expression.partition(":")
+        op, sep2, text = rest.partition(":")
+        if not field or not sep or not sep2:
+            raise ValueError(f"Invalid filter '{expression}', expected field:op:value")
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator '{op}' in '{expression}', expected one of {OPERATORS}")
+        value = [_coerce(part) for part in text.split(",")] if op == "in" else _coerce(text)
+        filters.setdefault(field, {})[op] = value
+    return filters
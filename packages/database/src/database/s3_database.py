@@ -1,14 +1,39 @@
-import json
+import io
 import logging
 import re
-from typing import Dict, List, Any, Union
-import boto3
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import BinaryIO, Dict, List, Any, Iterable, Iterator, Optional, Tuple, Union
+from aws_clients import config_kwargs, get_resource
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 
+from .batch import Writes, split_writes
+from .blob import MmapBlobReader
+from .codec import get_codec
+from .disk_cache import DEFAULT_MAX_BYTES, DiskCache
 from .interface import NoSqlDb
+from .secondary_index import index_token, indexed_values, parse_indexes, still_indexed
 
 logger = logging.getLogger(__name__)
 
+# DeleteObjects accepts at most this many keys per request
+DELETE_BATCH_SIZE = 1000
+# Prefix of the secondary index objects, next to the table prefixes
+INDEX_PREFIX = "_indexes"
+# Default multipart threshold and part size of blob uploads
+MULTIPART_SIZE = 8 * 1024 * 1024
+
+
+def _next_completed(in_flight: deque, ordered: bool) -> Future:
+    """Pop the next future to hand out: the oldest one when ordered, else whichever finishes first."""
+    if ordered:
+        return in_flight.popleft()
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    future = next(iter(done))
+    in_flight.remove(future)
+    return future
+
 
 class S3Database(NoSqlDb):
     def __init__(self, config: Dict[str, str]):
@@ -20,43 +45,124 @@ class S3Database(NoSqlDb):
           - region_name (optional): AWS region.
           - aws_access_key_id (optional): AWS access key ID.
           - aws_secret_access_key (optional): AWS secret access key.
+          - aws_max_pool_connections, aws_retry_mode, aws_max_attempts, aws_connect_timeout,
+                    aws_read_timeout, aws_tcp_keepalive (optional): Tuning of the shared client,
+                    see aws_clients.config_kwargs.
+          - update_retries (optional): Attempts for a conditional read-merge-write update. Defaults to 5.
+          - max_workers (optional): Concurrent requests used by scans and bulk operations. Defaults to 10.
+          - fetch_ordered (optional): Whether scans yield objects in key order (True) or as soon as
+                    they arrive (False). Defaults to True.
+          - indexes (optional): Secondary indexes as {table: [field, ...]}, kept as empty index
+                    objects and served by query_by_index.
+          - multipart_threshold (optional): Size in bytes above which put_blob_stream uploads in
+                    parts. Defaults to 8 MiB.
+          - multipart_chunksize (optional): Part size in bytes of multipart uploads. Defaults to 8 MiB.
+          - codec, compression, compression_threshold (optional): How documents are serialized,
+                    see database.codec.get_codec. Defaults to uncompressed JSON.
+          - disk_cache_dir (optional): Directory of a local disk cache of downloaded objects,
+                    revalidated with conditional GETs and shareable by several processes.
+                    Disabled when not set.
+          - disk_cache_max_bytes (optional): Size bound of the disk cache. Defaults to 1 GiB.
         """
         self.config = config
         self.bucket_name = config.get("bucket_name")
         if not self.bucket_name:
             raise ValueError("S3Database requires a 'bucket_name' in the config.")
 
-        # Optionally pass credentials or region settings if provided in config.
-        region_name = config.get("region_name")
-        aws_access_key_id = config.get("aws_access_key_id")
-        aws_secret_access_key = config.get("aws_secret_access_key")
-
-        if aws_access_key_id and aws_secret_access_key:
-            self.s3 = boto3.resource(
-                "s3",
-                region_name=region_name,
-                aws_access_key_id=aws_access_key_id,
-                aws_secret_access_key=aws_secret_access_key,
-            )
-        else:
-            self.s3 = boto3.resource("s3", region_name=region_name) if region_name else boto3.resource("s3")
-
-        self.bucket = self.s3.Bucket(self.bucket_name)
+        self.update_retries = int(config.get("update_retries") or 5)
+        self.max_workers = int(config.get("max_workers") or 10)
+        # Shared resource (and connection pool), with at least one connection per worker
+        pool_size = max(self.max_workers, config_kwargs(config)["max_pool_connections"])
+        # Only ever used through self.s3.meta.client: instances are shared by request threads and
+        # boto3 clients are thread safe, resources are not
+        self.s3 = get_resource("s3", config, max_pool_connections=pool_size)
+        fetch_ordered = config.get("fetch_ordered")
+        self.fetch_ordered = True if fetch_ordered is None else bool(fetch_ordered)
+        self.indexes = parse_indexes(config)
+        self.codec = get_codec(config)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=int(config.get("multipart_threshold") or MULTIPART_SIZE),
+            multipart_chunksize=int(config.get("multipart_chunksize") or MULTIPART_SIZE),
+            max_concurrency=self.max_workers,
+        )
+        disk_cache_dir = config.get("disk_cache_dir")
+        self.disk_cache = DiskCache(
+            disk_cache_dir, int(config.get("disk_cache_max_bytes") or DEFAULT_MAX_BYTES)
+        ) if disk_cache_dir else None
         logger.info(f"S3Database initialized with bucket: {self.bucket_name}")
 
+    def _get_object(self, s3_key: str) -> Optional[bytes]:
+        """
+        Download an object with the thread-safe client, or return None if it does not exist.
+        With a disk cache, a cached copy is revalidated with If-None-Match and only downloaded
+        again when its ETag changed.
+        """
+        client = self.s3.meta.client
+        cached = self.disk_cache.read(self.bucket_name, s3_key) if self.disk_cache else None
+        params = {"Bucket": self.bucket_name, "Key": s3_key}
+        if cached:
+            params["IfNoneMatch"] = cached[0]
+        try:
+            response = client.get_object(**params)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if cached and code == "304":
+                return cached[1]
+            if code == "NoSuchKey":
+                if cached:
+                    self.disk_cache.discard(self.bucket_name, s3_key)
+                return None
+            raise e
+        data = response["Body"].read()
+        if self.disk_cache:
+            self.disk_cache.store(self.bucket_name, s3_key, response["ETag"], data, len(data))
+        return data
+
     def _get_s3_key(self, table: str, key: str) -> str:
         """Construct the S3 object key for the given table and key."""
         return f"{table}/{key}"
 
+    def _index_prefix(self, table: str, field: str) -> str:
+        """Construct the prefix of the index objects of a field: _indexes/<table>/<field>/."""
+        return f"{INDEX_PREFIX}/{table}/{field}/"
+
+    def _index_item(self, table: str, key: str, item: dict, fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Put the index objects of an item, one empty object per indexed field at
+        <index prefix>values/<value>/<key>. Stale index objects are dropped by query_by_index.
+        """
+        fields = self.indexes.get(table, ()) if fields is None else fields
+        for field, value in indexed_values(item, fields).items():
+            marker = f"{self._index_prefix(table, field)}values/{index_token(value)}/{key}"
+            self.s3.meta.client.put_object(Bucket=self.bucket_name, Key=marker, Body=b"")
+
+    def _build_index(self, table: str, field: str) -> None:
+        """Backfill the index of a field from the existing items the first time it is queried."""
+        built_key = f"{self._index_prefix(table, field)}built"
+        if next(self._list_object_keys(built_key, page_size=1), None) == built_key:
+            return
+        logger.info(f"Building index on '{field}' for table '{table}'")
+        table_prefix = f"{table}/"
+        client = self.s3.meta.client
+
+        def index_object(s3_key):
+            item = self._fetch_json(s3_key)
+            if item is not None:
+                self._index_item(table, s3_key[len(table_prefix):], item, [field])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(index_object, self._list_object_keys(table_prefix)))
+        client.put_object(Bucket=self.bucket_name, Key=built_key, Body=b"")
+
     def insert_item(self, table: str, key: str, item: dict) -> dict:
         """Insert an item into the specified table (S3 prefix)."""
         logger.info(f"Inserting item into table '{table}' with key '{key}': {item}")
         # Ensure the key is included in the item
         # item["id"] = key - bad idea
         s3_key = self._get_s3_key(table, key)
-        item_json = json.dumps(item)
         try:
-            self.bucket.put_object(Key=s3_key, Body=item_json)
+            self.s3.meta.client.put_object(Bucket=self.bucket_name, Key=s3_key, Body=self.codec.encode(item))
+            self._index_item(table, key, item)
             logger.info(f"Item inserted successfully at S3 key: {s3_key}")
         except ClientError as e:
             logger.exception("Failed to insert item into S3")
@@ -68,105 +174,501 @@ class S3Database(NoSqlDb):
         logger.info(f"Retrieving item from table '{table}' with key: {key}")
         s3_key = self._get_s3_key(table, key)
         try:
-            obj = self.s3.Object(self.bucket_name, s3_key)
-            response = obj.get()
-            data = response["Body"].read().decode("utf-8")
-            item = json.loads(data)
-            logger.info(f"Item retrieved: {item}")
-            return item
+            data = self._get_object(s3_key)
         except ClientError as e:
-            if e.response.get("Error", {}).get("Code") == "NoSuchKey":
-                logger.warning(f"Item with key '{key}' not found in table '{table}'.")
-                return {}
-            else:
-                logger.exception("Error retrieving item from S3")
-                raise e
+            logger.exception("Error retrieving item from S3")
+            raise e
+        if data is None:
+            logger.warning(f"Item with key '{key}' not found in table '{table}'.")
+            return {}
+        item = self.codec.decode(data)
+        logger.info(f"Item retrieved: {item}")
+        return item
             
     def get_binary_item(self, table: str, key: str) -> bytes:
         s3_key = self._get_s3_key(table, key)
         logger.info(f"Retrieving binary item from bucket with key: {s3_key}")
         try:
-            obj = self.s3.Object(self.bucket_name, s3_key)
-            response = obj.get()
+            body = self._get_object(s3_key)
+        except ClientError as e:
+            logger.exception("Error retrieving item from S3")
+            raise e
+        if body is None:
+            logger.warning(f"Item with key '{key}' not found in table '{table}'.")
+            return {}
+        logger.info("Binary or non-JSON data retrieved.")
+        return body
+
+    def open_blob_reader(self, table: str, key: str, start: int = 0, end: Optional[int] = None):
+        """
+        Open a binary item as a streaming body, fetching only [start, end) with a ranged GET.
+        Returns None if the object does not exist.
+        """
+        s3_key = self._get_s3_key(table, key)
+        if end is not None and end <= start:
+            return io.BytesIO(b"")
+        reader = self._open_cached_reader(s3_key, start, end) if self.disk_cache else None
+        if reader is not None:
+            return reader
+        params = {"Bucket": self.bucket_name, "Key": s3_key}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        logger.info(f"Opening blob reader on bucket with key: {s3_key} [{start}, {end})")
+        try:
+            return self.s3.meta.client.get_object(**params)["Body"]
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in ("NoSuchKey", "404"):
+                logger.warning(f"Item with key '{key}' not found in table '{table}'.")
+                return None
+            if code == "InvalidRange":  # start is past the end of the object
+                return io.BytesIO(b"")
+            logger.exception("Error retrieving item from S3")
+            raise e
+
+    def _open_cached_reader(self, s3_key: str, start: int, end: Optional[int]):
+        """
+        Serve a blob read from the disk cache: revalidate a cached copy, or download the whole
+        object into the cache on a full read. Returns a memory-mapped reader over the cached
+        copy, or None to fall back to a plain (ranged) GET.
+        """
+        opened = self.disk_cache.open(self.bucket_name, s3_key)
+        if opened is None and (start or end is not None):
+            return None  # Partial reads of uncached objects do not populate the cache
+        client = self.s3.meta.client
+        params = {"Bucket": self.bucket_name, "Key": s3_key}
+        if opened:
+            params["IfNoneMatch"] = opened[1].etag
+        try:
+            try:
+                response = client.get_object(**params)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if opened and code == "304":
+                    f, entry = opened
+                    return MmapBlobReader(f, entry.offset + start, None if end is None else entry.offset + end)
+                if code in ("NoSuchKey", "404"):
+                    self.disk_cache.discard(self.bucket_name, s3_key)
+                    return None
+                raise e
+        finally:
+            if opened:
+                opened[0].close()
+        with response["Body"] as body:
+            stored = self.disk_cache.store(self.bucket_name, s3_key, response["ETag"], body, response["ContentLength"])
+        if not stored:
+            return None
+        opened = self.disk_cache.open(self.bucket_name, s3_key)
+        if opened is None:
+            return None  # Evicted or replaced right away
+        f, entry = opened
+        with f:
+            return MmapBlobReader(f, entry.offset + start, None if end is None else entry.offset + end)
+
+    def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        """
+        Upload a stream with the managed transfer: objects above `multipart_threshold` go up as a
+        multipart upload with `max_workers` parts in flight, so only those parts are held in memory.
+        """
+        s3_key = self._get_s3_key(table, key)
+        extra_args = {"ContentType": content_type} if content_type else None
+        self.s3.meta.client.upload_fileobj(
+            stream, self.bucket_name, s3_key, ExtraArgs=extra_args, Config=self.transfer_config
+        )
+        logger.info(f"Blob uploaded to bucket with key: {s3_key}")
+
+    def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        """Return a presigned GET URL for a binary item."""
+        return self.s3.meta.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket_name, "Key": self._get_s3_key(table, key)},
+            ExpiresIn=expires_in,
+        )
+
+    def _fetch_json(self, s3_key: str) -> Optional[dict]:
+        """Fetch and decode one document with the thread-safe client. Returns None if it does not exist."""
+        data = self._get_object(s3_key)
+        return None if data is None else self.codec.decode(data)
+
+    def _list_object_keys(self, prefix: str, page_size: int = 1000, start_after: Optional[str] = None) -> Iterator[str]:
+        """Lazily list the object keys under a prefix (after `start_after`), one ListObjectsV2 page at a time."""
+        paginator = self.s3.meta.client.get_paginator("list_objects_v2")
+        kwargs = {"Bucket": self.bucket_name, "Prefix": prefix, "PaginationConfig": {"PageSize": page_size}}
+        if start_after:
+            kwargs["StartAfter"] = start_after
+        for page in paginator.paginate(**kwargs):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+    def _fetch_keyed(self, s3_key: str) -> Optional[Tuple[str, dict]]:
+        """Fetch one JSON object as an (s3_key, item) pair. Returns None if it does not exist."""
+        item = self._fetch_json(s3_key)
+        return None if item is None else (s3_key, item)
+
+    def _fetch_concurrently(self, s3_keys: Iterable[str], fetch, ordered: bool) -> Iterator[Any]:
+        """Run `fetch` over the keys on the thread pool, with a bounded number in flight, skipping None results."""
+        max_in_flight = self.max_workers * 2
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="s3-fetch")
+        in_flight = deque()
+        try:
+            for s3_key in s3_keys:
+                in_flight.append(executor.submit(fetch, s3_key))
+                if len(in_flight) >= max_in_flight:
+                    result = _next_completed(in_flight, ordered).result()
+                    if result is not None:
+                        yield result
+            while in_flight:
+                result = _next_completed(in_flight, ordered).result()
+                if result is not None:
+                    yield result
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def fetch_objects(self, s3_keys: Iterable[str], ordered: bool = None) -> Iterator[dict]:
+        """
+        Fetch and decode JSON objects with up to `max_workers` concurrent GETs.
 
-            body = response["Body"].read()
+        Keys are consumed lazily and at most 2 * max_workers requests are in flight, so listing,
+        fetching and the caller's processing overlap while memory stays bounded. Missing objects
+        are skipped.
 
-            logger.info("Binary or non-JSON data retrieved.")
-            return body
+        :param s3_keys: Full object keys to fetch.
+        :param ordered: Yield items in key order, or as soon as each arrives. Defaults to `fetch_ordered`.
+        :return: An iterator over the decoded items.
+        """
+        ordered = self.fetch_ordered if ordered is None else ordered
+        return self._fetch_concurrently(s3_keys, self._fetch_json, ordered)
 
+    def _iter_sorted_items(
+        self, table: str, start_after: Optional[str] = None, prefix: str = ""
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (key, item) pairs in key order. The prefix and cursor are pushed down to
+        ListObjectsV2 (Prefix=, StartAfter=) and objects are fetched concurrently.
+        """
+        table_prefix = f"{table}/"
+        s3_keys = self._list_object_keys(
+            f"{table_prefix}{prefix}", start_after=f"{table_prefix}{start_after}" if start_after else None
+        )
+        for s3_key, item in self._fetch_concurrently(s3_keys, self._fetch_keyed, ordered=True):
+            yield s3_key[len(table_prefix):], item
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Stream all items from the specified table (S3 prefix), fetching objects concurrently."""
+        logger.info(f"Iterating items from table '{table}'")
+        try:
+            yield from self.fetch_objects(self._list_object_keys(f"{table}/", page_size))
         except ClientError as e:
-            if e.response.get("Error", {}).get("Code") == "NoSuchKey":
-                logger.warning(f"Item with key '{key}' not found in table '{table}'.")
-                return {}
-            else:
-                logger.exception("Error retrieving item from S3")
-                raise e            
+            logger.exception("Error retrieving all items from S3")
+            raise e
 
     def get_all_items(self, table: str) -> list:
         """Retrieve all items from the specified table (S3 prefix)."""
         logger.info(f"Retrieving all items from table '{table}'")
-        prefix = f"{table}/"
-        items = []
-        try:
-            for obj_summary in self.bucket.objects.filter(Prefix=prefix):
-                obj = self.s3.Object(self.bucket_name, obj_summary.key)
-                response = obj.get()
-                data = response["Body"].read().decode("utf-8")
-                item = json.loads(data)
-                items.append(item)
-            logger.info(f"Total items retrieved from '{table}': {len(items)}")
-            return items
-        except ClientError as e:
-            logger.exception("Error retrieving all items from S3")
-            raise e
+        items = list(self.iter_items(table))
+        logger.info(f"Total items retrieved from '{table}': {len(items)}")
+        return items
 
     def update_item(self, table: str, key: str, updates: dict) -> dict:
         """
         Update an item in the specified table (S3 prefix) by merging the updates.
-        If the item doesn't exist, a warning is logged.
+
+        The object is read once and written back with a conditional put (If-Match on the
+        ETag that was read), so concurrent updates cannot silently overwrite each other.
+        On a conflict the read-merge-write is retried up to `update_retries` times.
+        If the item doesn't exist, a warning is logged. Only the client is used, so write_batch
+        can run updates from its thread pool.
         """
         logger.info(f"Updating item in table '{table}' with key '{key}' using updates: {updates}")
-        existing_item = self.get_item(table, key)
-        if not existing_item:
-            logger.warning(f"Item with key '{key}' not found in table '{table}', update skipped.")
-            return {}
-        existing_item.update(updates)
         s3_key = self._get_s3_key(table, key)
-        try:
-            self.bucket.put_object(Key=s3_key, Body=json.dumps(existing_item))
-            logger.info(f"Item updated successfully: {existing_item}")
-        except ClientError as e:
-            logger.exception("Failed to update item in S3")
-            raise e
-        return existing_item
+        client = self.s3.meta.client  # boto3 clients are thread safe, resources are not
+        for attempt in range(self.update_retries):
+            try:
+                response = client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+                    logger.warning(f"Item with key '{key}' not found in table '{table}', update skipped.")
+                    return {}
+                logger.exception("Error retrieving item from S3")
+                raise e
+
+            existing_item = self.codec.decode(response["Body"].read())
+            existing_item.update(updates)
+            try:
+                client.put_object(
+                    Bucket=self.bucket_name, Key=s3_key, Body=self.codec.encode(existing_item), IfMatch=response["ETag"]
+                )
+                self._index_item(table, key, existing_item)
+                logger.info(f"Item updated successfully: {existing_item}")
+                return existing_item
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code in ("PreconditionFailed", "ConditionalRequestConflict", "NoSuchKey"):
+                    logger.warning(f"Concurrent modification of '{s3_key}' (attempt {attempt + 1}), retrying update")
+                    continue
+                logger.exception("Failed to update item in S3")
+                raise e
+        raise RuntimeError(f"S3 update of '{s3_key}' failed after {self.update_retries} conflicting attempts")
 
     def delete_item(self, table: str, key: str) -> None:
         """Delete an item from the specified table (S3 prefix)."""
         logger.info(f"Deleting item from table '{table}' with key: {key}")
         s3_key = self._get_s3_key(table, key)
         try:
-            obj = self.s3.Object(self.bucket_name, s3_key)
-            obj.delete()
+            self.s3.meta.client.delete_object(Bucket=self.bucket_name, Key=s3_key)
             logger.info(f"Item with key '{key}' deleted from table '{table}'")
         except ClientError as e:
             logger.exception("Failed to delete item from S3")
             raise e
 
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        """Insert several items with up to `max_workers` concurrent puts."""
+        logger.info(f"Inserting {len(items)} items into table '{table}'")
+        client = self.s3.meta.client  # boto3 clients are thread safe, resources are not
+
+        def put(entry):
+            key, item = entry
+            client.put_object(Bucket=self.bucket_name, Key=self._get_s3_key(table, key), Body=self.codec.encode(item))
+            self._index_item(table, key, item)
+            return item
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                inserted = list(executor.map(put, items.items()))
+        except ClientError as e:
+            logger.exception("Failed to insert items into S3")
+            raise e
+        logger.info(f"Inserted {len(inserted)} items into table '{table}'")
+        return inserted
+
+    def write_batch(self, writes: Writes) -> None:
+        """
+        Apply a batch with up to `max_workers` concurrent requests: puts and updates of every table
+        at once, then one DeleteObjects call per 1000 deleted keys.
+        """
+        logger.info(f"Writing a batch of {sum(len(w) for w in writes.values())} writes")
+        client = self.s3.meta.client
+
+        def put(table: str, key: str, item: dict) -> None:
+            client.put_object(Bucket=self.bucket_name, Key=self._get_s3_key(table, key), Body=self.codec.encode(item))
+            self._index_item(table, key, item)
+
+        deletes = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for table, table_writes in writes.items():
+                puts, updates, deletes[table] = split_writes(table_writes)
+                futures += [executor.submit(put, table, key, item) for key, item in puts.items()]
+                futures += [executor.submit(self.update_item, table, key, fields) for key, fields in updates.items()]
+            for future in futures:
+                future.result()  # Re-raise the first failure
+        for table, keys in deletes.items():
+            if keys:
+                self.delete_items(table, keys)
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        """Retrieve several items with up to `max_workers` concurrent gets. Missing keys are skipped."""
+        logger.info(f"Retrieving {len(keys)} items from table '{table}'")
+        try:
+            return list(self.fetch_objects((self._get_s3_key(table, key) for key in keys), ordered=True))
+        except ClientError as e:
+            logger.exception("Error retrieving items from S3")
+            raise e
+
+    def _get_keyed_items(self, table: str, keys: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """get_items as (key, item) pairs: objects do not store their key."""
+        table_prefix = f"{table}/"
+        s3_keys = (self._get_s3_key(table, key) for key in keys)
+        return [(s3_key[len(table_prefix):], item) for s3_key, item in self._fetch_concurrently(s3_keys, self._fetch_keyed, ordered=True)]
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        """Delete several items using DeleteObjects, up to 1000 keys per request."""
+        logger.info(f"Deleting {len(keys)} items from table '{table}'")
+        client = self.s3.meta.client
+        try:
+            for start in range(0, len(keys), DELETE_BATCH_SIZE):
+                chunk = keys[start:start + DELETE_BATCH_SIZE]
+                response = client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": self._get_s3_key(table, key)} for key in chunk], "Quiet": True},
+                )
+                errors = response.get("Errors", [])
+                if errors:
+                    raise RuntimeError(f"S3 batch delete failed for {len(errors)} keys: {errors[:3]}")
+        except ClientError as e:
+            logger.exception("Failed to delete items from S3")
+            raise e
+
+    def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        List keys (and common prefixes) of a table with ListObjectsV2, without downloading any object.
+        The cursor is the S3 continuation token.
+        """
+        logger.info(f"Listing keys in table '{table}' with prefix '{prefix}' (delimiter={delimiter})")
+        table_prefix = f"{table}/"
+        kwargs = {"Bucket": self.bucket_name, "Prefix": f"{table_prefix}{prefix}"}
+        if delimiter:
+            kwargs["Delimiter"] = delimiter
+        if cursor:
+            kwargs["ContinuationToken"] = cursor
+        keys, prefixes = [], []
+        try:
+            while True:
+                if limit is not None:
+                    kwargs["MaxKeys"] = min(1000, limit - len(keys) - len(prefixes))
+                response = self.s3.meta.client.list_objects_v2(**kwargs)
+                keys.extend(obj["Key"][len(table_prefix):] for obj in response.get("Contents", []))
+                prefixes.extend(p["Prefix"][len(table_prefix):] for p in response.get("CommonPrefixes", []))
+                token = response.get("NextContinuationToken")
+                if not token:
+                    return {"keys": keys, "prefixes": prefixes, "cursor": None}
+                if limit is not None and len(keys) + len(prefixes) >= limit:
+                    return {"keys": keys, "prefixes": prefixes, "cursor": token}
+                kwargs["ContinuationToken"] = token
+        except ClientError as e:
+            logger.exception("Error listing keys in S3")
+            raise e
+
+    def exists(self, table: str, key: str) -> bool:
+        """Check whether an item exists with a HEAD request, without downloading it."""
+        try:
+            self.s3.meta.client.head_object(Bucket=self.bucket_name, Key=self._get_s3_key(table, key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            logger.exception("Error checking item in S3")
+            raise e
+        return True
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """Count the items of a table by listing its object keys, without downloading any object."""
+        logger.info(f"Counting items in table '{table}' with prefix '{prefix or ''}'")
+        try:
+            return sum(1 for _ in self._list_object_keys(f"{table}/{prefix or ''}"))
+        except ClientError as e:
+            logger.exception("Error listing keys in S3")
+            raise e
+
+    def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose keys fall in [start_key, end_key), in key order. The listing starts
+        just before `start_key` (StartAfter= its parent string), stops at `end_key` and the objects
+        in range are fetched concurrently.
+        """
+        logger.info(f"Scanning table '{table}' from {start_key} to {end_key} (limit={limit})")
+        table_prefix = f"{table}/"
+        start_after = f"{table_prefix}{start_key[:-1]}" if start_key else None
+
+        def s3_keys() -> Iterator[str]:
+            listed = 0
+            for s3_key in self._list_object_keys(table_prefix, start_after=start_after):
+                key = s3_key[len(table_prefix):]
+                if start_key is not None and key < start_key:
+                    continue
+                if (end_key is not None and key >= end_key) or (limit is not None and listed >= limit):
+                    return
+                listed += 1
+                yield s3_key
+
+        try:
+            return [item for _, item in self._fetch_concurrently(s3_keys(), self._fetch_keyed, ordered=True)]
+        except ClientError as e:
+            logger.exception("Error scanning items in S3")
+            raise e
+
     def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
         """
         Search for items in the specified table (S3 prefix) whose keys contain or match a part of the given key.
-        
+
+        Matching is done on object keys before anything is downloaded: a prefix search is pushed
+        down to ListObjectsV2 (Prefix=), a regex search lists the keys and filters them locally.
+        Only the matching objects are fetched.
+
         :param table: The table (prefix) to search in.
         :param key_part: The key part to search for.
         :param regex: If True, treat key_part as a regular expression; otherwise, do a prefix match.
         :return: A list of matching items.
         """
         logger.info(f"Searching in table '{table}' for keys matching: {key_part} (regex={regex})")
-        items = self.get_all_items(table)
-        if regex:
-            pattern = re.compile(key_part)
-            matching_items = [item for item in items if "id" in item and pattern.search(item["id"])]
-        else:
-            matching_items = [item for item in items if "id" in item and item["id"].startswith(key_part)]
+        table_prefix = f"{table}/"
+        try:
+            if regex:
+                pattern = re.compile(key_part)
+                s3_keys = (
+                    s3_key for s3_key in self._list_object_keys(table_prefix)
+                    if pattern.search(s3_key[len(table_prefix):])
+                )
+            else:
+                s3_keys = self._list_object_keys(f"{table_prefix}{key_part}")
+            matching_items = list(self.fetch_objects(s3_keys))
+        except ClientError as e:
+            logger.exception("Error searching items in S3")
+            raise e
         logger.info(f"Found {len(matching_items)} matching items in table '{table}'")
         return matching_items
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose `field` equals `value`. See _keyed_query_by_index.
+        """
+        return [item for _, item in self._keyed_query_by_index(table, field, value)]
+
+    def _keyed_query_by_index(self, table: str, field: str, value: Any) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Retrieve the (key, item) pairs whose `field` equals `value`. Items do not store their key,
+        so it is taken from the object key.
+
+        For indexed fields the keys are listed from the value's index objects and only those items
+        are fetched, concurrently. Index objects whose item was deleted or changed are removed
+        (best effort - a concurrent write of the same item puts its index object back on its next
+        write). Other fields fall back to a scan.
+        """
+        if field not in self.indexes.get(table, ()):
+            return [(key, item) for key, item in self._iter_sorted_items(table) if item.get(field) == value]
+        logger.info(f"Querying table '{table}' by index on '{field}'")
+        token = index_token(value)
+        values_prefix = f"{self._index_prefix(table, field)}values/{token}/"
+        try:
+            self._build_index(table, field)
+            keys = [marker[len(values_prefix):] for marker in self._list_object_keys(values_prefix)]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                fetched = list(executor.map(lambda key: self._fetch_json(self._get_s3_key(table, key)), keys))
+
+            matching_items, stale = [], []
+            for key, item in zip(keys, fetched):
+                if not still_indexed(item, field, token):
+                    stale.append(f"{values_prefix}{key}")
+                elif item.get(field) == value:
+                    matching_items.append((key, item))
+            for start in range(0, len(stale), DELETE_BATCH_SIZE):
+                self.s3.meta.client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": marker} for marker in stale[start:start + DELETE_BATCH_SIZE]], "Quiet": True},
+                )
+        except ClientError as e:
+            logger.exception("Error querying index in S3")
+            raise e
+        logger.info(f"Found {len(matching_items)} items in table '{table}' with {field}={value}")
+        return matching_items
+
+    def close(self) -> None:
+        """
+        Release this instance. The S3 client is shared process-wide through aws_clients and stays
+        open for its other users; aws_clients.reset_clients closes it.
+        """
+        logger.info(f"Closing S3Database for bucket: {self.bucket_name}")
@@ -0,0 +1,67 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import quote
+
+# Attribute values that can be indexed; items missing the attribute (or holding None, lists, ...) are not indexed
+INDEXABLE_TYPES = (str, int, float, bool)
+
+
+def parse_indexes(config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Read the declared secondary indexes from a backend config.
+
+    The "indexes" config key maps a table name to the attributes indexed on it,
+    e.g. {"run": ["user_id"], "report": ["user_id", "product"]}.
+    """
+    indexes = config.get("indexes") or {}
+    return {table: list(fields) for table, fields in indexes.items()}
+
+
+def index_token(value: Any) -> str:
+    """Encode an attribute value as a single path segment (file name or object key part)."""
+    return quote(str(value), safe="")
+
+
+def indexed_values(item: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Return the indexable values of an item for the given fields."""
+    return {
+        field: item[field]
+        for field in fields
+        if isinstance(item.get(field), INDEXABLE_TYPES)
+    }
+
+
+def still_indexed(item: Optional[Dict[str, Any]], field: str, token: str) -> bool:
+    """Whether an item (None when deleted) still holds the value an index entry with `token` was written for."""
+    value = item.get(field) if item else None
+    return isinstance(value, INDEXABLE_TYPES) and index_token(value) == token
+
+
+class ValueIndex:
+    """
+    In-memory secondary index of one table: field -> value -> keys.
+
+    Entries are only ever added on write; callers verify candidates against the stored
+    item on read and discard stale ones. Not thread safe on its own - callers hold the table lock.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = list(fields)
+        self._entries: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in self.fields}
+
+    def add(self, key: str, item: Dict[str, Any]) -> None:
+        for field, value in indexed_values(item, self.fields).items():
+            self._entries[field].setdefault(value, set()).add(key)
+
+    def discard(self, field: str, value: Any, key: str) -> None:
+        keys = self._entries[field].get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._entries[field][value]
+
+    def keys_for(self, field: str, value: Any) -> List[str]:
+        """Return the candidate keys holding `value` in `field`, sorted."""
+        return sorted(self._entries[field].get(value, ()))
+
+    def __contains__(self, field: Optional[str]) -> bool:
+        return field in self._entries
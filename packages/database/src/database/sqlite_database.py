@@ -0,0 +1,352 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .interface import NoSqlDb
+from .key_index import _MAX_CHAR, list_sorted_keys
+from .query import normalize_filters, query_items
+from .secondary_index import parse_indexes
+
+logger = logging.getLogger(__name__)
+
+# SQLite builds without SQLITE_MAX_VARIABLE_NUMBER raised accept at most 999 parameters per statement
+MAX_PARAMETERS = 500
+# Operand types that bind to SQL values and compare the same way in SQLite and Python
+_SQL_SCALARS = (str, int, float, bool)
+
+
+def _identifier(name: str) -> str:
+    """Quote a table or index name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _field_expression(field: str) -> str:
+    """
+    SQL expression extracting a top-level field of the document. Index definitions and queries
+    build it the same way, so SQLite matches queries to the expression indexes.
+    """
+    if '"' in field or "'" in field:
+        raise ValueError(f"Unsupported field name for a SQLite expression: {field}")
+    return f"json_extract(doc, '$.\"{field}\"')"
+
+
+def _regexp(pattern: str, value: Optional[str]) -> bool:
+    return value is not None and re.search(pattern, value) is not None
+
+
+class SqliteDatabase(NoSqlDb):
+    """
+    NoSqlDb on a single SQLite file.
+
+    Each table is an SQLite table of (id TEXT PRIMARY KEY, doc TEXT) holding the item as JSON.
+    The database runs in WAL mode, so readers never block on the writer, and every thread gets its
+    own connection. Fields declared in the "indexes" config get an expression index on
+    json_extract(doc, '$."field"'), which serves query_by_index and equality filters in query.
+    """
+
+    def __init__(self, config: Dict[str, str]):
+        """
+        Initialize the SqliteDatabase implementation.
+
+        Expected configuration keys:
+          - sqlite_path (optional): The database file. Defaults to "data/sqlite/database.db".
+          - sqlite_synchronous (optional): PRAGMA synchronous level. NORMAL only risks the last
+                    transactions on a power loss in WAL mode; FULL syncs every commit. Defaults to "NORMAL".
+          - sqlite_busy_timeout (optional): Milliseconds a writer waits for the write lock. Defaults to 5000.
+          - indexes (optional): Secondary indexes as {table: [field, ...]}, created as expression indexes.
+        """
+        self.config = config
+        self.path = config.get("sqlite_path") or os.path.join("data", "sqlite", "database.db")
+        self.synchronous = str(config.get("sqlite_synchronous") or "NORMAL").upper()
+        if self.synchronous not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Unsupported sqlite_synchronous level: {self.synchronous}")
+        self.busy_timeout = int(config.get("sqlite_busy_timeout") or 5000)
+        self.indexes = parse_indexes(config)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._tables = set()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+        logger.info(f"SqliteDatabase initialized with file: {self.path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection of the calling thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: multi-statement writes open their own transaction
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.execute(f"PRAGMA busy_timeout={self.busy_timeout}")
+            conn.create_function("regexp", 2, _regexp, deterministic=True)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _table(self, table: str) -> Tuple[sqlite3.Connection, str]:
+        """Return the thread's connection and the quoted table name, creating the table and its indexes once."""
+        conn = self._connect()
+        name = _identifier(table)
+        if table not in self._tables:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+            for field in self.indexes.get(table, ()):
+                index_name = _identifier(f"{table}__{field}")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {name} ({_field_expression(field)})")
+            self._tables.add(table)
+        return conn, name
+
+    def insert_item(self, table: str, key: str, item: dict) -> dict:
+        logger.info(f"Inserting item into {table} with key {key}")
+        item["id"] = key  # Ensure the key is included in the item
+        conn, name = self._table(table)
+        conn.execute(f"INSERT OR REPLACE INTO {name} (id, doc) VALUES (?, ?)", (key, json.dumps(item)))
+        return item
+
+    def get_item(self, table: str, key: str) -> dict:
+        logger.info(f"Retrieving item from {table} with id: {key}")
+        conn, name = self._table(table)
+        row = conn.execute(f"SELECT doc FROM {name} WHERE id = ?", (key,)).fetchone()
+        if row is None:
+            logger.warning(f"Item with id {key} not found in {table}")
+            return {}
+        return json.loads(row[0])
+
+    def get_all_items(self, table: str) -> list:
+        logger.info(f"Retrieving all items from {table}")
+        items = list(self.iter_items(table))
+        logger.info(f"Total items retrieved from {table}: {len(items)}")
+        return items
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        for _, item in self._iter_sorted_items(table, page_size=page_size):
+            yield item
+
+    def update_item(self, table: str, key: str, updates: dict) -> dict:
+        logger.info(f"Updating item in {table} with id {key}")
+        conn, name = self._table(table)
+        # Take the write lock up front so the read-merge-write cannot interleave with another writer
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(f"SELECT doc FROM {name} WHERE id = ?", (key,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                logger.warning(f"Item with id {key} not found in {table}, update skipped")
+                return {}
+            item = json.loads(row[0])
+            item.update(updates)
+            conn.execute(f"UPDATE {name} SET doc = ? WHERE id = ?", (json.dumps(item), key))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return item
+
+    def delete_item(self, table: str, key: str) -> None:
+        logger.info(f"Deleting item from {table} with id {key}")
+        conn, name = self._table(table)
+        conn.execute(f"DELETE FROM {name} WHERE id = ?", (key,))
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        logger.info(f"Inserting {len(items)} items into {table}")
+        for key, item in items.items():
+            item["id"] = key  # Ensure the key is included in the item
+        conn, name = self._table(table)
+        with conn:  # One transaction for the batch
+            conn.execute("BEGIN")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {name} (id, doc) VALUES (?, ?)",
+                [(key, json.dumps(item)) for key, item in items.items()],
+            )
+        return list(items.values())
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        logger.info(f"Retrieving {len(keys)} items from {table}")
+        conn, name = self._table(table)
+        found = {}
+        for start in range(0, len(keys), MAX_PARAMETERS):
+            chunk = keys[start:start + MAX_PARAMETERS]
+            placeholders = ", ".join("?" * len(chunk))
+            for key, doc in conn.execute(f"SELECT id, doc FROM {name} WHERE id IN ({placeholders})", chunk):
+                found[key] = json.loads(doc)
+        return [found[key] for key in keys if key in found]
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        logger.info(f"Deleting {len(keys)} items from {table}")
+        conn, name = self._table(table)
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(f"DELETE FROM {name} WHERE id = ?", [(key,) for key in keys])
+
+    def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        List keys (and common prefixes) of a table from the primary key index, without reading documents.
+        A page starts after the cursor and, without a delimiter, reads at most `limit` + 1 keys.
+        """
+        conn, name = self._table(table)
+        # Without a delimiter one key past the page tells whether more follow; rolled up prefixes
+        # can hide any number of keys, so delimited listings read to the end of the prefix
+        page_size = limit + 1 if limit is not None and not delimiter else -1
+        rows = conn.execute(
+            f"SELECT id FROM {name} WHERE id >= ? AND id < ? AND (? IS NULL OR id > ?) ORDER BY id LIMIT ?",
+            (prefix, prefix + _MAX_CHAR, cursor, cursor, page_size),
+        )
+        return list_sorted_keys([row[0] for row in rows], prefix, delimiter, limit, cursor)
+
+    def exists(self, table: str, key: str) -> bool:
+        """Check whether an item exists with a primary key lookup, without reading the document."""
+        conn, name = self._table(table)
+        return conn.execute(f"SELECT 1 FROM {name} WHERE id = ?", (key,)).fetchone() is not None
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """Count the items of a table on the primary key index."""
+        conn, name = self._table(table)
+        if not prefix:
+            return conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+        return conn.execute(
+            f"SELECT COUNT(*) FROM {name} WHERE id >= ? AND id < ?", (prefix, prefix + _MAX_CHAR)
+        ).fetchone()[0]
+
+    def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the items whose keys fall in [start_key, end_key) with a range scan of the primary key."""
+        conn, name = self._table(table)
+        rows = conn.execute(
+            f"SELECT doc FROM {name} WHERE id >= ? AND id < ? ORDER BY id LIMIT ?",
+            (start_key or "", end_key if end_key is not None else _MAX_CHAR, -1 if limit is None else limit),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        """
+        Search for items whose keys contain or match a part of the given key.
+
+        A prefix search is a range scan of the primary key (what LIKE 'x%' becomes when SQLite can
+        use the index, without LIKE's case folding); a regex is matched against the keys only.
+
+        :param table: The table to search in.
+        :param key_part: The key part to search for.
+        :param regex: Whether to treat key_part as a regular expression. Defaults to False (prefix search).
+        :return: A list of matching items.
+        """
+        logger.info(f"Searching in {table} for keys matching: {key_part} (regex={regex})")
+        conn, name = self._table(table)
+        if regex:
+            rows = conn.execute(f"SELECT doc FROM {name} WHERE id REGEXP ? ORDER BY id", (key_part,))
+        else:
+            rows = conn.execute(
+                f"SELECT doc FROM {name} WHERE id >= ? AND id < ? ORDER BY id", (key_part, key_part + _MAX_CHAR)
+            )
+        matching_items = [json.loads(row[0]) for row in rows]
+        logger.info(f"Found {len(matching_items)} matching items in {table}")
+        return matching_items
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose `field` equals `value`, through the expression index when the
+        field is declared in "indexes" (otherwise SQLite scans the table).
+        """
+        if not isinstance(value, _SQL_SCALARS):
+            return super().query_by_index(table, field, value)
+        logger.info(f"Querying {table} for {field}={value}")
+        conn, name = self._table(table)
+        rows = conn.execute(f"SELECT doc FROM {name} WHERE {_field_expression(field)} = ? ORDER BY id", (value,))
+        # SQLite stores booleans as 0/1 and compares across types, so confirm in Python
+        matching_items = [item for item in (json.loads(row[0]) for row in rows) if item.get(field) == value]
+        logger.info(f"Found {len(matching_items)} matching items in {table}")
+        return matching_items
+
+    def _iter_sorted_items(
+        self,
+        table: str,
+        start_after: Optional[str] = None,
+        prefix: str = "",
+        where: str = "",
+        params: Tuple = (),
+        page_size: int = 100,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Page through (key, item) pairs in key order with keyset pagination, so no read transaction
+        stays open between pages. `where` is an extra SQL condition with its `params`.
+        """
+        conn, name = self._table(table)
+        last = start_after
+        while True:
+            after = "" if last is None else "AND id > ?"
+            rows = conn.execute(
+                f"SELECT id, doc FROM {name} WHERE id >= ? AND id < ? {after} {where} ORDER BY id LIMIT ?",
+                (prefix, prefix + _MAX_CHAR, *(() if last is None else (last,)), *params, page_size),
+            ).fetchall()
+            for key, doc in rows:
+                yield key, json.loads(doc)
+            if len(rows) < page_size:
+                return
+            last = rows[-1][0]
+
+    def query(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the items matching `filters` in key order, one page at a time. Predicates on
+        scalar values are pushed into the SQL WHERE clause (equality on an indexed field uses its
+        expression index) and every row is re-checked with the Python semantics of NoSqlDb.query.
+        """
+        logger.info(f"Querying {table} with filters {filters} (limit={limit})")
+        predicates = normalize_filters(filters)
+        clauses, params = [], []
+        prefix = ""
+        for field, op, operand in predicates:
+            if field == "id" and op == "prefix":
+                prefix = operand
+                continue
+            expression = "id" if field == "id" else _field_expression(field)
+            if op == "in":
+                if operand and all(isinstance(value, _SQL_SCALARS) for value in operand):
+                    clauses.append(f"{expression} IN ({', '.join('?' * len(operand))})")
+                    params.extend(operand)
+            elif op == "prefix":
+                if isinstance(operand, str):
+                    clauses.append(f"{expression} >= ? AND {expression} < ?")
+                    params.extend((operand, operand + _MAX_CHAR))
+            elif isinstance(operand, _SQL_SCALARS):
+                sql_op = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}[op]
+                clauses.append(f"{expression} {sql_op} ?")
+                params.append(operand)
+        where = "".join(f" AND {clause}" for clause in clauses)
+        page_size = max(limit or 100, 100)
+        keyed_items = self._iter_sorted_items(table, cursor, prefix, where, tuple(params), page_size)
+        return query_items(keyed_items, predicates, fields, limit)
+
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+        self._tables.clear()
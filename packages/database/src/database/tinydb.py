@@ -1,12 +1,18 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 import logging
 from tinydb import TinyDB, Query
 from tinydb.storages import JSONStorage
 from tinydb.middlewares import CachingMiddleware
 from tinydb.table import Document, Table as TinyDBTable
+from .batch import Writes
 from .interface import NoSqlDb
+from .key_index import SortedKeyIndex, list_sorted_keys
+from .secondary_index import ValueIndex, parse_indexes
+from .query import normalize_filters, query_items
 import os
 import re
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,31 +23,171 @@ class CustomTable(TinyDBTable):
 class CustomDB(TinyDB):
     table_class = CustomTable  # Use CustomTable with string-based doc_id
 
+class WriteBehindMiddleware(CachingMiddleware):
+    """
+    CachingMiddleware that flushes after `write_cache_size` writes or once
+    `flush_interval` seconds have passed since the last flush, whichever comes first.
+    """
+
+    def __init__(self, storage_cls, write_cache_size: int, flush_interval: float):
+        super().__init__(storage_cls)
+        self.WRITE_CACHE_SIZE = write_cache_size
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def write(self, data):
+        super().write(data)
+        if self.flush_interval and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        super().flush()
+        self._last_flush = time.monotonic()
+
+    @property
+    def dirty(self) -> bool:
+        return self._cache_modified_count > 0
+
 class TinyDBDatabase(NoSqlDb):
     def __init__(self, config: Dict[str, str]):
-        base_dir: str = os.path.join("data", "databases")
+        """
+        Initialize the TinyDB implementation.
+
+        Expected configuration keys:
+          - base_dir (optional): Directory holding the <table>.json files. Defaults to "data/databases".
+          - tinydb_cache (optional): Keep one open, in-memory table per file for the whole
+                    process instead of re-reading the file on every operation. Defaults to False.
+          - tinydb_write_cache_size (optional): In cache mode, flush to disk after this many writes. Defaults to 100.
+          - tinydb_flush_interval (optional): In cache mode, flush pending writes at least every
+                    this many seconds. 0 disables time based flushing. Defaults to 5.
+          - indexes (optional): Secondary indexes as {table: [field, ...]}. In cache mode they are
+                    kept in memory next to the cached table and serve query_by_index.
+        """
+        base_dir: str = config.get("base_dir") or os.path.join("data", "databases")
         self.config = config
         self.base_dir = base_dir
+        self.cache_enabled = bool(config.get("tinydb_cache", False))
+        self.write_cache_size = int(config.get("tinydb_write_cache_size") or 100)
+        flush_interval = config.get("tinydb_flush_interval")
+        self.flush_interval = float(5 if flush_interval is None else flush_interval)
+        self._dbs: Dict[str, CustomDB] = {}
+        self._key_indexes: Dict[str, SortedKeyIndex] = {}
+        self.indexes = parse_indexes(config)
+        self._value_indexes: Dict[str, ValueIndex] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_lock = threading.Lock()
+        self._stop_flusher = threading.Event()
+        self._flusher = None
         os.makedirs(self.base_dir, exist_ok=True)
-        logger.info(f"TinyDB base directory set to: {self.base_dir}")
+        logger.info(f"TinyDB base directory set to: {self.base_dir} (cache={self.cache_enabled})")
+
+        if self.cache_enabled and self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="tinydb-flusher", daemon=True)
+            self._flusher.start()
+
+    def _lock(self, table: str) -> threading.RLock:
+        """Return the lock serializing access to a table file."""
+        with self._locks_lock:
+            if table not in self._locks:
+                self._locks[table] = threading.RLock()
+            return self._locks[table]
 
     def _get_db(self, table: str) -> CustomDB:
         file_path = os.path.join(self.base_dir, f"{table}.json")
-        # return CustomDB(file_path, storage=CachingMiddleware(JSONStorage))
-        return CustomDB(file_path)
+        if not self.cache_enabled:
+            return CustomDB(file_path)
+
+        with self._lock(table):
+            db = self._dbs.get(table)
+            if db is None:
+                storage = WriteBehindMiddleware(JSONStorage, self.write_cache_size, self.flush_interval)
+                db = CustomDB(file_path, storage=storage)
+                self._dbs[table] = db
+                logger.info(f"Opened cached TinyDB table: {file_path}")
+            return db
+
+    def _key_index(self, table: str, db: CustomDB) -> SortedKeyIndex:
+        """
+        Return the sorted key index of a cached table, building it on first use.
+        Caller holds the table lock.
+        """
+        index = self._key_indexes.get(table)
+        if index is None:
+            index = SortedKeyIndex(doc.doc_id for doc in db.all())
+            self._key_indexes[table] = index
+        return index
+
+    def _update_key_index(self, table: str, added: Iterable[str] = (), removed: Iterable[str] = ()) -> None:
+        """Apply a write to the key index, if one was built. Caller holds the table lock."""
+        index = self._key_indexes.get(table)
+        if index is None:
+            return
+        for key in added:
+            index.add(key)
+        for key in removed:
+            index.discard(key)
+
+    def _value_index(self, table: str, db: CustomDB) -> ValueIndex:
+        """
+        Return the secondary index of a cached table, building it on first use.
+        Caller holds the table lock.
+        """
+        index = self._value_indexes.get(table)
+        if index is None:
+            index = ValueIndex(self.indexes.get(table, ()))
+            for doc in db.all():
+                index.add(doc.doc_id, doc)
+            self._value_indexes[table] = index
+        return index
+
+    def _update_value_index(self, table: str, items: Dict[str, dict]) -> None:
+        """Add written items to the secondary index, if one was built. Caller holds the table lock."""
+        index = self._value_indexes.get(table)
+        if index is None:
+            return
+        for key, item in items.items():
+            index.add(key, item)
+
+    def _flush_loop(self) -> None:
+        """Background loop flushing dirty cached tables every flush_interval seconds."""
+        while not self._stop_flusher.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all pending cached changes to disk."""
+        for table, db in list(self._dbs.items()):
+            with self._lock(table):
+                if db.storage.dirty:
+                    db.storage.flush()
+                    logger.info(f"Flushed cached TinyDB table: {table}")
+
+    def close(self) -> None:
+        """Stop the background flusher, flush pending writes and close all cached tables."""
+        self._stop_flusher.set()
+        if self._flusher and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        for table in list(self._dbs.keys()):
+            with self._lock(table):
+                db = self._dbs.pop(table, None)
+                if db is not None:
+                    db.close()
 
     def insert_item(self, table: str, key: str, item: dict) -> dict:
         logger.info(f"Inserting item into {table} with key {key}: {item}")
-        db = self._get_db(table)
         item["id"] = key  # Ensure the key is included in the item
-        inserted_id = db.insert(Document(item, doc_id=key))  # Use key directly as doc_id
+        with self._lock(table):
+            db = self._get_db(table)
+            inserted_id = db.insert(Document(item, doc_id=key))  # Use key directly as doc_id
+            self._update_key_index(table, added=[key])
+            self._update_value_index(table, {key: item})
         logger.info(f"Item inserted successfully with doc_id={inserted_id}: {item}")
         return item
 
     def get_item(self, table: str, key: str) -> dict:
         logger.info(f"Retrieving item from {table} with id: {key}")
-        db = self._get_db(table)
-        result = db.get(doc_id=key)  # Use string-based doc_id
+        with self._lock(table):
+            db = self._get_db(table)
+            result = db.get(doc_id=key)  # Use string-based doc_id
         if result:
             logger.info(f"Item retrieved: {result}")
         else:
@@ -50,49 +196,262 @@ class TinyDBDatabase(NoSqlDb):
 
     def get_all_items(self, table: str) -> list:
         logger.info(f"Retrieving all items from {table}")
-        db = self._get_db(table)
-        items = db.all()
+        with self._lock(table):
+            db = self._get_db(table)
+            items = db.all()
         logger.info(f"Total items retrieved from {table}: {len(items)}")
         return items
 
     def update_item(self, table: str, key: str, updates: dict) -> dict:
         logger.info(f"Updating item in {table} with id {key}: {updates}")
-        db = self._get_db(table)
-        existing_item = self.get_item(table, key)
-        if existing_item:
-            existing_item.update(updates)
-            db.update(existing_item, doc_ids=[key])  # Use string-based doc_id
-            logger.info(f"Item updated successfully: {existing_item}")
-        else:
-            logger.warning(f"Item with id {key} not found in {table}, update skipped")
-        return self.get_item(table, key)
+        updated_item = {}
+
+        def apply_updates(doc: dict):
+            doc.update(updates)
+            updated_item.update(doc)
+
+        # One read and one write of the table - the merge happens inside TinyDB's update
+        with self._lock(table):
+            db = self._get_db(table)
+            try:
+                db.update(apply_updates, doc_ids=[key])  # Use string-based doc_id
+            except KeyError:
+                logger.warning(f"Item with id {key} not found in {table}, update skipped")
+                return {}
+            self._update_value_index(table, {key: updated_item})
+        logger.info(f"Item updated successfully: {updated_item}")
+        return updated_item
 
     def delete_item(self, table: str, key: str) -> None:
         logger.info(f"Deleting item from {table} with id {key}")
-        db = self._get_db(table)
-        db.remove(doc_ids=[key])  # Use string-based doc_id
+        with self._lock(table):
+            db = self._get_db(table)
+            db.remove(doc_ids=[key])  # Use string-based doc_id
+            self._update_key_index(table, removed=[key])
         logger.info(f"Item with id {key} deleted from {table}")
 
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        logger.info(f"Inserting {len(items)} items into {table}")
+        documents = []
+        for key, item in items.items():
+            item["id"] = key  # Ensure the key is included in the item
+            documents.append(Document(item, doc_id=key))
+        # One read and one write of the table for the whole batch
+        with self._lock(table):
+            db = self._get_db(table)
+            db.insert_multiple(documents)
+            self._update_key_index(table, added=items.keys())
+            self._update_value_index(table, items)
+        logger.info(f"Inserted {len(documents)} items into {table}")
+        return list(items.values())
+
+    def write_batch(self, writes: Writes) -> None:
+        for table, table_writes in writes.items():
+            logger.info(f"Writing a batch of {len(table_writes)} writes to {table}")
+            written: Dict[str, dict] = {}
+            deleted: List[str] = []
+
+            def apply(docs: Dict[str, dict]):
+                for key, write in table_writes.items():
+                    if write.op == "put":
+                        docs[key] = written[key] = {**write.value, "id": key}
+                    elif write.op == "update":
+                        if key in docs:
+                            docs[key].update(write.value)
+                            written[key] = docs[key]
+                    elif docs.pop(key, None) is not None:
+                        deleted.append(key)
+
+            # One read and one write of the table for the whole batch, through the public Storage
+            # API: the data is {table name: {doc_id: document}}, the layout of the JSON file
+            with self._lock(table):
+                db = self._get_db(table)
+                data = db.storage.read() or {}
+                docs = data.setdefault(db.default_table_name, {})
+                apply(docs)
+                db.storage.write(data)
+                db.table(db.default_table_name).clear_cache()
+                self._update_key_index(table, added=written.keys(), removed=deleted)
+                self._update_value_index(table, written)
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        logger.info(f"Retrieving {len(keys)} items from {table}")
+        with self._lock(table):
+            db = self._get_db(table)
+            found = {doc.doc_id: doc for doc in db.get(doc_ids=keys)}
+        return [found[key] for key in keys if key in found]
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        logger.info(f"Deleting {len(keys)} items from {table}")
+        with self._lock(table):
+            db = self._get_db(table)
+            # Only the existing keys: older TinyDB releases raise on unknown doc_ids
+            existing = [doc.doc_id for doc in db.get(doc_ids=list(keys))]
+            removed = db.remove(doc_ids=existing) if existing else []
+            self._update_key_index(table, removed=removed)
+        logger.info(f"Deleted {len(removed)} items from {table}")
+
+    def list_keys(
+        self,
+        table: str,
+        prefix: str = "",
+        delimiter: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        List keys (and common prefixes) of a table. In cache mode this is served from the sorted
+        key index; otherwise the table file is read once.
+        """
+        logger.info(f"Listing keys in {table} with prefix '{prefix}' (delimiter={delimiter})")
+        with self._lock(table):
+            db = self._get_db(table)
+            if self.cache_enabled:
+                return self._key_index(table, db).list_keys(prefix, delimiter, limit, cursor)
+            sorted_keys = sorted(doc.doc_id for doc in db.all())
+        return list_sorted_keys(sorted_keys, prefix, delimiter, limit, cursor)
+
+    def exists(self, table: str, key: str) -> bool:
+        """
+        Check whether an item exists. In cache mode this is a lookup in the sorted key index;
+        otherwise the table file is read without building the document.
+        """
+        with self._lock(table):
+            db = self._get_db(table)
+            if self.cache_enabled:
+                return key in self._key_index(table, db)
+            return db.contains(doc_id=key)
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        """
+        Count the items of a table. In cache mode this is served from the sorted key index.
+        """
+        with self._lock(table):
+            db = self._get_db(table)
+            if self.cache_enabled:
+                return self._key_index(table, db).count(prefix or "")
+            if not prefix:
+                return len(db)
+            # The stored keys, without building a Document per item
+            stored = (db.storage.read() or {}).get(db.default_table_name, {})
+            return sum(1 for key in stored if key.startswith(prefix))
+
+    def scan_range(
+        self,
+        table: str,
+        start_key: Optional[str] = None,
+        end_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose keys fall in [start_key, end_key), in key order. In cache mode the
+        range is located in the sorted key index and only its documents are fetched; otherwise the
+        table file is read once and its keys sorted.
+        """
+        logger.info(f"Scanning {table} from {start_key} to {end_key} (limit={limit})")
+        with self._lock(table):
+            db = self._get_db(table)
+            if self.cache_enabled:
+                keys = self._key_index(table, db).key_range(start_key, end_key, limit)
+                docs = {key: db.get(doc_id=key) for key in keys}
+            else:
+                docs = {doc.doc_id: doc for doc in db.all()}
+                keys = SortedKeyIndex(docs).key_range(start_key, end_key, limit)
+        return [docs[key] for key in keys if docs[key] is not None]
+
     def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
         """
         Search for items whose keys contain or match a part of the given key.
 
+        In cache mode prefix searches bisect the sorted key index and only fetch the matching
+        documents; regex searches filter the index keys before fetching documents.
+
         :param table: The table to search in.
         :param key_part: The key part to search for.
         :param regex: Whether to treat key_part as a regular expression. Defaults to False (prefix search).
         :return: A list of matching items.
         """
         logger.info(f"Searching in {table} for keys matching: {key_part} (regex={regex})")
-        db = self._get_db(table)
-        items = db.all()
+        pattern = re.compile(key_part) if regex else None
+        with self._lock(table):
+            db = self._get_db(table)
+            if self.cache_enabled:
+                index = self._key_index(table, db)
+                if regex:
+                    keys = [key for key in index.keys() if pattern.search(key)]
+                else:
+                    keys = index.with_prefix(key_part)
+                matching_items = [doc for doc in (db.get(doc_id=key) for key in keys) if doc is not None]
+            else:
+                items = db.all()
+                if regex:
+                    # Perform a regex search on the "id" field
+                    matching_items = [item for item in items if "id" in item and pattern.search(item["id"])]
+                else:
+                    # Default to a prefix match
+                    matching_items = [item for item in items if "id" in item and item["id"].startswith(key_part)]
 
-        if regex:
-            # Perform a regex search on the "id" field
-            pattern = re.compile(key_part)
-            matching_items = [item for item in items if "id" in item and pattern.search(item["id"])]
-        else:
-            # Default to a prefix match
-            matching_items = [item for item in items if "id" in item and item["id"].startswith(key_part)]
+        logger.info(f"Found {len(matching_items)} matching items in {table}")
+        return matching_items
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Retrieve the items whose `field` equals `value`.
 
+        In cache mode declared indexes are kept in memory, so only the matching documents are
+        touched; entries left behind by updates and deletes are dropped here. Otherwise the table
+        file is read once and filtered.
+
+        :param table: The table to query.
+        :param field: The attribute to match.
+        :param value: The value to match.
+        :return: The matching items.
+        """
+        logger.info(f"Querying {table} for {field}={value}")
+        with self._lock(table):
+            db = self._get_db(table)
+            if self.cache_enabled and field in self.indexes.get(table, ()):
+                index = self._value_index(table, db)
+                matching_items = []
+                for key in index.keys_for(field, value):
+                    doc = db.get(doc_id=key)
+                    if doc is None or doc.get(field) != value:
+                        index.discard(field, value, key)
+                        continue
+                    matching_items.append(doc)
+            else:
+                matching_items = db.search(Query()[field] == value)
         logger.info(f"Found {len(matching_items)} matching items in {table}")
-        return matching_items
\ No newline at end of file
+        return matching_items
+
+    def query(
+        self,
+        table: str,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the items matching `filters` in key order, one page at a time, in a single pass
+        that stops as soon as `limit` items matched. In cache mode the pass walks the sorted key
+        index from the cursor and an equality on an indexed field uses the secondary index.
+        See NoSqlDb.query for the filter language.
+        """
+        logger.info(f"Querying {table} with filters {filters} (limit={limit})")
+        predicates = normalize_filters(filters)
+        with self._lock(table):
+            db = self._get_db(table)
+            if not self.cache_enabled:
+                docs = sorted(db.all(), key=lambda doc: doc.doc_id)
+                keyed_items = ((doc.doc_id, doc) for doc in docs if cursor is None or doc.doc_id > cursor)
+                return query_items(keyed_items, predicates, fields, limit)
+
+            indexed = next((p for p in predicates if p[1] == "eq" and p[0] in self.indexes.get(table, ())), None)
+            if indexed:
+                field, _, value = indexed
+                keys = [key for key in self._value_index(table, db).keys_for(field, value) if cursor is None or key > cursor]
+            else:
+                keys = self._key_index(table, db).keys_after(cursor)
+            docs = (db.get(doc_id=key) for key in keys)
+            return query_items(((doc.doc_id, doc) for doc in docs if doc is not None), predicates, fields, limit)
@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .batch import Write, Writes
+from .interface import NoSqlDb
+from .wrapper import NoSqlDbWrapper
+
+logger = logging.getLogger(__name__)
+
+# Item attribute holding the expiry time in epoch seconds, as DynamoDB's native TTL expects
+DEFAULT_TTL_ATTRIBUTE = "expires_at"
+DEFAULT_SWEEP_INTERVAL = 60.0
+# Maximum number of keys a sweep examines per table
+DEFAULT_SWEEP_BATCH_SIZE = 500
+
+
+class TtlNoSqlDb(NoSqlDbWrapper):
+    """
+    Per-table time to live around any NoSqlDb backend.
+
+    Items inserted into a TTL table are stamped with an expiry time (epoch seconds) in
+    `attribute`, unless they already carry one; updates keep it. Expired items are hidden from
+    reads right away and deleted by `sweep`, which a background thread runs every
+    `sweep_interval` seconds. A sweep lists the next `sweep_batch_size` keys of each table,
+    reads only those items and deletes the expired ones, so its cost does not grow with the
+    table; the next sweep resumes after the last key. Once a pass has walked a whole table and
+    deleted something, it lets the backend compact the table (force=False, so the backend's own
+    thresholds decide) and scans only pay for live data.
+
+    Backends with native expiry (DynamoDB) are created with `sweep_interval=0`: no thread runs,
+    reads are still filtered since the native deletion lags. Key-only reads (list_keys, count)
+    see expired items until they are deleted.
+    """
+
+    def __init__(
+        self,
+        backend: NoSqlDb,
+        tables: Dict[str, float],
+        attribute: str = DEFAULT_TTL_ATTRIBUTE,
+        sweep_interval: float = DEFAULT_SWEEP_INTERVAL,
+        sweep_batch_size: int = DEFAULT_SWEEP_BATCH_SIZE,
+    ):
+        """
+        :param backend: The wrapped database.
+        :param tables: Time to live in seconds per table.
+        :param attribute: The item attribute holding the expiry time in epoch seconds.
+        :param sweep_interval: Seconds between background sweeps. 0 disables the sweeper.
+        :param sweep_batch_size: Maximum number of keys examined (and so deleted) per table and sweep.
+        """
+        super().__init__(backend)
+        self.tables = {table: float(ttl) for table, ttl in tables.items()}
+        self.attribute = attribute
+        self.sweep_interval = sweep_interval
+        self.sweep_batch_size = sweep_batch_size
+        # Per table: where the current pass stopped, and whether it deleted anything
+        self._cursors: Dict[str, Optional[str]] = {}
+        self._deleted_in_pass: Dict[str, int] = {}
+        self._sweep_lock = threading.Lock()
+        self._stop_sweeper = threading.Event()
+        self._sweeper = None
+        if sweep_interval > 0:
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="ttl-sweeper", daemon=True)
+            self._sweeper.start()
+        logger.info(f"TtlNoSqlDb wrapping {type(backend).__name__} (tables={self.tables}, sweep_interval={sweep_interval})")
+
+    def _stamp(self, table: str, item: dict) -> dict:
+        ttl = self.tables.get(table)
+        if ttl is None or not isinstance(item, dict) or item.get(self.attribute) is not None:
+            return item
+        return {**item, self.attribute: int(time.time() + ttl)}
+
+    def _expired(self, table: str, item: Optional[dict], now: float) -> bool:
+        if not item or table not in self.tables:
+            return False
+        expires_at = item.get(self.attribute)
+        try:
+            return expires_at is not None and float(expires_at) <= now
+        except (TypeError, ValueError):
+            return False
+
+    def _live(self, table: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if table not in self.tables:
+            return items
+        now = time.time()
+        return [item for item in items if not self._expired(table, item, now)]
+
+    # Sweeping
+
+    def _sweep_loop(self) -> None:
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("TTL sweep failed")
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Examine the next `sweep_batch_size` keys of every TTL table and delete the expired items
+        among them. Only that window of keys is listed and read.
+
+        :param now: The current time in epoch seconds. Defaults to time.time().
+        :return: The number of deleted items.
+        """
+        now = time.time() if now is None else now
+        total = 0
+        with self._sweep_lock:
+            for table in self.tables:
+                page = self.backend.list_keys(table, limit=self.sweep_batch_size, cursor=self._cursors.get(table))
+                items = self.backend._get_keyed_items(table, page["keys"]) if page["keys"] else []
+                keys = [key for key, item in items if self._expired(table, item, now)]
+                if keys:
+                    self.backend.delete_items(table, keys)
+                    total += len(keys)
+                    self._deleted_in_pass[table] = self._deleted_in_pass.get(table, 0) + len(keys)
+                self._cursors[table] = page["cursor"]
+                if page["cursor"] is None and self._deleted_in_pass.pop(table, 0):
+                    self.backend.compact(table, force=False)  # End of a pass over the table
+        if total:
+            logger.info(f"TTL sweep deleted {total} expired items")
+        return total
+
+    # NoSqlDb
+
+    def insert_item(self, table: str, key: str, item: dict) -> dict:
+        return self.backend.insert_item(table, key, self._stamp(table, item))
+
+    def get_item(self, table: str, key: str) -> dict:
+        item = self.backend.get_item(table, key)
+        return {} if self._expired(table, item, time.time()) else item
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        return self._live(table, self.backend.get_items(table, keys))
+
+    def _get_keyed_items(self, table: str, keys: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        items = self.backend._get_keyed_items(table, keys)
+        if table not in self.tables:
+            return items
+        now = time.time()
+        return [(key, item) for key, item in items if not self._expired(table, item, now)]
+
+    def get_all_items(self, table: str) -> list:
+        return self._live(table, self.backend.get_all_items(table))
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        items = self.backend.iter_items(table, page_size)
+        if table not in self.tables:
+            return items
+        now = time.time()
+        return (item for item in items if not self._expired(table, item, now))
+
+    def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        return self._live(table, self.backend.search_by_key_part(table, key_part, regex))
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        if table in self.tables:
+            items = {key: self._stamp(table, item) for key, item in items.items()}
+        return self.backend.insert_items(table, items)
+
+    def exists(self, table: str, key: str) -> bool:
+        if table not in self.tables:
+            return self.backend.exists(table, key)
+        return bool(self.get_item(table, key))  # The expiry attribute has to be read
+
+    def scan_range(self, table: str, start_key: Optional[str] = None, end_key: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        # Expired items are dropped, so the result may come back shorter than `limit`
+        return self._live(table, self.backend.scan_range(table, start_key, end_key, limit))
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        return self._live(table, self.backend.query_by_index(table, field, value))
+
+    def query(self, table: str, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+              limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        if table not in self.tables:
+            return self.backend.query(table, filters, fields, limit, cursor)
+        # Expired items are dropped from the page (which may come back short, the cursor stays
+        # valid); the expiry attribute is fetched to check it and removed if not requested
+        extra = bool(fields) and self.attribute not in fields
+        page = self.backend.query(table, filters, [*fields, self.attribute] if extra else fields, limit, cursor)
+        items = self._live(table, page["items"])
+        if extra:
+            for item in items:
+                item.pop(self.attribute, None)
+        return {**page, "items": items}
+
+    def write_batch(self, writes: Writes) -> None:
+        stamped = {}
+        for table, table_writes in writes.items():
+            stamped[table] = {
+                key: Write("put", self._stamp(table, write.value)) if write.op == "put" else write
+                for key, write in table_writes.items()
+            }
+        self.backend.write_batch(stamped)
+
+    def close(self) -> None:
+        self._stop_sweeper.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+        self.backend.close()
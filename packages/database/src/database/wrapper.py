@@ -0,0 +1,110 @@
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from .batch import Writes
+from .interface import NoSqlDb
+
+if TYPE_CHECKING:
+    from .changes import ChangeEvent
+
+
+class NoSqlDbWrapper(NoSqlDb):
+    """
+    Base of the layers wrapped around a NoSqlDb backend (cache, metrics, TTL, change feed).
+
+    Every method is forwarded to `backend` as is, so a layer only overrides what it changes.
+    Any other attribute (e.g. `flush`, `stats`) is forwarded to the backend too.
+    """
+
+    def __init__(self, backend: NoSqlDb):
+        """
+        :param backend: The wrapped database.
+        """
+        self.backend = backend
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper: forward backend specific methods
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    @property
+    def indexes(self) -> Dict[str, List[str]]:
+        return self.backend.indexes
+
+    def insert_item(self, table: str, key: str, item: dict) -> dict:
+        return self.backend.insert_item(table, key, item)
+
+    def get_item(self, table: str, key: str) -> dict:
+        return self.backend.get_item(table, key)
+
+    def get_items(self, table: str, keys: List[str]) -> List[Dict[str, Any]]:
+        return self.backend.get_items(table, keys)
+
+    def _get_keyed_items(self, table: str, keys: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        return self.backend._get_keyed_items(table, keys)
+
+    def get_binary_item(self, table: str, key: str) -> bytes:
+        return self.backend.get_binary_item(table, key)
+
+    def open_blob_reader(self, table: str, key: str, start: int = 0, end: Optional[int] = None) -> Optional[BinaryIO]:
+        return self.backend.open_blob_reader(table, key, start, end)
+
+    def put_blob_stream(self, table: str, key: str, stream: BinaryIO, content_type: Optional[str] = None) -> None:
+        self.backend.put_blob_stream(table, key, stream, content_type)
+
+    def get_blob_url(self, table: str, key: str, expires_in: int = 3600) -> Optional[str]:
+        return self.backend.get_blob_url(table, key, expires_in)
+
+    def get_all_items(self, table: str) -> list:
+        return self.backend.get_all_items(table)
+
+    def iter_items(self, table: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        return self.backend.iter_items(table, page_size)
+
+    def update_item(self, table: str, key: str, updates: dict) -> dict:
+        return self.backend.update_item(table, key, updates)
+
+    def delete_item(self, table: str, key: str) -> None:
+        self.backend.delete_item(table, key)
+
+    def search_by_key_part(self, table: str, key_part: str, regex: bool = False) -> List[Dict[str, Any]]:
+        return self.backend.search_by_key_part(table, key_part, regex)
+
+    def insert_items(self, table: str, items: Dict[str, dict]) -> List[dict]:
+        return self.backend.insert_items(table, items)
+
+    def delete_items(self, table: str, keys: List[str]) -> None:
+        self.backend.delete_items(table, keys)
+
+    def list_keys(self, table: str, prefix: str = "", delimiter: Optional[str] = None,
+                  limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return self.backend.list_keys(table, prefix, delimiter, limit, cursor)
+
+    def exists(self, table: str, key: str) -> bool:
+        return self.backend.exists(table, key)
+
+    def count(self, table: str, prefix: Optional[str] = None) -> int:
+        return self.backend.count(table, prefix)
+
+    def scan_range(self, table: str, start_key: Optional[str] = None, end_key: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.backend.scan_range(table, start_key, end_key, limit)
+
+    def query_by_index(self, table: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        return self.backend.query_by_index(table, field, value)
+
+    def query(self, table: str, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+              limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return self.backend.query(table, filters, fields, limit, cursor)
+
+    def write_batch(self, writes: Writes) -> None:
+        self.backend.write_batch(writes)
+
+    def watch(self, table: str, since: Optional[int] = None, timeout: Optional[float] = None) -> Iterator["ChangeEvent"]:
+        return self.backend.watch(table, since, timeout)
+
+    def compact(self, table: str, force: bool = True) -> bool:
+        return self.backend.compact(table, force)
+
+    def close(self) -> None:
+        self.backend.close()
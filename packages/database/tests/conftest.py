@@ -1,11 +1,20 @@
-import os
 import pytest
 from database.tinydb import TinyDBDatabase
 
 @pytest.fixture
-def temp_db():
+def temp_db(tmp_path):
     """Creates a temporary database for testing."""
-    db_file = "test_db.json"
-    db = TinyDBDatabase(db_file)
+    db = TinyDBDatabase({"base_dir": str(tmp_path)})
     yield db
-    os.remove(db_file)  # Cleanup after test
+    db.close()
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Run the test against moto's in-process S3 and DynamoDB mocks."""
+    moto = pytest.importorskip("moto")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        yield
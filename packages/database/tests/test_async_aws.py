@@ -0,0 +1,129 @@
+import asyncio
+import io
+import urllib.request
+from decimal import Decimal
+import boto3
+import pytest
+from aws_clients import reset_clients
+from database.async_database import SyncNoSqlDb
+from database.batch import Write
+
+pytest.importorskip("aiobotocore")
+moto_server = pytest.importorskip("moto.server")
+
+from database.async_dynamodb_database import AsyncDynamoDBDatabase  # noqa: E402
+from database.async_s3_database import AsyncS3Database  # noqa: E402
+from database.s3_database import S3Database  # noqa: E402
+
+
+@pytest.fixture
+def aws_server(monkeypatch):
+    """
+    Run the test against a moto server: aiobotocore's responses cannot be mocked in-process.
+    botocore and aiobotocore clients reach it through AWS_ENDPOINT_URL.
+    """
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    server = moto_server.ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    monkeypatch.setenv("AWS_ENDPOINT_URL", f"http://{host}:{port}")
+    yield
+    # The server keeps its buckets and tables in process-wide state, aws_clients its clients
+    urllib.request.urlopen(urllib.request.Request(f"http://{host}:{port}/moto-api/reset", method="POST"))
+    server.stop()
+    reset_clients()
+
+
+@pytest.fixture
+def bucket(aws_server):
+    boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="async-db")
+    return {"bucket_name": "async-db", "region_name": "us-east-1", "indexes": {"run": ["status"]}}
+
+
+def test_s3_round_trip_shares_the_layout_of_the_sync_backend(bucket):
+    async def run():
+        db = AsyncS3Database(dict(bucket, multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024))
+        await db.insert_items("run", {f"r{i}": {"status": "done" if i % 2 else "new"} for i in range(5)})
+        assert (await db.update_item("run", "r0", {"status": "done"}))["status"] == "done"
+        assert await db.update_item("run", "missing", {"status": "done"}) == {}
+        await db.write_batch({"run": {"r4": Write("delete", None), "r5": Write("put", {"status": "new"})}})
+        assert await db.count("run") == 5
+        assert await db.exists("run", "r5") and not await db.exists("run", "r4")
+        assert (await db.list_keys("run", limit=2))["keys"] == ["r0", "r1"]
+        assert [item["status"] for item in await db.scan_range("run", "r1", "r3")] == ["done", "new"]
+        page = await db.query("run", {"status": "done"}, fields=["status"], limit=2)
+        assert page["items"] == [{"id": "r0", "status": "done"}, {"id": "r1", "status": "done"}]
+        assert (await db.query("run", {"status": "done"}, cursor=page["cursor"]))["items"] == [{"id": "r3", "status": "done"}]
+        assert (await db.query("run", {"id": {"prefix": "r5"}}))["items"] == [{"id": "r5", "status": "new"}]
+
+        blob = bytes(range(256)) * 24 * 1024  # 6 MiB: two parts
+        await db.put_blob_stream("blob", "big", io.BytesIO(blob), "application/octet-stream")
+        async with await db.open_blob_reader("blob", "big", 10, 20) as reader:
+            assert await reader.read() == blob[10:20]
+        async with await db.open_blob_reader("blob", "big") as reader:
+            assert b"".join([chunk async for chunk in reader]) == blob
+        assert await db.open_blob_reader("blob", "missing") is None
+        assert "async-db" in await db.get_blob_url("blob", "big")
+        await db.close()
+
+    asyncio.run(run())
+    # The sync backend reads what the async one wrote
+    assert S3Database(bucket).get_item("run", "r5") == {"status": "new"}
+
+
+def test_s3_client_follows_the_event_loop(bucket):
+    db = AsyncS3Database(bucket)
+    asyncio.run(db.insert_item("run", "a", {"n": 1}))
+    assert asyncio.run(db.get_item("run", "a")) == {"n": 1}  # A new client on the new loop
+    asyncio.run(db.close())
+
+
+@pytest.fixture
+def dynamo_tables(aws_server):
+    client = boto3.client("dynamodb", region_name="us-east-1")
+    client.create_table(
+        TableName="run",
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    return {"region_name": "us-east-1", "indexes": {"run": ["status"]}}
+
+
+def test_dynamodb_round_trip_with_plain_values(dynamo_tables):
+    async def run():
+        db = AsyncDynamoDBDatabase(dynamo_tables)
+        await db.insert_items("run", {f"r{i}": {"status": "done" if i % 2 else "new", "n": i} for i in range(5)})
+        assert await db.get_item("run", "r1") == {"id": "r1", "status": "done", "n": Decimal(1)}
+        assert (await db.update_item("run", "r0", {"status": "done"}))["status"] == "done"
+        assert await db.update_item("run", "missing", {"status": "done"}) == {}
+        await db.write_batch({"run": {"r4": Write("delete", None), "r2": Write("update", {"n": 20})}})
+        assert (await db.get_item("run", "r2"))["n"] == 20
+        assert await db.count("run") == 4 and await db.count("run", "r1") == 1
+        assert await db.exists("run", "r3") and not await db.exists("run", "r4")
+        assert await db.list_keys("run", limit=2) == {"keys": ["r0", "r1"], "prefixes": [], "cursor": "r1"}
+        assert [item["id"] for item in await db.scan_range("run", "r1", "r3")] == ["r1", "r2"]
+        assert [item["id"] for item in await db.get_items("run", ["r3", "missing", "r0"])] == ["r3", "r0"]
+        # The declared index does not exist on the table: the query scans instead
+        assert sorted(item["id"] for item in await db.query_by_index("run", "status", "done")) == ["r0", "r1", "r3"]
+        page = await db.query("run", {"status": "done"}, fields=["status"], limit=2)
+        rest = await db.query("run", {"status": "done"}, fields=["status"], cursor=page["cursor"])
+        assert sorted(item["id"] for item in page["items"] + rest["items"]) == ["r0", "r1", "r3"]
+        await db.delete_items("run", ["r0", "r1"])
+        assert sorted([item["id"] async for item in db.iter_items("run", page_size=1)]) == ["r2", "r3"]
+        assert sorted(item["id"] for item in await db.get_all_items("run")) == ["r2", "r3"]
+        await db.close()
+
+    asyncio.run(run())
+
+
+def test_sync_adapter_over_a_native_backend(dynamo_tables):
+    db = SyncNoSqlDb(AsyncDynamoDBDatabase(dynamo_tables))
+    with db.batch() as batch:
+        batch.insert_item("run", "a", {"status": "new"})
+        batch.insert_item("run", "b", {"status": "done"})
+    assert [item["id"] for item in db.query("run", {"status": "new"})["items"]] == ["a"]
+    assert db.compact("run") is False
+    db.close()
@@ -0,0 +1,153 @@
+import asyncio
+import io
+import itertools
+import threading
+import time
+import pytest
+from database.async_database import SyncNoSqlDb, ThreadedAsyncNoSqlDb
+from database.factory import get_async_database, get_database, reset_async_databases, reset_databases
+from database.filesystem_database import FilesystemDatabase
+
+
+def open_db(tmp_path):
+    return FilesystemDatabase({"base_dir": str(tmp_path), "indexes": {"run": ["status"]}})
+
+
+def test_threaded_adapter_round_trip(tmp_path):
+    async def run():
+        db = ThreadedAsyncNoSqlDb(open_db(tmp_path), max_workers=4)
+        await db.insert_items("run", {f"r{i}": {"status": "done" if i % 2 else "new"} for i in range(5)})
+        await db.update_item("run", "r0", {"status": "done"})
+        await db.delete_item("run", "r4")
+        assert (await db.get_item("run", "r0"))["status"] == "done"
+        assert [item["id"] async for item in db.iter_items("run", page_size=2)] == ["r0", "r1", "r2", "r3"]
+        assert [item["id"] for item in await db.get_items("run", ["r3", "missing", "r1"])] == ["r3", "r1"]
+        assert (await db.query("run", {"status": "done"}, fields=["id"])) == {
+            "items": [{"id": "r0"}, {"id": "r1"}, {"id": "r3"}],
+            "cursor": None,
+        }
+        assert (await db.list_keys("run", limit=3))["keys"] == ["r0", "r1", "r2"]
+        await db.close()
+
+    asyncio.run(run())
+
+
+def test_calls_do_not_block_the_event_loop(tmp_path):
+    release = threading.Event()
+
+    class SlowDatabase(FilesystemDatabase):
+        def get_item(self, table, key):
+            release.wait(5)
+            return super().get_item(table, key)
+
+    async def run():
+        db = ThreadedAsyncNoSqlDb(SlowDatabase({"base_dir": str(tmp_path)}))
+        await db.insert_item("run", "a", {"n": 1})
+        pending = asyncio.ensure_future(db.get_item("run", "a"))
+        await asyncio.sleep(0.05)
+        assert not pending.done()  # The loop kept running while the backend call waits
+        release.set()
+        assert (await pending)["n"] == 1
+        await db.close()
+
+    asyncio.run(run())
+
+
+def test_sync_adapter_round_trip(tmp_path):
+    db = SyncNoSqlDb(ThreadedAsyncNoSqlDb(open_db(tmp_path)))
+    db.insert_item("run", "b", {"status": "new"})
+    db.insert_item("run", "a", {"status": "done"})
+    assert db.get_item("run", "a")["status"] == "done"
+    assert [item["id"] for item in db.iter_items("run")] == ["a", "b"]
+    assert [item["id"] for item in db.query_by_index("run", "status", "new")] == ["b"]
+    db.close()
+    db.close()
+
+
+def test_factory_adapts_the_shared_wrapped_instance(tmp_path):
+    config = {"database_type": "filesystem", "base_dir": str(tmp_path), "change_feed": True, "cache_tables": ["run"]}
+
+    async def run():
+        db = get_async_database(lambda: config)
+        assert isinstance(db, ThreadedAsyncNoSqlDb)
+        assert get_async_database(lambda: dict(config)) is db
+        assert db.db is get_database(lambda: config)
+        assert await db.get_item("run", "a") == {}  # Cached as missing
+        await db.insert_item("run", "a", {"n": 1})
+        assert (await db.get_item("run", "a"))["n"] == 1
+        assert [event.key async for event in db.watch("run", since=0, timeout=0)] == ["a"]
+        await reset_async_databases()
+        reset_databases()
+
+    asyncio.run(run())
+    assert get_async_database(lambda: {"database_type": "none"}) is None
+
+
+def test_sync_adapter_forwards_blobs_batches_watch_and_compact(tmp_path):
+    config = {"database_type": "logdb", "base_dir": str(tmp_path), "change_feed": True, "async_native": False}
+    try:
+        db = SyncNoSqlDb(get_async_database(lambda: config))
+        events = db.watch("run", timeout=0.5)
+        with db.batch() as batch:
+            batch.insert_item("run", "a", {"n": 1})
+            batch.insert_item("run", "b", {"n": 2})
+        assert [event.key for event in itertools.islice(events, 2)] == ["a", "b"]
+        assert db.compact("run") is True
+        assert db.get_blob_url("run", "a") is None
+        with pytest.raises(NotImplementedError):
+            db.put_blob_stream("blob", "k", io.BytesIO(b"data"))
+
+        files = SyncNoSqlDb(ThreadedAsyncNoSqlDb(FilesystemDatabase({"base_dir": str(tmp_path / "files")})))
+        files.put_blob_stream("blob", "k", io.BytesIO(b"0123456789"))
+        with files.open_blob_reader("blob", "k", 2, 6) as reader:
+            assert reader.read() == b"2345"
+        assert files.open_blob_reader("blob", "missing") is None
+        files.close()
+    finally:
+        asyncio.run(reset_async_databases())
+        reset_databases()
+
+
+def test_aiofiles_reads_go_around_the_thread_pool(tmp_path):
+    pytest.importorskip("aiofiles")
+    from database.async_filesystem_database import AsyncFilesystemDatabase
+
+    async def run():
+        db = AsyncFilesystemDatabase(open_db(tmp_path), max_workers=1)
+        await db.insert_items("run", {"a": {"status": "new"}, "b": {"status": "done"}})
+        await db.put_blob_stream("blob", "k", io.BytesIO(b"0123456789"))
+        db._executor.submit(time.sleep, 0.5)  # Keep the only worker busy
+        started = time.perf_counter()
+        assert (await db.get_item("run", "a"))["status"] == "new"
+        assert await db.get_item("run", "missing") == {}
+        assert [item["status"] for item in await db.get_items("run", ["b", "missing", "a"])] == ["done", "new"]
+        assert await db.exists("run", "b") and not await db.exists("run", "missing")
+        async with await db.open_blob_reader("blob", "k", 3, 7) as reader:
+            assert [chunk async for chunk in reader] == [b"3456"]
+        assert await db.open_blob_reader("blob", "missing") is None
+        assert time.perf_counter() - started < 0.4
+        await db.close()
+
+    asyncio.run(run())
+
+
+def test_factory_prefers_the_native_backend_without_sync_only_layers(tmp_path):
+    pytest.importorskip("aiofiles")
+    from database.async_filesystem_database import AsyncFilesystemDatabase
+    from database.metrics import REGISTRY, AsyncMetricsNoSqlDb
+
+    config = {"database_type": "filesystem", "base_dir": str(tmp_path), "metrics_enabled": True}
+
+    async def run():
+        db = get_async_database(lambda: config)
+        assert isinstance(db, AsyncMetricsNoSqlDb) and isinstance(db.backend, AsyncFilesystemDatabase)
+        assert db.backend.db is get_database(lambda: config).backend  # The same files and locks
+        REGISTRY.reset()
+        await db.insert_item("run", "a", {"n": 1})
+        assert (await db.get_item("run", "a"))["n"] == 1
+        assert REGISTRY.snapshot()[("filesystem", "run", "get_item")]["calls"] == 1
+        assert isinstance(get_async_database(lambda: dict(config, ttl_tables={"run": 60})), ThreadedAsyncNoSqlDb)
+        await reset_async_databases()
+        reset_databases()
+
+    asyncio.run(run())
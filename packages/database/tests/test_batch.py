@@ -0,0 +1,57 @@
+import pytest
+from database.batch import Write
+from database.changes import ChangeFeedNoSqlDb
+from database.filesystem_database import FilesystemDatabase
+from database.tinydb import TinyDBDatabase
+
+
+def test_writes_to_the_same_key_are_merged(tmp_path):
+    batch = FilesystemDatabase({"base_dir": str(tmp_path)}).batch()
+    batch.insert_item("run", "a", {"id": "a", "status": "new"})
+    batch.update_item("run", "a", {"status": "done"})
+    batch.update_item("run", "b", {"n": 1})
+    batch.update_item("run", "b", {"m": 2})
+    batch.insert_item("run", "c", {"id": "c"})
+    batch.delete_item("run", "c")
+    batch.update_item("run", "c", {"n": 1})
+    assert batch.writes == {"run": {
+        "a": Write("put", {"id": "a", "status": "done"}),
+        "b": Write("update", {"n": 1, "m": 2}),
+        "c": Write("delete", None),
+    }}
+
+
+@pytest.mark.parametrize("backend", [FilesystemDatabase, TinyDBDatabase])
+def test_batch_commits_on_exit(tmp_path, backend):
+    db = backend({"base_dir": str(tmp_path)})
+    db.insert_item("user", "u", {"id": "u", "login_count": 1})
+    db.insert_item("run", "old", {"id": "old"})
+    with db.batch() as batch:
+        batch.insert_item("run", "a", {"id": "a"})
+        batch.update_item("user", "u", {"login_count": 2})
+        batch.update_item("user", "u", {"token": "t"})
+        batch.update_item("user", "missing", {"token": "t"})
+        batch.delete_item("run", "old")
+        assert db.get_item("run", "a") == {}
+    assert db.get_item("user", "u") == {"id": "u", "login_count": 2, "token": "t"}
+    assert [item["id"] for item in db.get_all_items("run")] == ["a"]
+    assert db.get_item("user", "missing") == {}
+
+
+def test_batch_is_discarded_on_error(tmp_path):
+    db = TinyDBDatabase({"base_dir": str(tmp_path)})
+    with pytest.raises(ValueError):
+        with db.batch() as batch:
+            batch.insert_item("run", "a", {"id": "a"})
+            raise ValueError("step failed")
+    assert db.get_all_items("run") == []
+
+
+def test_wrappers_see_batched_writes(tmp_path):
+    db = ChangeFeedNoSqlDb(TinyDBDatabase({"base_dir": str(tmp_path), "tinydb_cache": True}))
+    assert db.search_by_key_part("run", "a") == []  # Builds the key index
+    with db.batch() as batch:
+        batch.insert_items("run", {"a1": {"id": "a1"}, "a2": {"id": "a2"}})
+    assert [item["id"] for item in db.search_by_key_part("run", "a")] == ["a1", "a2"]
+    assert [(event.op, event.key) for event in db.watch("run", since=0, timeout=0)] == [("insert", "a1"), ("insert", "a2")]
+    db.close()
@@ -0,0 +1,28 @@
+import importlib.util
+import logging
+import os
+
+_path = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "benchmark.py")
+_spec = importlib.util.spec_from_file_location("benchmark", _path)
+benchmark = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(benchmark)
+
+
+def test_run_case_reports_every_workload(monkeypatch):
+    monkeypatch.setattr(benchmark.sys, "stdout", benchmark.sys.stdout)  # run_case silences stdout and logging
+    try:
+        case = benchmark.run_case("filesystem", 30, 10, 1, {})
+    finally:
+        logging.disable(logging.NOTSET)
+    workloads = case["workloads"]
+    assert set(workloads) == {"insert", "insert_items", "get", "update", "search_by_key_part", "get_all"}
+    assert workloads["get"]["ops"] == 10
+    assert workloads["insert_items"]["items_per_sec"] > 0
+    assert workloads["get_all"]["items_per_sec"] > 0
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": [{"backend": "sqlite", "size": 10, "workloads": {"get": {"ops_per_sec": 100}, "update": {"ops_per_sec": 100}}}]}
+    current = [{"backend": "sqlite", "size": 10, "workloads": {"get": {"ops_per_sec": 70}, "update": {"ops_per_sec": 95}}}]
+    rows = {row["workload"]: row for row in benchmark.compare(current, baseline, 0.2)}
+    assert rows["get"]["regression"] and not rows["update"]["regression"]
@@ -0,0 +1,71 @@
+import time
+import pytest
+from database.cached_database import CachedNoSqlDb
+from database.factory import get_database, reset_databases
+from database.filesystem_database import FilesystemDatabase
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return FilesystemDatabase({"base_dir": str(tmp_path)})
+
+
+def test_repeated_reads_hit_the_cache(backend):
+    db = CachedNoSqlDb(backend, tables=["user"])
+    backend.insert_item("user", "a", {"name": "a"})
+    assert db.get_item("user", "a")["name"] == "a"
+    assert db.get_item("user", "a")["name"] == "a"
+    assert db.stats()["hits"] == 1 and db.stats()["misses"] == 1
+
+
+def test_returned_items_are_copies(backend):
+    db = CachedNoSqlDb(backend)
+    backend.insert_item("user", "a", {"name": "a", "password_hash": "x"})
+    db.get_item("user", "a").pop("password_hash")
+    assert db.get_item("user", "a")["password_hash"] == "x"
+
+
+def test_writes_invalidate(backend):
+    db = CachedNoSqlDb(backend)
+    db.insert_item("user", "a", {"name": "a"})
+    db.get_item("user", "a")
+    db.update_item("user", "a", {"name": "b"})
+    assert db.get_item("user", "a")["name"] == "b"
+    db.delete_item("user", "a")
+    assert db.get_item("user", "a") == {}
+
+
+def test_misses_are_cached(backend):
+    db = CachedNoSqlDb(backend, negative_ttl=60)
+    assert db.get_item("user", "a") == {}
+    backend.insert_item("user", "a", {"name": "a"})  # Not seen: written behind the cache's back
+    assert db.get_item("user", "a") == {}
+    db.insert_item("user", "a", {"name": "a"})
+    assert db.get_item("user", "a")["name"] == "a"
+
+
+def test_ttl_and_lru_bound_the_cache(backend):
+    db = CachedNoSqlDb(backend, ttl=0.05, max_items=2)
+    backend.insert_items("user", {key: {"v": 1} for key in "abc"})
+    db.get_items("user", ["a", "b", "c"])
+    assert db.stats()["size"] == 2 and db.stats()["evictions"] == 1
+
+    backend.update_item("user", "c", {"v": 2})
+    assert db.get_item("user", "c")["v"] == 1
+    time.sleep(0.06)
+    assert db.get_item("user", "c")["v"] == 2
+
+
+def test_uncached_tables_pass_through(backend):
+    db = CachedNoSqlDb(backend, tables=["user"])
+    db.get_item("run", "a")
+    db.get_item("run", "a")
+    assert db.stats() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
+
+
+def test_factory_wraps_configured_tables(tmp_path):
+    reset_databases()
+    db = get_database(lambda: {"database_type": "filesystem", "base_dir": str(tmp_path), "cache_tables": ["user"]})
+    assert isinstance(db, CachedNoSqlDb) and isinstance(db.backend, FilesystemDatabase)
+    assert db.base_dir == str(tmp_path)  # Backend attributes are forwarded
+    reset_databases()
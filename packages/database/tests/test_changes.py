@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import pytest
+from database.async_database import ThreadedAsyncNoSqlDb
+from database.changes import ChangeFeedNoSqlDb, ChangeLog
+from database.factory import get_database, reset_databases
+from database.filesystem_database import FilesystemDatabase
+
+
+@pytest.fixture
+def feed_db(tmp_path):
+    return ChangeFeedNoSqlDb(FilesystemDatabase({"base_dir": str(tmp_path)}))
+
+
+def test_watch_replays_writes_in_order(feed_db):
+    feed_db.insert_item("run", "a", {"id": "a", "status": "new"})
+    feed_db.update_item("run", "a", {"status": "done"})
+    feed_db.insert_item("user", "u", {"id": "u"})
+    feed_db.delete_items("run", ["a"])
+
+    events = list(feed_db.watch("run", since=0, timeout=0))
+    assert [(event.op, event.key) for event in events] == [("insert", "a"), ("update", "a"), ("delete", "a")]
+    assert events[1].item["status"] == "done"
+    assert list(feed_db.watch("run", since=events[1].seq, timeout=0)) == events[2:]
+
+
+def test_watch_waits_for_new_events(feed_db):
+    events = feed_db.watch("run", timeout=5)
+    writer = threading.Timer(0.05, feed_db.insert_item, ("run", "late", {"id": "late"}))
+    writer.start()
+    assert next(events).key == "late"
+    writer.join()
+
+
+def test_watch_starts_when_called(feed_db):
+    events = feed_db.watch("run", timeout=0)
+    feed_db.insert_item("run", "a", {"id": "a"})
+    assert [event.key for event in events] == ["a"]
+
+
+def test_log_drops_oldest_events():
+    log = ChangeLog(max_events=2)
+    for key in "abc":
+        log.append("run", "insert", key)
+    assert [event.key for event in log.read("run", 0, timeout=0)] == ["b", "c"]
+
+
+def test_async_watch(feed_db):
+    async def run():
+        db = ThreadedAsyncNoSqlDb(feed_db)
+        await db.insert_item("run", "a", {"id": "a"})
+        keys = [event.key async for event in db.watch("run", since=0, timeout=0)]
+        await db.close()
+        return keys
+
+    assert asyncio.run(run()) == ["a"]
+
+
+def test_async_watch_starts_when_called(feed_db):
+    async def run():
+        db = ThreadedAsyncNoSqlDb(feed_db)
+        events = db.watch("run", timeout=0)
+        await db.insert_item("run", "a", {"id": "a"})
+        keys = [event.key async for event in events]
+        await db.close()
+        return keys
+
+    assert asyncio.run(run()) == ["a"]
+
+
+def test_watch_needs_change_feed(tmp_path):
+    config = {"database_type": "filesystem", "base_dir": str(tmp_path)}
+    try:
+        with pytest.raises(NotImplementedError):
+            next(get_database(lambda: config).watch("run"))
+        db = get_database(lambda: {**config, "change_feed": True})
+        db.insert_item("run", "a", {"id": "a"})
+        assert [event.key for event in db.watch("run", since=0, timeout=0)] == ["a"]
+    finally:
+        reset_databases()
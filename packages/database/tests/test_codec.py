@@ -0,0 +1,53 @@
+import json
+import pytest
+from database.codec import MAGIC, Codec, decode, get_codec
+from database.filesystem_database import FilesystemDatabase
+
+DOCUMENT = {"id": "t1", "words": [{"word": "hello", "start": 0.5, "confidence": 0.99}] * 200, "meta": None}
+
+
+def test_json_without_compression_stays_plain_json():
+    data = Codec().encode(DOCUMENT)
+    assert json.loads(data) == DOCUMENT
+    assert decode(json.dumps(DOCUMENT).encode("utf-8")) == DOCUMENT
+
+
+def test_json_keeps_non_finite_floats():
+    # Written by the stdlib encoder whether or not orjson is installed
+    document = {"id": "n", "score": float("nan"), "values": [1.5, float("inf"), None]}
+    data = Codec().encode(document)
+    assert data == json.dumps(document).encode("utf-8")
+    decoded = decode(data)
+    assert decoded["score"] != decoded["score"] and decoded["values"] == [1.5, float("inf"), None]
+
+
+def test_msgpack_and_zstd_round_trip():
+    pytest.importorskip("msgpack")
+    pytest.importorskip("zstandard")
+    codec = Codec("msgpack", compression="zstd", compression_threshold=1024)
+    data = codec.encode(DOCUMENT)
+    assert data.startswith(MAGIC)
+    assert len(data) < len(json.dumps(DOCUMENT)) / 10
+    assert decode(data) == DOCUMENT
+    small = codec.encode({"id": "s"})
+    assert small[len(MAGIC) + 1] == 0  # Below the threshold: not compressed
+    assert decode(small) == {"id": "s"}
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        get_codec({"codec": "pickle"})
+
+
+def test_filesystem_reads_documents_of_every_codec(tmp_path):
+    pytest.importorskip("zstandard")
+    legacy = FilesystemDatabase({"base_dir": str(tmp_path)})
+    legacy.insert_item("output", "a", {"id": "a", "n": 1})
+    db = FilesystemDatabase({"base_dir": str(tmp_path), "compression": "zstd", "compression_threshold": 0})
+    db.insert_item("output", "b", {"id": "b", "n": 2})
+    db.update_item("output", "a", {"n": 3})
+
+    with open(tmp_path / "output" / "b.json", "rb") as f:
+        assert f.read().startswith(MAGIC)
+    assert [item["n"] for item in legacy.get_all_items("output")] == [3, 2]
+    assert db.query("output", {"n": {"gt": 2}})["items"] == [{"id": "a", "n": 3}]
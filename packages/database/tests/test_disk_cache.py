@@ -0,0 +1,44 @@
+import os
+from database.blob import MmapBlobReader
+from database.disk_cache import DiskCache
+
+
+def entry_paths(directory):
+    return [entry.path for shard in os.scandir(directory) if shard.is_dir() for entry in os.scandir(shard.path)]
+
+
+def test_store_read_and_open(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    assert cache.read("bucket", "input/a") is None
+    cache.store("bucket", "input/a", '"etag-1"', b"hello world", 11)
+    assert cache.read("bucket", "input/a") == ('"etag-1"', b"hello world")
+    f, entry = cache.open("bucket", "input/a")
+    with f:
+        reader = MmapBlobReader(f, entry.offset + 6)
+    assert reader.read() == b"world"
+    reader.close()
+    cache.discard("bucket", "input/a")
+    assert cache.read("bucket", "input/a") is None
+
+
+def test_truncated_entries_are_dropped(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    cache.store("bucket", "a", '"e"', b"0123456789", 10)
+    [path] = entry_paths(tmp_path)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 1)
+    assert cache.read("bucket", "a") is None
+    assert entry_paths(tmp_path) == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=250)
+    cache.store("bucket", "a", '"e"', b"a" * 100, 100)
+    cache.store("bucket", "b", '"e"', b"b" * 100, 100)
+    a_path = cache._path("bucket", "a")
+    os.utime(cache._path("bucket", "b"), (1, 1))
+    os.utime(a_path, (2, 2))
+    assert cache.store("bucket", "c", '"e"', b"c" * 100, 100)
+    assert cache.read("bucket", "b") is None
+    assert cache.read("bucket", "a") is not None
+    assert not cache.store("bucket", "huge", '"e"', b"x" * 300, 300)
@@ -0,0 +1,142 @@
+import boto3
+import pytest
+from database.dynamodb_database import DynamoDBDatabase
+
+
+def _create_table(name, indexes=()):
+    kwargs = {}
+    if indexes:
+        kwargs["GlobalSecondaryIndexes"] = [
+            {"IndexName": f"{field}-index", "KeySchema": [{"AttributeName": field, "KeyType": "HASH"}], "Projection": {"ProjectionType": "ALL"}}
+            for field in indexes
+        ]
+    boto3.client("dynamodb").create_table(
+        TableName=name,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": field, "AttributeType": "S"} for field in ("id", *indexes)],
+        BillingMode="PAY_PER_REQUEST",
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def dynamo_db(aws):
+    _create_table("run", indexes=["user_id"])
+    _create_table("report")  # user_id is declared below but the table has no GSI for it
+    return DynamoDBDatabase({"region_name": "us-east-1", "indexes": {"run": ["user_id"], "report": ["user_id"]}})
+
+
+def _record_calls(db, name, monkeypatch):
+    client = db.dynamodb.meta.client
+    calls = []
+    method = getattr(client, name)
+    monkeypatch.setattr(client, name, lambda **kwargs: calls.append(kwargs) or method(**kwargs))
+    return calls
+
+
+def test_item_operations_go_through_the_client(dynamo_db):
+    dynamo_db.dynamodb.Table = None  # The resource is not thread safe
+    dynamo_db.insert_item("run", "a", {"n": 1})
+    dynamo_db.insert_items("run", {"b": {"n": 2}, "c": {"n": 3}})
+    assert dynamo_db.update_item("run", "a", {"n": 10}) == {"id": "a", "n": 10}
+    assert dynamo_db.update_item("run", "missing", {"n": 0}) == {}
+    dynamo_db.delete_item("run", "b")
+    dynamo_db.delete_items("run", ["c"])
+    assert dynamo_db.get_item("run", "a") == {"id": "a", "n": 10}
+    assert dynamo_db.get_items("run", ["a", "b", "c"]) == [{"id": "a", "n": 10}]
+    assert dynamo_db.exists("run", "a") and not dynamo_db.exists("run", "b")
+
+
+def test_scan_range_is_one_key_only_scan(dynamo_db, monkeypatch):
+    dynamo_db.insert_items("run", {f"k{i:03}": {"n": i} for i in range(50)})
+    scans = _record_calls(dynamo_db, "scan", monkeypatch)
+    items = dynamo_db.scan_range("run", "k010", "k020", limit=5)
+    assert [item["id"] for item in items] == ["k010", "k011", "k012", "k013", "k014"]
+    assert len(scans) == 1 and scans[0]["ProjectionExpression"] == "#id"
+
+
+def test_list_keys_filters_on_the_cursor(dynamo_db, monkeypatch):
+    dynamo_db.insert_items("run", {key: {} for key in ["a/1", "a/2", "b", "c/1", "d", "e"]})
+    scans = _record_calls(dynamo_db, "scan", monkeypatch)
+    first = dynamo_db.list_keys("run", limit=2)
+    assert first["keys"] == ["a/1", "a/2"]
+    second = dynamo_db.list_keys("run", limit=3, cursor=first["cursor"])
+    assert second["keys"] == ["b", "c/1", "d"]
+    assert scans[-1]["ExpressionAttributeValues"] == {":cursor": "a/2"}
+    assert dynamo_db.list_keys("run", limit=3, cursor=second["cursor"]) == {"keys": ["e"], "prefixes": [], "cursor": None}
+    page = dynamo_db.list_keys("run", delimiter="/", limit=2, cursor="a/2")
+    assert (page["keys"], page["prefixes"]) == (["b"], ["c/"])
+
+
+def test_scan_follows_pages_past_one_megabyte(dynamo_db, monkeypatch):
+    dynamo_db.insert_items("run", {f"k{i:02}": {"blob": "x" * 100_000} for i in range(25)})
+    scans = _record_calls(dynamo_db, "scan", monkeypatch)
+    assert sorted(item["id"] for item in dynamo_db.get_all_items("run")) == [f"k{i:02}" for i in range(25)]
+    assert len(scans) > 1
+    assert "ExclusiveStartKey" in scans[-1]
+
+
+def test_segmented_scan_yields_every_item_once(dynamo_db, monkeypatch):
+    dynamo_db.insert_items("run", {f"k{i:03}": {"n": i} for i in range(200)})
+    scans = _record_calls(dynamo_db, "scan", monkeypatch)
+    items = list(dynamo_db.scan_items("run", segments=4, Limit=25))
+    assert sorted(item["n"] for item in items) == list(range(200))
+    assert {scan["Segment"] for scan in scans} == {0, 1, 2, 3}
+    assert {scan["TotalSegments"] for scan in scans} == {4}
+
+
+def _page_through(db, table, filters, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page = db.query(table, filters, cursor=cursor, **kwargs)
+        pages.append(page["items"])
+        cursor = page["cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_query_pages_with_a_filter_expression_and_cursor(dynamo_db, monkeypatch):
+    dynamo_db.insert_items("report", {f"r{i:02}": {"status": "done" if i % 3 else "new", "n": i} for i in range(30)})
+    scans = _record_calls(dynamo_db, "scan", monkeypatch)
+    pages = _page_through(dynamo_db, "report", {"status": "done", "n": {"gte": 10}}, fields=["n"], limit=4)
+    assert all(len(page) <= 4 for page in pages)
+    assert sorted(item["n"] for page in pages for item in page) == [i for i in range(10, 30) if i % 3]
+    assert all(set(item) == {"id", "n"} for page in pages for item in page)
+    assert all("FilterExpression" in scan for scan in scans)
+    assert all("ExclusiveStartKey" in scan for scan in scans[1:])
+
+
+def test_indexed_query_pages_through_the_index(dynamo_db, monkeypatch):
+    dynamo_db.insert_items("run", {f"r{i:02}": {"user_id": f"u{i % 2}", "n": i} for i in range(20)})
+    queries = _record_calls(dynamo_db, "query", monkeypatch)
+    pages = _page_through(dynamo_db, "run", {"user_id": "u1", "n": {"lt": 15}}, limit=3)
+    assert sorted(item["n"] for page in pages for item in page) == [1, 3, 5, 7, 9, 11, 13]
+    assert queries and all(query["IndexName"] == "user_id-index" for query in queries)
+
+
+def test_query_scans_when_the_declared_index_is_missing(dynamo_db):
+    dynamo_db.insert_items("report", {f"r{i}": {"user_id": f"u{i % 2}"} for i in range(6)})
+    assert sorted(item["id"] for item in dynamo_db.query("report", {"user_id": "u0"})["items"]) == ["r0", "r2", "r4"]
+    assert sorted(item["id"] for item in dynamo_db.query_by_index("report", "user_id", "u1")) == ["r1", "r3", "r5"]
+
+
+def test_write_batch_is_one_transaction(dynamo_db, monkeypatch):
+    dynamo_db.insert_items("run", {"a": {"n": 1}, "b": {"n": 2}})
+    transactions = _record_calls(dynamo_db, "transact_write_items", monkeypatch)
+    with dynamo_db.batch() as batch:
+        batch.insert_item("run", "c", {"n": 3})
+        batch.update_item("run", "a", {"n": 10})
+        batch.delete_item("run", "b")
+    assert len(transactions) == 1 and len(transactions[0]["TransactItems"]) == 3
+    assert sorted((item["id"], item["n"]) for item in dynamo_db.get_all_items("run")) == [("a", 10), ("c", 3)]
+
+
+def test_write_batch_falls_back_when_an_update_misses(dynamo_db, monkeypatch):
+    dynamo_db.insert_items("run", {"a": {"n": 1}})
+    transactions = _record_calls(dynamo_db, "transact_write_items", monkeypatch)
+    with dynamo_db.batch() as batch:
+        batch.insert_item("run", "c", {"n": 3})
+        batch.update_item("run", "a", {"n": 10})
+        batch.update_item("run", "missing", {"n": 0})
+    assert len(transactions) == 1  # Cancelled by the missing item, then written without a transaction
+    assert sorted((item["id"], item["n"]) for item in dynamo_db.get_all_items("run")) == [("a", 10), ("c", 3)]
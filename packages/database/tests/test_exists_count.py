@@ -0,0 +1,58 @@
+import time
+import pytest
+from database.cached_database import CachedNoSqlDb
+from database.filesystem_database import FilesystemDatabase
+from database.log_database import LogDatabase
+from database.metrics import DbMetrics, MetricsNoSqlDb
+from database.sqlite_database import SqliteDatabase
+from database.tinydb import TinyDBDatabase
+from database.ttl import TtlNoSqlDb
+
+
+@pytest.fixture(params=[
+    FilesystemDatabase,
+    TinyDBDatabase,
+    lambda config: TinyDBDatabase({**config, "tinydb_cache": True}),
+    lambda config: SqliteDatabase({"sqlite_path": f"{config['base_dir']}/database.db"}),
+    LogDatabase,
+], ids=["filesystem", "tinydb", "tinydb-cache", "sqlite", "logdb"])
+def db(request, tmp_path):
+    db = request.param({"base_dir": str(tmp_path)})
+    yield db
+    db.close()
+
+
+def test_exists_and_count(db):
+    assert db.count("run") == 0
+    db.insert_items("run", {key: {"id": key} for key in ["a1", "a2", "b1"]})
+    db.insert_item("run", "a3", {"id": "a3"})
+    db.delete_item("run", "a2")
+
+    assert db.exists("run", "a1")
+    assert not db.exists("run", "a2")
+    assert not db.exists("user", "a1")
+    assert db.count("run") == 3
+    assert db.count("run", prefix="a") == 2
+    assert db.count("run", prefix="c") == 0
+
+
+def test_exists_does_not_read_items(tmp_path):
+    backend = FilesystemDatabase({"base_dir": str(tmp_path)})
+    backend.insert_item("run", "a", {"id": "a"})
+    backend.get_item = backend.iter_items = None  # Any read of an item body would fail
+    assert backend.exists("run", "a")
+    assert backend.count("run") == 1
+
+
+def test_wrappers_forward_exists_and_count(tmp_path):
+    registry = DbMetrics()
+    backend = TtlNoSqlDb(FilesystemDatabase({"base_dir": str(tmp_path)}), {"run": 60}, sweep_interval=0)
+    db = MetricsNoSqlDb(CachedNoSqlDb(backend), "filesystem", registry)
+    db.insert_item("run", "live", {"id": "live"})
+    db.insert_item("run", "old", {"id": "old", "expires_at": time.time() - 1})
+
+    assert db.exists("run", "live")
+    assert not db.exists("run", "old")
+    assert db.count("run") == 2  # Expired items are counted until swept
+    assert registry.snapshot()[("filesystem", "run", "exists")]["calls"] == 2
+    db.close()
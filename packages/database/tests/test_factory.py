@@ -0,0 +1,35 @@
+import pytest
+from database.factory import get_database, close_database, reset_databases
+from database.filesystem_database import FilesystemDatabase
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    reset_databases()
+    yield
+    reset_databases()
+
+
+def test_same_config_returns_same_instance(tmp_path):
+    config = {"database_type": "filesystem", "base_dir": str(tmp_path)}
+    db1 = get_database(lambda: config)
+    db2 = get_database(lambda: dict(config))
+    assert isinstance(db1, FilesystemDatabase)
+    assert db1 is db2
+
+
+def test_different_config_returns_different_instance(tmp_path):
+    db1 = get_database(lambda: {"database_type": "filesystem", "base_dir": str(tmp_path / "a")})
+    db2 = get_database(lambda: {"database_type": "filesystem", "base_dir": str(tmp_path / "b")})
+    assert db1 is not db2
+
+
+def test_close_database_forgets_instance(tmp_path):
+    config = {"database_type": "filesystem", "base_dir": str(tmp_path)}
+    db1 = get_database(lambda: config)
+    close_database(lambda: config)
+    assert get_database(lambda: config) is not db1
+
+
+def test_none_database_type():
+    assert get_database(lambda: {"database_type": "none"}) is None
@@ -0,0 +1,188 @@
+import threading
+import pytest
+from database.tinydb import TinyDBDatabase
+from database.filesystem_database import FilesystemDatabase
+from database.log_database import LogDatabase
+from database.sqlite_database import SqliteDatabase
+
+
+INDEXES = {"run": ["user_id"]}
+
+
+@pytest.fixture(params=["tinydb", "tinydb_cached", "filesystem", "filesystem_indexed", "logdb", "sqlite"])
+def db(request, tmp_path):
+    if request.param == "tinydb":
+        database = TinyDBDatabase({"base_dir": str(tmp_path), "indexes": INDEXES})
+    elif request.param == "tinydb_cached":
+        database = TinyDBDatabase({"base_dir": str(tmp_path), "indexes": INDEXES, "tinydb_cache": True, "tinydb_flush_interval": 0})
+    elif request.param == "logdb":
+        database = LogDatabase({"base_dir": str(tmp_path), "indexes": INDEXES, "logdb_compact_interval": 0})
+    elif request.param == "sqlite":
+        database = SqliteDatabase({"sqlite_path": str(tmp_path / "database.db"), "indexes": INDEXES})
+    elif request.param == "filesystem_indexed":
+        database = FilesystemDatabase({"base_dir": str(tmp_path), "indexes": INDEXES, "filesystem_key_index": True})
+    else:
+        database = FilesystemDatabase({"base_dir": str(tmp_path), "indexes": INDEXES})
+    yield database
+    database.close()
+
+
+def test_update_item_returns_merged_item(db):
+    db.insert_item("user", "a", {"name": "old", "roles": ["admin"]})
+    updated = db.update_item("user", "a", {"name": "new"})
+    assert updated == {"id": "a", "name": "new", "roles": ["admin"]}
+    assert db.get_item("user", "a") == updated
+
+
+def test_update_missing_item_returns_empty(db):
+    assert db.update_item("user", "missing", {"name": "new"}) == {}
+    assert db.get_item("user", "missing") == {}
+
+
+def test_bulk_insert_get_delete(db):
+    created = db.insert_items("user", {f"u{i}": {"n": i} for i in range(5)})
+    assert len(created) == 5
+
+    items = db.get_items("user", ["u3", "missing", "u1"])
+    assert [item["id"] for item in items] == ["u3", "u1"]
+
+    db.delete_items("user", ["u1", "u3", "missing"])
+    assert db.get_items("user", ["u1", "u2", "u3"]) == [db.get_item("user", "u2")]
+
+
+def test_iter_items_streams_every_item(db):
+    db.insert_items("user", {f"u{i}": {"n": i} for i in range(7)})
+    items = db.iter_items("user", page_size=3)
+    assert sorted(item["id"] for item in items) == [f"u{i}" for i in range(7)]
+
+
+def test_list_keys_with_prefix_and_delimiter(db):
+    db.insert_items("file", {key: {} for key in ["a/1", "a/2", "a/b/3", "b/1", "top"]})
+    page = db.list_keys("file", delimiter="/")
+    assert page == {"keys": ["top"], "prefixes": ["a/", "b/"], "cursor": None}
+
+    page = db.list_keys("file", prefix="a/", delimiter="/")
+    assert page == {"keys": ["a/1", "a/2"], "prefixes": ["a/b/"], "cursor": None}
+
+
+def test_list_keys_pages_with_cursor(db):
+    db.insert_items("file", {f"k{i}": {} for i in range(5)})
+    first = db.list_keys("file", limit=2)
+    assert first["keys"] == ["k0", "k1"]
+    second = db.list_keys("file", limit=2, cursor=first["cursor"])
+    assert second["keys"] == ["k2", "k3"]
+    last = db.list_keys("file", limit=2, cursor=second["cursor"])
+    assert last == {"keys": ["k4"], "prefixes": [], "cursor": None}
+
+
+def test_list_keys_pages_with_cursor_and_delimiter(db):
+    db.insert_items("file", {key: {} for key in ["a/1", "a/2", "b/1", "c", "d/1", "e"]})
+    first = db.list_keys("file", delimiter="/", limit=2)
+    assert (first["keys"], first["prefixes"]) == ([], ["a/", "b/"])
+    second = db.list_keys("file", delimiter="/", limit=2, cursor=first["cursor"])
+    assert (second["keys"], second["prefixes"]) == (["c"], ["d/"])
+    assert db.list_keys("file", delimiter="/", limit=2, cursor=second["cursor"]) == {"keys": ["e"], "prefixes": [], "cursor": None}
+
+
+def test_search_by_key_part_on_hierarchical_keys(db):
+    db.insert_items("file", {key: {} for key in ["a/1", "a/2", "ab", "b/1"]})
+    db.delete_item("file", "a/2")
+    assert [item["id"] for item in db.search_by_key_part("file", "a/")] == ["a/1"]
+    assert sorted(item["id"] for item in db.search_by_key_part("file", r"/1$", regex=True)) == ["a/1", "b/1"]
+
+
+def test_scan_range_follows_writes(db):
+    db.insert_items("assessment", {f"u1/p{i}/a{j}": {"n": i * 10 + j} for i in range(3) for j in range(2)})
+    assert db.scan_range("assessment", limit=1)[0]["id"] == "u1/p0/a0"
+    db.insert_item("assessment", "u1/p1/a5", {"n": 15})
+    db.delete_item("assessment", "u1/p1/a0")
+
+    scanned = db.scan_range("assessment", "u1/p1/", "u1/p2/")
+    assert [item["id"] for item in scanned] == ["u1/p1/a1", "u1/p1/a5"]
+    assert [item["id"] for item in db.scan_range("assessment", start_key="u1/p1/a1", limit=2)] == ["u1/p1/a1", "u1/p1/a5"]
+    assert [item["id"] for item in db.scan_range("assessment", end_key="u1/p0/a1")] == ["u1/p0/a0"]
+    assert [item["id"] for item in db.search_by_key_part("assessment", "u1/p1/")] == ["u1/p1/a1", "u1/p1/a5"]
+    assert db.scan_range("assessment", "u2/") == []
+
+
+def test_query_by_index_follows_writes(db):
+    db.insert_items("run", {"r1": {"user_id": "ann"}, "r2": {"user_id": "bob"}, "r3": {"user_id": "ann"}})
+    assert [item["id"] for item in db.query_by_index("run", "user_id", "ann")] == ["r1", "r3"]
+
+    db.update_item("run", "r1", {"user_id": "bob"})
+    db.delete_item("run", "r3")
+    db.insert_item("run", "r4", {"user_id": "ann"})
+    assert [item["id"] for item in db.query_by_index("run", "user_id", "ann")] == ["r4"]
+    assert [item["id"] for item in db.query_by_index("run", "user_id", "bob")] == ["r1", "r2"]
+
+
+def test_query_by_index_backfills_existing_items(db):
+    db.insert_items("report", {"a": {"user_id": "ann"}, "b": {"user_id": "bob"}})
+    db.close()
+    reopened = type(db)({**db.config, "indexes": {"report": ["user_id"]}})
+    assert [item["id"] for item in reopened.query_by_index("report", "user_id", "bob")] == ["b"]
+    reopened.close()
+
+
+def test_query_by_unindexed_field_scans(db):
+    db.insert_items("run", {"r1": {"product": "x"}, "r2": {"product": "y"}})
+    assert [item["id"] for item in db.query_by_index("run", "product", "y")] == ["r2"]
+
+
+def test_query_filters_projects_and_pages(db):
+    db.insert_items("run", {f"r{i}": {"user_id": "ann" if i % 2 else "bob", "status": "done", "started": i} for i in range(8)})
+    db.update_item("run", "r3", {"status": "failed"})
+
+    pages, cursor = [], None
+    while True:
+        page = db.query("run", {"status": "done", "started": {"gte": 2}}, fields=["started"], limit=2, cursor=cursor)
+        pages.append(page["items"])
+        cursor = page["cursor"]
+        if not cursor:
+            break
+    items = [item for page in pages for item in page]
+    assert items == [{"id": f"r{i}", "started": i} for i in (2, 4, 5, 6, 7)]
+    assert all(len(page) <= 2 for page in pages)
+
+
+def test_query_uses_index_and_prefix(db):
+    db.insert_items("run", {"a/1": {"user_id": "ann"}, "a/2": {"user_id": "bob"}, "b/1": {"user_id": "ann"}})
+    assert [item["id"] for item in db.query("run", {"user_id": "ann"})["items"]] == ["a/1", "b/1"]
+    assert [item["id"] for item in db.query("run", {"id": {"prefix": "a/"}, "user_id": {"in": ["ann", "bob"]}})["items"]] == ["a/1", "a/2"]
+
+
+def test_filesystem_blob_stream_round_trip(tmp_path):
+    import io
+    db = FilesystemDatabase({"base_dir": str(tmp_path)})
+    data = bytes(range(256)) * 1000
+    db.put_blob_stream("input", "u/p/a/audio.webm", io.BytesIO(data))
+    assert db.get_binary_item("input", "u/p/a/audio.webm") == data
+
+    with db.open_blob_reader("input", "u/p/a/audio.webm") as reader:
+        assert reader.read() == data
+    with db.open_blob_reader("input", "u/p/a/audio.webm", 1000, 1010) as reader:
+        assert reader.read(4) == data[1000:1004]
+        assert reader.read() == data[1004:1010]
+        reader.seek(0)
+        assert bytes(reader.read()) == data[1000:1010]
+
+    assert db.open_blob_reader("input", "missing") is None
+    assert db.get_blob_url("input", "u/p/a/audio.webm") is None
+
+
+@pytest.mark.parametrize("delete", [
+    lambda db: db.delete_item("user", "a"),
+    lambda db: db.delete_items("user", ["a", "missing"]),
+])
+def test_filesystem_deletes_wait_for_the_key_lock(tmp_path, delete):
+    db = FilesystemDatabase({"base_dir": str(tmp_path), "filesystem_key_index": True})
+    db.insert_item("user", "a", {"name": "a"})
+    assert db.count("user") == 1
+
+    with db._lock(db._get_file_path("user", "a")):  # Held by update_item during its read-modify-write
+        deleter = threading.Thread(target=delete, args=(db,))
+        deleter.start()
+        deleter.join(0.1)
+        assert deleter.is_alive() and db.exists("user", "a")
+    deleter.join()
+    assert not db.exists("user", "a") and db.count("user") == 0
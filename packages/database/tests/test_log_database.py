@@ -0,0 +1,109 @@
+import os
+import threading
+from database.log_database import LogDatabase, _encode
+
+
+def open_db(tmp_path, **config):
+    return LogDatabase({"base_dir": str(tmp_path), "logdb_compact_interval": 0, **config})
+
+
+def segments(tmp_path, table):
+    return sorted(name for name in os.listdir(tmp_path / table) if name.endswith(".log"))
+
+
+def test_index_is_rebuilt_from_segments(tmp_path):
+    db = open_db(tmp_path)
+    db.insert_items("run", {f"r{i}": {"n": i} for i in range(5)})
+    db.update_item("run", "r1", {"n": 10})
+    db.delete_item("run", "r2")
+    db.close()
+
+    reopened = open_db(tmp_path)
+    assert [item["n"] for item in reopened.get_all_items("run")] == [0, 10, 3, 4]
+    assert reopened.get_item("run", "r2") == {}
+    reopened.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    db = open_db(tmp_path)
+    db.insert_item("run", "a", {"n": 1})
+    db.close()
+    with open(tmp_path / "run" / segments(tmp_path, "run")[-1], "ab") as f:
+        f.write(b'0000abcd {"op":"put","key":"b","it')
+
+    reopened = open_db(tmp_path)
+    assert reopened.get_item("run", "b") == {}
+    reopened.insert_item("run", "c", {"n": 3})
+    reopened.close()
+    assert [item["id"] for item in open_db(tmp_path).get_all_items("run")] == ["a", "c"]
+
+
+def test_segments_roll_and_compact(tmp_path):
+    db = open_db(tmp_path, logdb_segment_size=200)
+    for i in range(20):
+        db.insert_item("run", f"r{i % 4}", {"n": i})
+    db.delete_item("run", "r3")
+    assert len(segments(tmp_path, "run")) > 2
+
+    assert db.compact("run")
+    assert len(segments(tmp_path, "run")) == 2
+    db.insert_item("run", "r4", {"n": 20})
+    expected = {"r0": 16, "r1": 17, "r2": 18, "r4": 20}
+    assert {item["id"]: item["n"] for item in db.get_all_items("run")} == expected
+    db.close()
+
+    reopened = open_db(tmp_path)
+    assert {item["id"]: item["n"] for item in reopened.get_all_items("run")} == expected
+    reopened.close()
+
+
+def test_compaction_threshold(tmp_path):
+    db = open_db(tmp_path, logdb_compact_min_bytes=0, logdb_compact_ratio=0.5)
+    db.insert_items("run", {"a": {"n": 1}, "b": {"n": 2}})
+    assert not db.compact("run", force=False)
+    for i in range(5):
+        db.update_item("run", "a", {"n": i})
+    assert db.compact("run", force=False)
+    db.close()
+
+
+def test_interrupted_compaction_is_completed_on_open(tmp_path):
+    db = open_db(tmp_path, logdb_segment_size=1)
+    db.insert_item("run", "a", {"n": 1})
+    db.insert_item("run", "b", {"n": 2})
+    db.delete_item("run", "a")
+    db.compact("run")
+    db.close()
+    # Simulate a crash after the rename: an older segment still holding "a" was not removed yet
+    with open(tmp_path / "run" / "00000001.log", "wb") as f:
+        f.write(_encode({"op": "put", "key": "a", "item": {"id": "a", "n": 1}}))
+
+    reopened = open_db(tmp_path)
+    assert reopened.get_item("run", "a") == {}
+    assert "00000001.log" not in segments(tmp_path, "run")
+    reopened.close()
+
+
+def test_writes_during_compaction_are_kept(tmp_path):
+    db = open_db(tmp_path, logdb_segment_size=512)
+    db.insert_items("run", {f"r{i}": {"n": 0} for i in range(50)})
+
+    def write():
+        for n in range(1, 30):
+            for i in range(0, 50, 5):
+                db.update_item("run", f"r{i}", {"n": n})
+        db.delete_items("run", ["r1", "r2"])
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive():
+        db.compact("run")
+    writer.join()
+    db.compact("run")
+
+    expected = {f"r{i}": 29 if i % 5 == 0 else 0 for i in range(50) if i not in (1, 2)}
+    assert {item["id"]: item["n"] for item in db.get_all_items("run")} == expected
+    db.close()
+    reopened = open_db(tmp_path)
+    assert {item["id"]: item["n"] for item in reopened.get_all_items("run")} == expected
+    reopened.close()
@@ -0,0 +1,61 @@
+import io
+import pytest
+from database.factory import get_database, reset_databases
+from database.filesystem_database import FilesystemDatabase
+from database.metrics import DbMetrics, MetricsNoSqlDb
+
+
+@pytest.fixture
+def metrics_db(tmp_path):
+    registry = DbMetrics()
+    db = MetricsNoSqlDb(FilesystemDatabase({"base_dir": str(tmp_path)}), name="filesystem",
+                        registry=registry, measure_bytes=True)
+    return db, registry
+
+
+def test_calls_items_and_bytes_are_recorded(metrics_db):
+    db, registry = metrics_db
+    db.insert_items("run", {"a": {"id": "a"}, "b": {"id": "b"}})
+    db.get_item("run", "a")
+    db.get_item("run", "missing")
+    assert len(list(db.iter_items("run"))) == 2
+    db.put_blob_stream("blob", "x", io.BytesIO(b"12345"))
+
+    snapshot = registry.snapshot()
+    get = snapshot[("filesystem", "run", "get_item")]
+    assert get["calls"] == 2 and get["items"] == 1 and get["bytes_read"] > 0
+    assert sum(get["buckets"]) == 2
+    assert snapshot[("filesystem", "run", "insert_items")]["items"] == 2
+    assert snapshot[("filesystem", "run", "iter_items")]["items"] == 2
+    assert snapshot[("filesystem", "blob", "put_blob_stream")]["bytes_written"] == 5
+
+
+def test_errors_are_counted_and_reraised(metrics_db, monkeypatch):
+    db, registry = metrics_db
+
+    def fail(table, key):
+        raise IOError("disk gone")
+
+    monkeypatch.setattr(db.backend, "get_item", fail)
+    with pytest.raises(IOError):
+        db.get_item("run", "a")
+    assert registry.snapshot()[("filesystem", "run", "get_item")]["errors"] == 1
+
+
+def test_render_prometheus_text(metrics_db):
+    db, registry = metrics_db
+    db.insert_item("run", "a", {"id": "a"})
+    text = registry.render()
+    assert 'nosqldb_calls_total{backend="filesystem",table="run",operation="insert_item"} 1' in text
+    assert 'nosqldb_latency_seconds_bucket{backend="filesystem",table="run",operation="insert_item",le="+Inf"} 1' in text
+    assert "# TYPE nosqldb_latency_seconds histogram" in text
+
+
+def test_factory_wraps_when_enabled(tmp_path):
+    config = {"database_type": "filesystem", "base_dir": str(tmp_path), "metrics_enabled": True}
+    try:
+        db = get_database(lambda: config)
+        assert isinstance(db, MetricsNoSqlDb)
+        assert db.name == "filesystem"
+    finally:
+        reset_databases()
@@ -0,0 +1,31 @@
+import pytest
+from database.query import matches, normalize_filters, parse_filters, project
+
+
+def test_parse_filters():
+    filters = parse_filters(["status:eq:done", "started:gte:1700000000", "started:lt:1.5", "user_id:in:a,b", "code:eq:\"123\""])
+    assert filters == {
+        "status": {"eq": "done"},
+        "started": {"gte": 1700000000, "lt": 1.5},
+        "user_id": {"in": ["a", "b"]},
+        "code": {"eq": "123"},
+    }
+
+
+@pytest.mark.parametrize("expression", ["status", "status:done", "status:like:done"])
+def test_parse_filters_rejects_malformed(expression):
+    with pytest.raises(ValueError):
+        parse_filters([expression])
+
+
+def test_matches_predicates():
+    predicates = normalize_filters({"status": "done", "started": {"gte": 2, "lt": 5}, "id": {"prefix": "r"}})
+    assert matches({"id": "r1", "status": "done", "started": 3}, predicates)
+    assert not matches({"id": "r1", "status": "done", "started": 5}, predicates)
+    assert not matches({"id": "r1", "status": "done", "started": "3"}, predicates)
+    assert not matches({"id": "x1", "status": "done"}, predicates)
+
+
+def test_project_keeps_id():
+    assert project({"id": "a", "status": "done", "body": "..."}, ["status"]) == {"id": "a", "status": "done"}
+    assert project({"id": "a"}, None) == {"id": "a"}
@@ -0,0 +1,129 @@
+import threading
+import time
+import boto3
+import pytest
+from database.s3_database import S3Database
+from database.ttl import TtlNoSqlDb
+
+
+@pytest.fixture
+def s3_db(aws):
+    boto3.client("s3").create_bucket(Bucket="bucket1")
+    return S3Database({"bucket_name": "bucket1", "region_name": "us-east-1", "indexes": {"run": ["user_id"]}})
+
+
+def test_indexed_query_pages_by_object_key(s3_db):
+    s3_db.insert_items("run", {f"r{i}": {"user_id": f"u{i % 2}", "n": i} for i in range(8)})
+    first = s3_db.query("run", {"user_id": "u0"}, limit=2)
+    assert [item["id"] for item in first["items"]] == ["r0", "r2"]
+    second = s3_db.query("run", {"user_id": "u0"}, limit=2, cursor=first["cursor"])
+    assert [item["id"] for item in second["items"]] == ["r4", "r6"]
+    assert s3_db.query("run", {"user_id": "u0"}, fields=["n"], cursor=second["cursor"]) == {"items": [], "cursor": None}
+
+
+
+def test_id_filters_match_the_object_key(s3_db):
+    s3_db.insert_items("run", {"a1": {"n": 1}, "a2": {"n": 2}, "b1": {"n": 3}})
+    assert s3_db.query("run", {"id": {"prefix": "a"}, "n": {"gt": 1}}) == {"items": [{"id": "a2", "n": 2}], "cursor": None}
+
+
+def test_ttl_sweep_deletes_items_without_id(s3_db):
+    db = TtlNoSqlDb(s3_db, {"run": 60}, sweep_interval=0)
+    s3_db.insert_items("run", {"old": {"expires_at": 1}, "live": {"n": 1}})
+    assert db.sweep() == 1
+    assert s3_db.list_keys("run")["keys"] == ["live"]
+
+
+def test_scan_range_lists_from_the_start_key(s3_db):
+    s3_db.insert_items("run", {key: {"n": i} for i, key in enumerate(["a/1", "a/2", "a/3", "b/1", "b/2"])})
+    assert s3_db.scan_range("run", "a/2", "b/2") == [{"n": 1}, {"n": 2}, {"n": 3}]
+    assert s3_db.scan_range("run", "a/3", limit=2) == [{"n": 2}, {"n": 3}]
+    assert s3_db.scan_range("run", end_key="a/2") == [{"n": 0}]
+    assert s3_db.scan_range("run", "c") == []
+
+
+def test_write_batch_updates_through_the_client(s3_db):
+    s3_db.insert_items("run", {f"r{i}": {"n": i} for i in range(4)})
+    s3_db.s3.Object = s3_db.s3.Bucket = None  # The resource is not thread safe
+    with s3_db.batch() as batch:
+        for i in range(4):
+            batch.update_item("run", f"r{i}", {"done": True})
+        batch.update_item("run", "missing", {"done": True})
+    assert s3_db.get_items("run", [f"r{i}" for i in range(4)]) == [{"n": i, "done": True} for i in range(4)]
+    assert not s3_db.exists("run", "missing")
+
+
+def test_close_keeps_the_shared_client_open(s3_db):
+    s3_db.insert_item("run", "a", {"n": 1})
+    other = S3Database({"bucket_name": "bucket1", "region_name": "us-east-1"})
+    assert other.s3 is s3_db.s3
+    other.close()
+    assert s3_db.get_item("run", "a") == {"n": 1}
+
+
+def _slow_gets(db, delay):
+    """Delay every GET of the backend by `delay(s3_key)` seconds and track the peak concurrency."""
+    stats = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+    get_object = db._get_object
+
+    def slow_get(s3_key):
+        with lock:
+            stats["active"] += 1
+            stats["peak"] = max(stats["peak"], stats["active"])
+        try:
+            time.sleep(delay(s3_key))
+            return get_object(s3_key)
+        finally:
+            with lock:
+                stats["active"] -= 1
+
+    db._get_object = slow_get
+    return stats
+
+
+@pytest.fixture
+def fetch_db(s3_db):
+    db = S3Database({"bucket_name": "bucket1", "region_name": "us-east-1", "max_workers": 3})
+    db.insert_items("run", {f"r{i}": {"n": i} for i in range(12)})
+    return db
+
+
+def test_fetch_objects_keeps_key_order_and_skips_missing(fetch_db):
+    _slow_gets(fetch_db, lambda s3_key: 0.05 if s3_key == "run/r0" else 0)
+    s3_keys = ["run/r0", "run/missing", "run/r1", "run/r2"]
+    assert list(fetch_db.fetch_objects(s3_keys)) == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+
+def test_unordered_fetch_yields_objects_as_they_arrive(fetch_db):
+    _slow_gets(fetch_db, lambda s3_key: 0.2 if s3_key == "run/r0" else 0)
+    items = list(fetch_db.fetch_objects(["run/r0", "run/r1", "run/missing", "run/r2"], ordered=False))
+    assert sorted(item["n"] for item in items) == [0, 1, 2]
+    assert items[-1] == {"n": 0}
+
+
+def test_fetch_concurrency_is_bounded_by_max_workers(fetch_db):
+    stats = _slow_gets(fetch_db, lambda s3_key: 0.02)
+    pulled = []
+
+    def s3_keys():
+        for i in range(12):
+            pulled.append(i)
+            yield f"run/r{i}"
+
+    items = fetch_db.fetch_objects(s3_keys())
+    assert next(items) == {"n": 0}
+    assert len(pulled) <= 2 * fetch_db.max_workers  # Keys are consumed lazily
+    assert [item["n"] for item in items] == list(range(1, 12))
+    assert 1 < stats["peak"] <= fetch_db.max_workers
+
+
+def test_ttl_sweep_reads_only_its_window_of_keys(fetch_db):
+    db = TtlNoSqlDb(fetch_db, {"run": 60}, sweep_interval=0, sweep_batch_size=5)
+    fetch_db.insert_item("run", "r3", {"n": 3, "expires_at": 1})
+    gets = []
+    get_object = fetch_db._get_object
+    fetch_db._get_object = lambda s3_key: gets.append(s3_key) or get_object(s3_key)
+    assert db.sweep() == 0  # Examines r0, r1, r10, r11, r2
+    assert db.sweep() == 1  # Examines r3 ... r7, r3 has expired
+    assert len(gets) == 10
@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from database.sqlite_database import SqliteDatabase
+
+
+def open_db(tmp_path, **config):
+    return SqliteDatabase({"sqlite_path": str(tmp_path / "database.db"), "indexes": {"run": ["user_id"]}, **config})
+
+
+def test_wal_mode_and_expression_index(tmp_path):
+    db = open_db(tmp_path)
+    db.insert_items("run", {f"r{i}": {"user_id": f"u{i % 3}"} for i in range(9)})
+    conn, name = db._table("run")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT doc FROM {name} WHERE json_extract(doc, '$.\"user_id\"') = ?", ("u1",)).fetchall()
+    assert any("run__user_id" in row[-1] for row in plan)
+    assert [item["id"] for item in db.query_by_index("run", "user_id", "u1")] == ["r1", "r4", "r7"]
+    db.close()
+
+
+def test_each_thread_gets_its_own_connection(tmp_path):
+    db = open_db(tmp_path)
+    connections = set()
+
+    def connect():
+        connections.add(id(db._connect()))
+
+    threads = [threading.Thread(target=connect) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(connections) == 3
+    db.close()
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    db = open_db(tmp_path)
+    db.insert_item("counter", "c", {})
+
+    def bump(i):
+        db.update_item("counter", "c", {f"k{i}": i})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(bump, range(40)))
+    assert len(db.get_item("counter", "c")) == 41
+    db.close()
+
+
+def test_query_pushdown_keeps_python_semantics(tmp_path):
+    db = open_db(tmp_path)
+    db.insert_items("run", {"a": {"n": 5}, "b": {"n": "9"}, "c": {"n": True}, "d": {"n": [1]}, "e": {}})
+    assert [item["id"] for item in db.query("run", {"n": {"gt": 2}})["items"]] == ["a"]
+    assert [item["id"] for item in db.query("run", {"n": {"in": [5, "9"]}})["items"]] == ["a", "b"]
+    assert [item["id"] for item in db.query("run", {"n": None})["items"]] == ["e"]
+    db.close()
+    assert open_db(tmp_path).get_item("run", "a") == {"id": "a", "n": 5}
@@ -0,0 +1,40 @@
+import json
+import pytest
+from database.tinydb import TinyDBDatabase
+
+
+@pytest.fixture
+def cached_db(tmp_path):
+    db = TinyDBDatabase({"base_dir": str(tmp_path), "tinydb_cache": True, "tinydb_write_cache_size": 3, "tinydb_flush_interval": 0})
+    yield db
+    db.close()
+
+
+def read_table_file(tmp_path, table):
+    with open(tmp_path / f"{table}.json") as f:
+        content = f.read()
+    return json.loads(content)["_default"] if content else {}
+
+
+def test_reuses_one_handle_per_table(cached_db):
+    assert cached_db._get_db("user") is cached_db._get_db("user")
+
+
+def test_writes_are_flushed_at_write_cache_size(cached_db, tmp_path):
+    cached_db.insert_item("user", "a", {"name": "a"})
+    cached_db.insert_item("user", "b", {"name": "b"})
+    assert cached_db.get_item("user", "b")["name"] == "b"
+    assert read_table_file(tmp_path, "user") == {}
+
+    cached_db.insert_item("user", "c", {"name": "c"})
+    assert set(read_table_file(tmp_path, "user")) == {"a", "b", "c"}
+
+
+def test_close_flushes_pending_writes(tmp_path):
+    db = TinyDBDatabase({"base_dir": str(tmp_path), "tinydb_cache": True, "tinydb_flush_interval": 0})
+    db.insert_item("user", "a", {"name": "a"})
+    db.close()
+    assert read_table_file(tmp_path, "user")["a"]["name"] == "a"
+
+    reopened = TinyDBDatabase({"base_dir": str(tmp_path)})
+    assert reopened.get_item("user", "a")["name"] == "a"
@@ -0,0 +1,73 @@
+import time
+from database.factory import get_database, reset_databases
+from database.filesystem_database import FilesystemDatabase
+from database.log_database import LogDatabase
+from database.ttl import TtlNoSqlDb
+
+
+def test_inserts_are_stamped_and_expired_items_hidden(tmp_path):
+    db = TtlNoSqlDb(FilesystemDatabase({"base_dir": str(tmp_path)}), {"run": 60}, sweep_interval=0)
+    db.insert_item("run", "live", {"id": "live"})
+    db.insert_item("run", "old", {"id": "old", "expires_at": time.time() - 1})
+    db.insert_item("user", "u", {"id": "u"})
+
+    assert db.get_item("run", "live")["expires_at"] > time.time()
+    assert db.get_item("run", "old") == {}
+    assert [item["id"] for item in db.get_all_items("run")] == ["live"]
+    assert [item["id"] for item in db.iter_items("run")] == ["live"]
+    assert db.query("run", fields=["id"])["items"] == [{"id": "live"}]
+    assert "expires_at" not in db.get_item("user", "u")
+
+
+def test_ttl_hides_expired_keyed_items(tmp_path):
+    db = TtlNoSqlDb(FilesystemDatabase({"base_dir": str(tmp_path)}), {"run": 60}, sweep_interval=0)
+    db.insert_item("run", "live", {"id": "live"})
+    db.insert_item("run", "old", {"id": "old", "expires_at": 1})
+
+    assert [key for key, _ in db._get_keyed_items("run", ["live", "old"])] == ["live"]
+
+
+def test_sweep_deletes_in_bounded_batches_and_compacts(tmp_path):
+    backend = LogDatabase({"base_dir": str(tmp_path), "logdb_compact_interval": 0})
+    db = TtlNoSqlDb(backend, {"run": 60}, sweep_interval=0, sweep_batch_size=2)
+    past = time.time() - 1
+    db.insert_items("run", {f"r{i}": {"id": f"r{i}", "expires_at": past} for i in range(5)})
+    db.insert_item("run", "keep", {"id": "keep"})
+
+    compactions, reads = [], []
+    compact, get_items = backend.compact, backend.get_items
+    backend.compact = lambda table, force=True: compactions.append((table, force)) or compact(table, force)
+    backend.get_items = lambda table, keys: reads.append(len(keys)) or get_items(table, keys)
+    # Each sweep examines the next 2 keys: "keep", "r0" | "r1", "r2" | "r3", "r4"
+    assert [db.sweep(), db.sweep(), db.sweep()] == [1, 2, 2]
+    assert reads == [2, 2, 2]
+    assert compactions == [("run", False)]  # The backend's thresholds decide
+    assert [item["id"] for item in backend.get_all_items("run")] == ["keep"]
+    assert db.sweep() == 0
+    db.close()
+
+
+def test_factory_wraps_ttl_tables(tmp_path):
+    config = {"database_type": "filesystem", "base_dir": str(tmp_path), "ttl_tables": {"run": 1}, "ttl_sweep_interval": 0}
+    try:
+        db = get_database(lambda: config)
+        assert isinstance(db, TtlNoSqlDb)
+        assert db.tables == {"run": 1.0}
+    finally:
+        reset_databases()
+
+
+class NativeTtlDatabase(FilesystemDatabase):
+    def enable_ttl(self, table, attribute):
+        raise RuntimeError("AccessDenied")
+
+
+def test_factory_sweeps_when_native_ttl_cannot_be_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr("database.factory.FilesystemDatabase", NativeTtlDatabase)
+    config = {"database_type": "filesystem", "base_dir": str(tmp_path), "ttl_tables": {"run": 1}, "ttl_sweep_interval": 60}
+    try:
+        db = get_database(lambda: config)
+        assert isinstance(db, TtlNoSqlDb)
+        assert db.sweep_interval == 60
+    finally:
+        reset_databases()
@@ -0,0 +1,23 @@
+import io
+from database.cached_database import CachedNoSqlDb
+from database.changes import ChangeFeedNoSqlDb
+from database.filesystem_database import FilesystemDatabase
+from database.metrics import DbMetrics, MetricsNoSqlDb
+from database.ttl import TtlNoSqlDb
+
+
+def test_every_layer_forwards_what_it_does_not_override(tmp_path):
+    backend = FilesystemDatabase({"base_dir": str(tmp_path)})
+    db = MetricsNoSqlDb(
+        CachedNoSqlDb(TtlNoSqlDb(ChangeFeedNoSqlDb(backend), {"run": 60}, sweep_interval=0)),
+        registry=DbMetrics(),
+    )
+    db.put_blob_stream("blob", "b", io.BytesIO(b"0123456789"))
+    db.insert_items("run", {"a": {"user_id": "u"}, "b": {"user_id": "u"}})
+
+    assert db.open_blob_reader("blob", "b", 2, 5).read() == b"234"
+    assert db.count("run") == 2
+    assert db.list_keys("run")["keys"] == ["a", "b"]
+    assert [key for key, _ in db._get_keyed_items("run", ["a", "b"])] == ["a", "b"]
+    assert db.base_dir == backend.base_dir
+
@@ -1,6 +1,6 @@
 import logging
-import boto3
 import re
+from aws_clients import get_client
 from .interface import QueueClient
 from urllib.parse import urlparse
 
@@ -12,14 +12,12 @@ class SQSQueue(QueueClient):
         region = SQSQueue.extract_region_from_url(name)
         logger.info(f"initializing sqs queue with name: {name} and region: {region}")
 
-        session = boto3.Session(
-                aws_access_key_id=aws_access_key_id,
-                aws_secret_access_key=aws_secret_access_key,
-                # aws_session_token=aws_session_token,  # Only needed for temporary credentials
-                region_name=region
-            )
-
-        self.client = session.client("sqs")
+        # Shared client: every queue of a region and credentials uses one connection pool
+        self.client = get_client("sqs", {
+            "region_name": region,
+            "aws_access_key_id": aws_access_key_id,
+            "aws_secret_access_key": aws_secret_access_key,
+        })
         self.queue_url = name
 
     def send_message(self, message: str):
@@ -149,6 +149,7 @@ def main(app_name: str, monorepo_root: str):
     search_and_replace(os.path.join(f"{TEMPLATE_DIR}", "_gitignore"), replacements, os.path.join(f"{monorepo_root}/apps/{app_name}", ".gitignore"))
     search_and_replace(os.path.join(f"{TEMPLATE_DIR}", "auth_util.py"), replacements, os.path.join(f"{monorepo_root}/apps/{app_name}/src/{app_name}", "auth_util.py"))
     search_and_replace(os.path.join(f"{TEMPLATE_DIR}", "error_util_content.py"), replacements, os.path.join(f"{monorepo_root}/apps/{app_name}/src/{app_name}", "error_util.py"))
+    search_and_replace(os.path.join(f"{TEMPLATE_DIR}", "stream_util.py"), replacements, os.path.join(f"{monorepo_root}/apps/{app_name}/src/{app_name}", "stream_util.py"))
     search_and_replace(os.path.join(f"{TEMPLATE_DIR}", "__init__.py"), replacements, os.path.join(f"{monorepo_root}/apps/{app_name}/src/{app_name}", "__init__.py"))
     
     search_and_replace(os.path.join(f"{TEMPLATE_DIR}", "generate_ssl.py"), replacements, os.path.join(f"{monorepo_root}/apps/{app_name}/src/{app_name}", "generate_ssl.py"))
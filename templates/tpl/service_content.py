@@ -32,6 +32,16 @@ def get_all_{model_name}(db: NoSqlDb, user: dict):
     logger.info("===============get_all_{model_name} called==============")
     return db.get_all_items("{model_name}")
 
+# read - stream all items
+def iter_{model_name}(db: NoSqlDb, user: dict):
+    logger.info("===============iter_{model_name} called==============")
+    return db.iter_items("{model_name}")
+
+# read - query items (filter, projection, paging)
+def query_{model_name}(filters: dict, fields: List[str], limit: int, cursor: str, db: NoSqlDb, user: dict):
+    logger.info("===============query_{model_name} called==============")
+    return db.query("{model_name}", filters, fields, limit, cursor)
+
 # read - get an item
 def get_{model_name}(id: str, db: NoSqlDb, user: dict):
     logger.info("===============get_{model_name} called==============")
@@ -43,8 +53,7 @@ def get_{model_name}(id: str, db: NoSqlDb, user: dict):
 def update_{model_name}(id: str, new_item: {ModelName}, db: NoSqlDb, q: QueueClient, user: dict):
     logger.info("===============update_{model_name} called==============")
     logger.info(new_item)
-    db.update_item("{model_name}", id, new_item.model_dump())
-    return db.get_item("{model_name}", id)
+    return db.update_item("{model_name}", id, new_item.model_dump())
 
 # write - delete an item
 def delete_{model_name}(id: str, db: NoSqlDb, q: QueueClient, user: dict):
@@ -55,4 +64,33 @@ def delete_{model_name}(id: str, db: NoSqlDb, q: QueueClient, user: dict):
         logger.warning(f"{ModelName} with id {id} not found")
         return None
     db.delete_item("{model_name}", id)
-    return item
\ No newline at end of file
+    return item
+
+# write - create many items
+def create_{model_name}s(items: List[{ModelName}], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============create_{model_name}s called==============")
+    new_items = {}
+    for item in items:
+        item_id = item.id if hasattr(item, "id") and item.id else str(uuid.uuid4())
+        new_item = item.model_dump()
+        new_item["id"] = item_id  # Store UUID in the database
+        new_items[item_id] = new_item
+
+    created = db.insert_items("{model_name}", new_items)
+    logger.info(f"{len(created)} {ModelName} items created")
+    if q:
+        for new_item in created:
+            q.send_message(new_item)
+    return created
+
+# read - get many items
+def get_{model_name}s(ids: List[str], db: NoSqlDb, user: dict):
+    logger.info("===============get_{model_name}s called==============")
+    return db.get_items("{model_name}", ids)
+
+# write - delete many items
+def delete_{model_name}s(ids: List[str], db: NoSqlDb, q: QueueClient, user: dict):
+    logger.info("===============delete_{model_name}s called==============")
+    items = db.get_items("{model_name}", ids)
+    db.delete_items("{model_name}", [item["id"] for item in items])
+    return items